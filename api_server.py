@@ -2,25 +2,55 @@ import os
 import re
 import json
 import math
-from typing import Any, Dict, Optional
-
-from fastapi import FastAPI, HTTPException
+import time
+import threading
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
-# CrewAI pieces (reuse the same constructs as main.py but defined locally to avoid import-time issues)
-from crewai import Agent, Task, Crew, Process, LLM
-from crewai_tools import SerperDevTool
-
-from data_tools import SpaceWeatherTools
-from risk_tools import RiskAssessmentTools
-from cro_tools import PortfolioRiskTool
-from pricing_tool import PricingTools
+# CrewAI, crewai_tools and the tool modules (which pull in TensorFlow for the LSTM
+# path) are imported inside build_crew() so that workers serving health, portfolio,
+# NOAA and historical endpoints boot without loading them.
+from historical_events import get_event_catalog
+from storm_index import get_storm_index
+from metrics import metrics
+from forecast_snapshot import SnapshotEntry, snapshot
+from http_cache import FastJSONResponse, ResponseCache
+from profiling import PROFILE_HEADER, install_profiling
+from model_registry import get_model_registry
+from noaa_feeds import (
+    KP_FORECAST_PRODUCT,
+    NOAA_POLL_INTERVAL_SECONDS,
+    NOAA_SECTIONS,
+    SWPC_BASE_URL,
+    seconds_until_next_poll,
+    summarize_kp_forecast,
+)
+from kp_fusion import install_kp_fusion
+from portfolio_store import get_portfolio_store
+from dashboard import build_dashboard, parse_fields, sections_for
+from quote_tables import QuoteTableStore, incident_probability_over, portfolio_probability_over
+from run_cache import RunCache
+from llm_limiter import llm_deadline
+from stress_test import (
+    episodes_as_events,
+    recommendation_for_pml_pct,
+    shielding_multiplier,
+    stress_cache,
+)
 
 
 load_dotenv()
 
+# Budget for all LLM calls of one /api/run before it falls back to deterministic pricing.
+RUN_LLM_DEADLINE_SECONDS = float(os.getenv("RUN_LLM_DEADLINE_SECONDS", "90"))
+
 
 class NewPolicy(BaseModel):
     asset_value_millions: float
@@ -37,6 +67,30 @@ class HistoricalPolicy(BaseModel):
     historical_event_name: str
     historical_date: str
 
+class WindowBatchRequest(BaseModel):
+    windows: List[List[List[float]]]
+
+class ModelPredictRequest(WindowBatchRequest):
+    version: Optional[str] = None
+
+class FleetRiskRequest(BaseModel):
+    asset_ids: Optional[List[str]] = None
+    real_time_context: str = "No real-time alerts supplied."
+    worst_case_kp: Optional[float] = None
+
+class StressEvent(BaseModel):
+    kp: float
+    name: Optional[str] = None
+    date: Optional[str] = None
+
+class StressTestRequest(BaseModel):
+    events: Optional[List[StressEvent]] = None
+    threshold: Optional[float] = None
+    start: Optional[str] = None
+    end: Optional[str] = None
+    min_duration: int = 1
+    segment_by: str = "orbit_type"
+
 
 def load_portfolio_from_file(filepath: str = "portfolio_data.json") -> list:
     try:
@@ -46,6 +100,14 @@ def load_portfolio_from_file(filepath: str = "portfolio_data.json") -> list:
         return []
 
 
+# Premium/probability tables for the current forecast snapshot and portfolio.
+quote_store = QuoteTableStore(lambda: get_portfolio_store().items(), snapshot)
+# Single-flight and LRU for /api/run, emptied on each new forecast issuance.
+run_cache = RunCache(snapshot)
+# Serialized, compressed bodies of the snapshot-backed GET endpoints.
+response_cache = ResponseCache()
+
+
 def safe_parse_json(value: Any) -> Optional[Dict[str, Any]]:
     if value is None:
         return None
@@ -59,8 +121,24 @@ def safe_parse_json(value: Any) -> Optional[Dict[str, Any]]:
 
 def build_crew() -> Dict[str, Any]:
     """Create agents, tools, and tasks; return a dict with crew and task refs for introspection."""
+    # CrewAI pieces (reuse the same constructs as main.py but defined locally to avoid import-time issues)
+    from crewai import Agent, Task, Crew, Process, LLM
+    from crewai_tools import SerperDevTool
+
+    from cassettes import install_cassettes
+    from llm_limiter import install_llm_limiter
+
+    install_cassettes()
+
+    from data_tools import SpaceWeatherTools
+    from risk_tools import RiskAssessmentTools
+    from cro_tools import PortfolioRiskTool
+    from pricing_tool import PricingTools
+
     # Initialize one LLM shared by all agents
     llm = LLM(model="gemini/gemini-2.5-flash", api_key=os.getenv("GEMINI_API_KEY"))
+    # After the first LLM is built, so its provider class is loaded and gets guarded too.
+    install_llm_limiter()
 
     # Tools
     search_tool = SerperDevTool()
@@ -192,7 +270,58 @@ def build_crew() -> Dict[str, Any]:
     }
 
 
-app = FastAPI(title="Borealis Insurance API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Precompute process-wide state once so request handlers only read it."""
+    try:
+        get_event_catalog()
+        get_storm_index()
+    except Exception as e:
+        print(f"Warning: historical event catalog unavailable: {e}")
+    # Model loading takes seconds; do it off the event loop so health checks answer immediately.
+    warm_targets = [
+        target for target, env in (("kp", "LSTM_WARM_ON_STARTUP"), ("dst", "DST_WARM_ON_STARTUP"))
+        if os.getenv(env, "1") == "1"
+    ]
+    if warm_targets:
+        threading.Thread(target=_warm_models, args=(warm_targets,), name="model-warmup", daemon=True).start()
+    # The Kp distribution and quote tables are rebuilt on every forecast update, never per request.
+    global _kp_fusion
+    _kp_fusion = install_kp_fusion(snapshot)
+    snapshot.subscribe(quote_store)
+    snapshot.subscribe(run_cache)
+    quote_store.rebuild()
+    global _noaa_poller
+    pollers = []
+    if os.getenv("NOAA_POLL", "1") == "1":
+        from noaa_feeds import NoaaForecastPoller
+
+        _noaa_poller = NoaaForecastPoller()
+        pollers.append(_noaa_poller)
+    if os.getenv("SOLAR_WIND_INGEST", "1") == "1":
+        from solar_wind import SolarWindIngestor
+
+        pollers.append(SolarWindIngestor())
+    for poller in pollers:
+        poller.start()
+    yield
+    for poller in pollers:
+        poller.stop()
+    _noaa_poller = None
+
+
+def _warm_models(targets: List[str]) -> None:
+    try:
+        status = get_model_registry().warm(targets)
+    except Exception as e:
+        print(f"Model warm-up skipped: {e}")
+        return
+    for key, ready in status.items():
+        if not ready:
+            print(f"Model warm-up finished without a usable '{key}'.")
+
+
+app = FastAPI(title="Borealis Insurance API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # CORS for local dev
 app.add_middleware(
@@ -206,6 +335,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Opt-in request profiling; None (and no middleware) unless PROFILE_TOKEN or PROFILE_SAMPLE_RATE is set.
+profile_store = install_profiling(app)
 
 
 @app.get("/api/health")
@@ -213,71 +344,374 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/api/metrics")
+def get_metrics():
+    return metrics.snapshot()
+
+
+def _profile_store_or_404(request: Request):
+    if profile_store is None:
+        raise HTTPException(status_code=404, detail="Profiling is not enabled.")
+    if not profile_store.authorized(request.headers.get(PROFILE_HEADER)):
+        raise HTTPException(status_code=403, detail="A valid X-Profile-Token header is required.")
+    return profile_store
+
+
+@app.get("/api/profiles")
+def list_profiles(request: Request, limit: int = 50):
+    return {"profiles": _profile_store_or_404(request).recent(limit)}
+
+
+@app.get("/api/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: str, request: Request):
+    """Collapsed stacks for one profiled request, ready for flamegraph.pl or speedscope."""
+    folded = _profile_store_or_404(request).folded(profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail=f"No profile '{profile_id}'.")
+    return PlainTextResponse(folded)
+
+
+@app.get("/api/nowcast")
+def nowcast():
+    """Latest LSTM Kp nowcast and solar wind features published by the ingestion poller."""
+    out = {}
+    for section in ("lstm_nowcast", "solar_wind"):
+        entry = snapshot.get(section)
+        out[section] = entry.value if entry is not None else None
+    return out
+
+
+@app.get("/api/kp-distribution")
+def kp_distribution(request: Request):
+    """Fused per-3-hour Kp distributions (NOAA 3-day, NOAA JSON, LSTM nowcast) for the next 72h."""
+    _roll_kp_fusion()
+    entry = snapshot.get("kp_distribution")
+    if entry is None:
+        raise HTTPException(status_code=503, detail="No Kp forecast ingested yet.")
+    return response_cache.respond(
+        request, "kp-distribution", entry.digest,
+        lambda: dict(entry.value, snapshot_digest=entry.digest), seconds_until_next_poll(),
+    )
+
+
+def _warm_handler_or_503(name: str, version: Optional[str] = None):
+    """A warm registered model; never loads one on the request path."""
+    registry = get_model_registry()
+    try:
+        handler = registry.get(name, version, load=False)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except LookupError:
+        raise HTTPException(status_code=503, detail=f"Model '{name}' is still loading.")
+    if not handler.ready:
+        raise HTTPException(status_code=503, detail=f"Model '{name}' is not available.")
+    return handler
+
+
+def _dst_handler_or_503():
+    spec = get_model_registry().default("dst")
+    return _warm_handler_or_503(spec.name), spec
+
+
+def _dst_key(spec) -> str:
+    """Response key for Dst values: only a calibrated model's output is in nT."""
+    return "dst_nt" if spec.calibrated else "dst_relative"
+
+
+@app.get("/api/models")
+def list_models():
+    """Registered models, which are warm, per-target defaults and configured ensembles."""
+    return get_model_registry().summary()
+
+
+@app.post("/api/models/reload")
+def reload_models():
+    """Re-read the manifest in the background; new models are swapped in once loaded."""
+    def _reload():
+        try:
+            get_model_registry().reload()
+        except Exception as e:
+            print(f"Warning: model reload failed: {e}")
+
+    threading.Thread(target=_reload, name="model-reload", daemon=True).start()
+    return {"status": "reloading"}
+
+
+@app.post("/api/models/{name}/predict")
+def model_predict(name: str, body: ModelPredictRequest):
+    """Batched predictions from one registered model, optionally pinned to a version."""
+    handler = _warm_handler_or_503(name, body.version)
+    try:
+        preds = handler.predict_batch(body.windows)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    spec = get_model_registry().resolve(name, body.version)
+    return {"model": spec.key, "target": spec.target, "calibrated": spec.calibrated,
+            "predictions": [round(float(v), 3) for v in preds]}
+
+
+@app.post("/api/ensembles/{name}/predict")
+def ensemble_predict(name: str, body: WindowBatchRequest):
+    """Weighted mean over an ensemble's members, plus each member's predictions."""
+    registry = get_model_registry()
+    if name not in registry.manifest.ensembles:
+        raise HTTPException(status_code=404, detail=f"Unknown ensemble '{name}'")
+    for key in registry.manifest.ensembles[name].members:
+        _warm_handler_or_503(key)
+    try:
+        result = registry.predict_ensemble(name, body.windows, load=False)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "ensemble": name,
+        "predictions": [round(float(v), 3) for v in result["mean"]],
+        "members": {k: [round(float(v), 3) for v in preds] for k, preds in result["members"].items()},
+    }
+
+
+@app.get("/api/dst-forecast")
+def dst_forecast_latest():
+    """
+    Dst prediction from the latest solar wind window published by the ingestion poller.
+    ``calibrated`` is false while the model's outputs are not known to be in nT;
+    the value is then reported as ``dst_relative`` instead of ``dst_nt``.
+    """
+    solar_wind = snapshot.value("solar_wind") or {}
+    if not solar_wind.get("window"):
+        raise HTTPException(status_code=503, detail="No solar wind data ingested yet.")
+    handler, spec = _dst_handler_or_503()
+    return {
+        _dst_key(spec): round(handler.predict(solar_wind["window"]), 3),
+        "as_of": solar_wind.get("as_of"),
+        "model": spec.key,
+        "calibrated": spec.calibrated,
+    }
+
+
+@app.post("/api/dst-forecast")
+def dst_forecast_batch(body: WindowBatchRequest):
+    """Batched Dst predictions for caller-supplied (N, T, 5) solar wind windows (see ``calibrated`` above)."""
+    handler, spec = _dst_handler_or_503()
+    try:
+        preds = handler.predict_batch(body.windows)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {_dst_key(spec): [round(float(v), 3) for v in preds], "model": spec.key, "calibrated": spec.calibrated}
+
+
 @app.get("/api/portfolio")
 def get_portfolio():
-    data = load_portfolio_from_file()
-    return {"items": data}
+    return {"items": get_portfolio_store().items()}
 
 
-@app.get("/api/kp-forecast")
-def kp_forecast(hours: int = 72):
-    """Return Kp forecast time series for the next N hours (default 72)."""
-    import requests
-    import pandas as pd
-    from datetime import datetime, timedelta
+@app.get("/api/dashboard")
+def dashboard(request: Request, fields: Optional[str] = None, hours: int = 72, days: int = 14, max_points: int = 0):
+    """
+    Everything the Home and Forecast pages need in one response, composed from
+    the forecast snapshot and the portfolio store. ``fields`` selects parts
+    (comma-separated); ``max_points`` caps chart series, keeping peaks.
+    Missing NOAA products are ingested on demand like the per-product
+    endpoints, but never by waiting on another request's fetch; a field stays
+    null (and listed under ``missing``) while that fetch is in flight or
+    after it failed in the current poll tick.
+    """
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    sections = sections_for(selected)
+    if sections:
+        try:
+            _poll_noaa_on_demand(sections, wait=False)
+        except Exception as e:
+            print(f"Warning: on-demand NOAA fetch for the dashboard failed: {e}")
+    _roll_kp_fusion()
+    portfolio, portfolio_ver = get_portfolio_store().current()
+    period = _current_period()
+    # Content digests and the shared clock period only, so every worker tags equal bodies alike.
+    version = f"{snapshot.digest(*sections)}.{portfolio_ver}.{period:%Y%m%d%H}"
+
+    def build():
+        tables = quote_store.current(portfolio, portfolio_ver) if "risk" in selected else None
+        risk = dict(tables.portfolio, snapshot_digest=tables.snapshot_digest) if tables else None
+        return build_dashboard(snapshot, portfolio, portfolio_ver, selected, period, hours, days, max_points, risk)
+
+    key = f"dashboard?fields={','.join(selected)}&hours={hours}&days={days}&max_points={max_points}"
+    return response_cache.respond(request, key, version, build, seconds_until_next_poll())
+
+
+@app.get("/api/historical-events")
+def historical_events(
+    kind: Optional[str] = None,
+    min_kp: float = 0.0,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    anomaly_type: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    sort: str = "start",
+    offset: int = 0,
+    limit: int = 50,
+):
+    """Storm events and anomaly clusters derived from merged_output.csv.
+
+    kind: 'storm' (consecutive days with Kp >= 5) or 'anomaly_cluster'.
+    start/end: ISO dates; events overlapping the window are returned.
+    sort: 'start', '-start', 'peak_kp', 'anomalies' or 'duration'.
+    """
+    if kind is not None and kind not in ("storm", "anomaly_cluster"):
+        raise HTTPException(status_code=400, detail="kind must be 'storm' or 'anomaly_cluster'")
+    try:
+        catalog = get_event_catalog()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Historical dataset unavailable: {e}")
+    try:
+        page = catalog.query(
+            kind=kind,
+            min_kp=min_kp,
+            start=start,
+            end=end,
+            anomaly_type=anomaly_type,
+            risk_level=risk_level,
+            sort=sort,
+            offset=offset,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page["summary"] = catalog.summary()
+    return page
+
+
+@app.get("/api/storm-episodes")
+def storm_episodes(
+    threshold: float = 5.0,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    min_duration: int = 1,
+    min_peak_kp: float = 0.0,
+    min_anomalies: int = 0,
+    offset: int = 0,
+    limit: int = 100,
+):
+    """Storm episodes (consecutive days with daily Kp >= threshold) from the interval index.
+
+    start/end accept 'YYYY', 'YYYY-MM' or 'YYYY-MM-DD'; episodes overlapping the window match.
+    """
+    if not (0.0 <= threshold <= 9.0):
+        raise HTTPException(status_code=400, detail="threshold must be within [0, 9]")
+    try:
+        index = get_storm_index()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Historical dataset unavailable: {e}")
+    try:
+        page = index.query(
+            threshold=threshold,
+            start=start,
+            end=end,
+            min_duration=min_duration,
+            min_peak_kp=min_peak_kp,
+            min_anomalies=min_anomalies,
+            offset=offset,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page["levels"] = index.summary()
+    return page
+
+
+def _noaa_needs_poll(sections: Sequence[str]) -> bool:
+    # At most one attempt per poll tick, failed or not, so an outage costs one slow fetch per tick.
+    now = time.time()
+    if _noaa_on_demand_at >= now - now % NOAA_POLL_INTERVAL_SECONDS:
+        return False
+    noaa = [section for section in sections if section in NOAA_SECTIONS]
+    if any(snapshot.get(section) is None for section in noaa):
+        return True
+    # No background poller (NOAA_POLL=0): refetch once per poll tick, like the poller would.
+    return bool(noaa) and _noaa_poller is None
+
+
+def _poll_noaa_on_demand(sections: Sequence[str], wait: bool = True) -> None:
+    """
+    Fetch the NOAA products on the request path when one of the NOAA-owned
+    ``sections`` has not been ingested yet, or, with no background poller,
+    to refresh them once per poll tick. Sections other pollers own (the
+    fused distribution, nowcasts) never trigger a fetch. With ``wait``
+    false a request never queues behind another request's fetch. Fetch
+    errors propagate.
+    """
+    global _noaa_on_demand_at
+    if not _noaa_needs_poll(sections):
+        return
+    if not _on_demand_lock.acquire(blocking=wait):
+        return
+    try:
+        if not _noaa_needs_poll(sections):
+            return
+        _noaa_on_demand_at = time.time()
+        _on_demand_poller().poll_once()
+    finally:
+        _on_demand_lock.release()
+
 
-    url = "https://services.swpc.noaa.gov/products/noaa-planetary-k-index-forecast.json"
+def _noaa_section(section: str) -> SnapshotEntry:
+    """A NOAA product from the snapshot, ingested on demand when no poller keeps it current."""
     try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        data = resp.json()
-        if not data or len(data) < 2:
-            raise ValueError("Empty or invalid NOAA forecast data")
+        # Only a missing section is worth waiting for; a refresh in flight elsewhere leaves the last one servable.
+        _poll_noaa_on_demand([section], wait=snapshot.get(section) is None)
+    except Exception as e:
+        if snapshot.get(section) is None:
+            raise HTTPException(status_code=502, detail=f"NOAA fetch failed: {e}")
+        print(f"Warning: on-demand NOAA refresh failed, serving the last snapshot: {e}")
+    entry = snapshot.get(section)
+    if entry is None:
+        raise HTTPException(status_code=502, detail=f"NOAA product for '{section}' is unavailable.")
+    return entry
 
-        columns, records = data[0], data[1:]
-        df = pd.DataFrame(records, columns=columns)
-        df['time_tag'] = pd.to_datetime(df['time_tag'])
-        df['kp'] = pd.to_numeric(df['kp'], errors='coerce')
-        df = df.dropna(subset=['kp'])
 
-        now_utc = datetime.utcnow()
-        horizon = now_utc + timedelta(hours=max(1, min(hours, 168)))  # cap at 7 days
-        window = df[(df['time_tag'] >= now_utc) & (df['time_tag'] <= horizon)].copy()
-        if window.empty:
-            # fallback: take next 72 rows as-is
-            window = df.head(72).copy()
-
-        window.sort_values('time_tag', inplace=True)
-        series = [
-            {"t": t.isoformat(), "kp": float(k)}
-            for t, k in zip(window['time_tag'], window['kp'])
-        ]
-
-        # Aggregates
-        max_kp = float(window['kp'].max()) if not window.empty else None
-        min_kp = float(window['kp'].min()) if not window.empty else None
-        avg_kp = float(window['kp'].mean()) if not window.empty else None
-
-        # Daily aggregates
-        window['date'] = window['time_tag'].dt.date
-        by_day = window.groupby('date')['kp']
-        daily = [
-            {
-                "date": str(idx),
-                "max": float(vals.max()),
-                "min": float(vals.min()),
-                "avg": float(vals.mean()),
-            }
-            for idx, vals in by_day
-        ]
+def _on_demand_poller():
+    global _noaa_on_demand
+    if _noaa_on_demand is None:
+        from noaa_feeds import NoaaForecastPoller
+
+        _noaa_on_demand = NoaaForecastPoller(snapshot=snapshot)
+    return _noaa_on_demand
+
+
+# The lifespan's background poller, if NOAA_POLL is on.
+_noaa_poller = None
+_noaa_on_demand = None
+_noaa_on_demand_at = 0.0
+_on_demand_lock = threading.Lock()
+# The lifespan's Kp fusion; None until startup.
+_kp_fusion = None
+
+
+def _roll_kp_fusion() -> None:
+    """Refit the fused Kp distribution first if a new 3-hour period has started since its last fit."""
+    if _kp_fusion is not None:
+        _kp_fusion.roll()
 
-        return {
-            "series": series,
-            "summary": {"max": max_kp, "min": min_kp, "avg": avg_kp},
-            "daily": daily,
-        }
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"NOAA forecast fetch failed: {e}")
+
+def _current_period() -> datetime:
+    """Start of the current 3-hour Kp period (UTC). Kp windows start here, so they only move on boundaries."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return now.replace(hour=now.hour - now.hour % 3, minute=0, second=0, microsecond=0)
+
+
+@app.get("/api/kp-forecast")
+def kp_forecast(request: Request, hours: int = 72):
+    """Return Kp forecast time series for the next N hours (default 72)."""
+    entry = _noaa_section("noaa_kp_forecast")
+    period = _current_period()
+    return response_cache.respond(
+        request,
+        f"kp-forecast?hours={hours}",
+        f"{entry.digest}.{period:%Y%m%d%H}",
+        lambda: summarize_kp_forecast(entry.value["series"], hours, period),
+        seconds_until_next_poll(),
+    )
 
 
 def _parse_kp_token(tok: str) -> Optional[float]:
@@ -308,7 +742,7 @@ def _parse_kp_token(tok: str) -> Optional[float]:
 
 
 @app.get("/api/daily-geomag")
-def daily_geomag(limit: int = 30):
+def daily_geomag(request: Request, limit: int = 30):
     """Return last N days of daily geomagnetic indices parsed from NOAA text feed.
 
     Output shape:
@@ -318,256 +752,26 @@ def daily_geomag(limit: int = 30):
       ]
     }
     """
-    import requests
-    url = "https://services.swpc.noaa.gov/text/daily-geomagnetic-indices.txt"
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        text = resp.text
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"NOAA daily indices fetch failed: {e}")
-
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    rows = []
-    for ln in lines:
-        # Find lines starting with date-like tokens
-        parts = ln.split()
-        if len(parts) < 4:
-            continue
-        # Look for YYYY MM DD
-        try:
-            y, m, d = int(parts[0]), int(parts[1]), int(parts[2])
-            if y < 1900 or not (1 <= m <= 12) or not (1 <= d <= 31):
-                continue
-            date_str = f"{y:04d}-{m:02d}-{d:02d}"
-        except Exception:
-            continue
-
-        # NOAA format: YYYY MM DD [Ap] [8 K-indices] [Ap] [8 K-indices] [Ap] [8 Kp values]
-        # The actual Kp values (decimals) are at the very end, after all the integer K-indices
-        ap_val: Optional[float] = None
-        kp_vals: list[float] = []
-        
-        # Strategy: Look for decimal values (containing '.') at the end of the line
-        # These are the actual Kp values we want
-        decimal_values = []
-        for i in range(len(parts) - 1, 2, -1):  # Work backwards from end, skip date
-            part = parts[i]
-            if '.' in part:  # This is a decimal value (Kp)
-                try:
-                    val = float(part)
-                    if 0.0 <= val <= 9.0:
-                        decimal_values.insert(0, val)  # Insert at beginning to maintain order
-                    if len(decimal_values) == 8:  # We found all 8 Kp values
-                        break
-                except:
-                    continue
-        
-        kp_vals = decimal_values
-        
-        # Find the planetary Ap value (usually the third integer after the date)
-        integer_candidates = []
-        for i, part in enumerate(parts[3:], 3):  # Skip date parts
-            try:
-                val = float(part)
-                if val == int(val) and 0 <= val <= 400:  # Integer Ap values
-                    integer_candidates.append(val)
-                if len(integer_candidates) == 3:  # Found third Ap (planetary)
-                    ap_val = integer_candidates[2]
-                    break
-            except:
-                continue
+    entry = _noaa_section("noaa_daily_indices")
+    days = entry.value["days"]
+    return response_cache.respond(
+        request,
+        f"daily-geomag?limit={limit}",
+        entry.digest,
+        lambda: {"days": days[-limit:] if limit and limit > 0 else days},
+        seconds_until_next_poll(),
+    )
 
-        kp_max = max(kp_vals) if kp_vals else None
-        kp_avg = sum(kp_vals) / len(kp_vals) if kp_vals else None
-        rows.append({
-            "date": date_str,
-            "ap": ap_val,
-            "kp_values": kp_vals,
-            "kp_max": kp_max,
-            "kp_avg": kp_avg,
-        })
-
-    # Keep only last N entries by date
-    try:
-        rows.sort(key=lambda r: r["date"])  # ascending
-        if limit and limit > 0:
-            rows = rows[-limit:]
-    except Exception:
-        pass
 
-    return {"days": rows}
+def _three_day_forecast() -> Dict[str, Any]:
+    return _noaa_section("noaa_3day").value
 
 
 @app.get("/api/forecast-3day")
-def forecast_3day():
-    """Parse NOAA 3-day forecast text into structured JSON.
-
-    Returns:
-    {
-      issued: ISO8601 string or null,
-      observed_max_kp: float | null,
-      expected_max_kp: float | null,
-      days: ["YYYY-MM-DD", "YYYY-MM-DD", "YYYY-MM-DD"],
-      breakdown: [ { period: "00-03UT", values: [d1, d2, d3] }, ... ],
-      rationale: string
-    }
-    """
-    import requests
-    from datetime import datetime
-
-    url = "https://services.swpc.noaa.gov/text/3-day-forecast.txt"
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        text = resp.text
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"NOAA 3-day forecast fetch failed: {e}")
-
-    lines = text.splitlines()
-    # Parse issued timestamp
-    issued_iso = None
-    for ln in lines:
-        if ln.startswith(":Issued:"):
-            # Example: ":Issued: 2025 Sep 26 1230 UTC"
-            try:
-                parts = ln.split(":", 1)[1].strip()
-                # Convert '2025 Sep 26 1230 UTC' to ISO
-                dt = datetime.strptime(parts.replace(" UTC", ""), "%Y %b %d %H%M")
-                issued_iso = dt.strftime("%Y-%m-%dT%H:%M:00Z")
-            except Exception:
-                pass
-            break
-
-    # Parse observed and expected max kp
-    observed_max = None
-    expected_max = None
-    for ln in lines:
-        if "greatest observed 3 hr Kp" in ln:
-            m = re.search(r"(\d+\.\d+|\d+)", ln)
-            if m:
-                try:
-                    observed_max = float(m.group(1))
-                except Exception:
-                    pass
-        if "greatest expected 3 hr Kp" in ln:
-            m = re.search(r"(\d+\.\d+|\d+)", ln)
-            if m:
-                try:
-                    expected_max = float(m.group(1))
-                except Exception:
-                    pass
-
-    # Find breakdown header and parse grid
-    breakdown_rows = []
-    day_labels = []
-    rationale = ""
-    try:
-        start_idx = None
-        for i, ln in enumerate(lines):
-            if ln.strip().startswith("NOAA Kp index breakdown"):
-                start_idx = i
-                break
-        if start_idx is not None:
-            # Next lines: blank, then header with three day labels
-            i = start_idx + 1
-            # Skip blank lines
-            while i < len(lines) and not lines[i].strip():
-                i += 1
-            # Header line with dates
-            if i < len(lines):
-                header = lines[i]
-                # tokens like 'Sep 26       Sep 27       Sep 28'
-                day_tokens = [t for t in header.split() if t.isalpha() or t.isdigit() or (len(t) == 3 and t.isalpha())]
-                # A simpler approach: just split and grab the last 6 tokens and join pairs
-                raw = header.strip().split()
-                # Attempt to reconstruct labels as pairs month day
-                tmp = []
-                j = 0
-                while j < len(raw):
-                    if raw[j].isalpha() and j + 1 < len(raw) and raw[j+1].isdigit():
-                        tmp.append(f"{raw[j]} {raw[j+1]}")
-                        j += 2
-                    else:
-                        j += 1
-                day_labels = tmp[:3]
-                i += 1
-
-            # Parse 8 time rows until blank line
-            count = 0
-            while i < len(lines) and count < 8:
-                row = lines[i]
-                if not row.strip():
-                    break
-                # Example: '00-03UT       2.33         2.33         2.33'
-                m = re.match(r"\s*([0-9]{2}-[0-9]{2}UT)\s+(.+)$", row)
-                if m:
-                    period = m.group(1)
-                    rest = m.group(2)
-                    nums = re.findall(r"\d+\.\d+|\d+", rest)
-                    values = [float(x) for x in nums[:3]] if nums else []
-                    breakdown_rows.append({"period": period, "values": values})
-                    count += 1
-                i += 1
-
-        # Capture rationale paragraph following the breakdown
-        # Find line starting with 'Rationale:' near the breakdown region
-        for k in range((start_idx or 0), min((start_idx or 0) + 100, len(lines))):
-            if lines[k].strip().startswith("Rationale:"):
-                rationale = lines[k].split(":", 1)[1].strip()
-                # Include subsequent lines until blank
-                t = k + 1
-                extra = []
-                while t < len(lines) and lines[t].strip():
-                    extra.append(lines[t].strip())
-                    t += 1
-                if extra:
-                    rationale += " " + " ".join(extra)
-                break
-    except Exception:
-        pass
-
-    # Try to attach year to day labels using the line that contains the 3-day range
-    year = None
-    for ln in lines:
-        if "Sep" in ln and "202" in ln and "NOAA Kp index breakdown" in lines[start_idx] if 'start_idx' in locals() and start_idx is not None else True:
-            m = re.search(r"(20\d{2})", ln)
-            if m:
-                year = int(m.group(1))
-                break
-    # Fallback: look earlier line with 'Sep 26-Sep 28 2025'
-    if year is None:
-        for ln in lines:
-            m = re.search(r"(20\d{2})", ln)
-            if m:
-                year = int(m.group(1))
-                break
-
-    # Build ISO dates if possible
-    from calendar import month_abbr
-    month_map = {m: i for i, m in enumerate(month_abbr) if m}
-    iso_days = []
-    if year and len(day_labels) == 3:
-        for label in day_labels:
-            try:
-                mon_str, day_str = label.split()
-                mon = month_map.get(mon_str[:3], None)
-                day = int(day_str)
-                if mon:
-                    iso_days.append(f"{year:04d}-{mon:02d}-{day:02d}")
-            except Exception:
-                iso_days.append(label)
-    else:
-        iso_days = day_labels
-
-    return {
-        "issued": issued_iso,
-        "observed_max_kp": observed_max,
-        "expected_max_kp": expected_max,
-        "days": iso_days,
-        "breakdown": breakdown_rows,
-        "rationale": rationale,
-    }
+def forecast_3day(request: Request):
+    """Parsed NOAA 3-day forecast (see noaa_feeds.parse_3day_forecast)."""
+    entry = _noaa_section("noaa_3day")
+    return response_cache.respond(request, "forecast-3day", entry.digest, lambda: entry.value, seconds_until_next_poll())
 
 
 def _next_24h_max_kp_from_noaa_json() -> Optional[float]:
@@ -578,7 +782,7 @@ def _next_24h_max_kp_from_noaa_json() -> Optional[float]:
         import requests
         import pandas as pd
         from datetime import datetime, timedelta
-        url = "https://services.swpc.noaa.gov/products/noaa-planetary-k-index-forecast.json"
+        url = f"{SWPC_BASE_URL}/{KP_FORECAST_PRODUCT}"
         resp = requests.get(url, timeout=15)
         resp.raise_for_status()
         data = resp.json()
@@ -604,7 +808,7 @@ def _next_24h_max_kp_from_noaa_json() -> Optional[float]:
 def _next_24h_max_kp_from_3day() -> Optional[float]:
     """Compute the next-24h max Kp using the 3-day forecast breakdown (first day)."""
     try:
-        data = forecast_3day()
+        data = _three_day_forecast()
         breakdown = data.get("breakdown") or []
         if not breakdown:
             return None
@@ -624,7 +828,7 @@ def _next_24h_max_kp_from_3day() -> Optional[float]:
 def _next_24h_kp_detail_from_3day() -> Optional[Dict[str, Any]]:
     """Return details for the first-day max from the 3-day forecast: value, period, and day."""
     try:
-        data = forecast_3day()
+        data = _three_day_forecast()
         breakdown = data.get("breakdown") or []
         days = data.get("days") or []
         if not breakdown or not days:
@@ -671,11 +875,7 @@ def _compute_incident_probability(kp: float, shielding: str, years_in_orbit: int
     try:
         kp = max(0.0, min(9.0, float(kp)))
         base = 1.0 / (1.0 + math.exp(-1.5 * (kp - 7.0)))
-        s = (shielding or "").lower()
-        if "hardened" in s:
-            base *= 0.55
-        elif "light" in s or "legacy" in s:
-            base *= 1.35
+        base *= shielding_multiplier(shielding)
         years = max(0, int(years_in_orbit))
         base *= (1.0 + 0.015 * years)
         return max(0.0, min(1.0, base))
@@ -683,15 +883,116 @@ def _compute_incident_probability(kp: float, shielding: str, years_in_orbit: int
         return 0.0
 
 
+def _portfolio_assessment_fallback(portfolio: List[Dict[str, Any]], worst_case_kp: float,
+                                   kp_max_pmf: Optional[List[float]] = None) -> Dict[str, Any]:
+    """PML and recommendation without the CRO agent: over the fused Kp distribution when available."""
+    bumped_kp = math.ceil(float(worst_case_kp) + 1.0)
+    risk_kp = min(bumped_kp, 9.0)
+    if kp_max_pmf is not None:
+        probability = portfolio_probability_over(kp_max_pmf)
+    else:
+        probability = 1.0 / (1.0 + math.exp(-1.5 * (risk_kp - 7)))
+    total_exposure = sum(float(item.get("value_millions", 0.0)) for item in portfolio)
+    pml = total_exposure * probability
+    pct = (pml / total_exposure) * 100.0 if total_exposure > 0 else 0.0
+    rec = recommendation_for_pml_pct(pct)
+    return {
+        "total_exposure_millions": round(total_exposure, 3),
+        "probable_maximum_loss_millions": round(pml, 3),
+        "strategic_recommendation": rec,
+        "reasoning": (
+            f"Fallback computation over the fused Kp distribution, probability={probability:.4f}"
+            if kp_max_pmf is not None
+            else f"Fallback computation with risk_kp={risk_kp}, probability={probability:.4f}"
+        )
+    }
+
+
+@app.post("/api/quote")
+def quote(body: NewPolicy):
+    """Deterministic quote from the precomputed tables for the current forecast snapshot."""
+    portfolio, portfolio_ver = get_portfolio_store().current()
+    if not portfolio:
+        raise HTTPException(status_code=400, detail="Portfolio data is missing or empty.")
+    _roll_kp_fusion()
+    tables = quote_store.current(portfolio, portfolio_ver)
+    if tables is None:
+        raise HTTPException(status_code=503, detail="No Kp forecast ingested yet.")
+    return dict(
+        tables.quote(body.asset_value_millions, body.shielding_level, body.years_in_orbit, body.adjustment_factor),
+        portfolio_assessment=tables.portfolio,
+    )
+
+
+@app.get("/api/quote-tables")
+def quote_tables():
+    """The precomputed incident-probability table, portfolio tier and recommendation ladder."""
+    _roll_kp_fusion()
+    tables = quote_store.current(*get_portfolio_store().current())
+    if tables is None:
+        raise HTTPException(status_code=503, detail="No Kp forecast ingested yet.")
+    return tables.summary()
+
+
+@app.post("/api/fleet-risk")
+def fleet_risk(body: FleetRiskRequest):
+    """Re-underwrite many portfolio assets with batched risk-assessment prompts (one per chunk, not per asset)."""
+    if not os.getenv("GEMINI_API_KEY"):
+        raise HTTPException(status_code=500, detail="GEMINI_API_KEY not configured")
+
+    portfolio, portfolio_ver = get_portfolio_store().current()
+    assets = portfolio
+    if body.asset_ids is not None:
+        wanted = set(body.asset_ids)
+        assets = [a for a in portfolio if str(a.get("id")) in wanted]
+        unknown = wanted - {str(a.get("id")) for a in assets}
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown asset ids: {sorted(unknown)}")
+    if not assets:
+        raise HTTPException(status_code=400, detail="Portfolio data is missing or empty.")
+
+    _roll_kp_fusion()
+    kp_dist_entry = snapshot.get("kp_distribution")
+    kp_max_pmf = kp_dist_entry.value["next_24h_max"]["pmf"] if kp_dist_entry is not None else None
+    worst_case_kp = body.worst_case_kp
+    if worst_case_kp is None and kp_dist_entry is not None:
+        worst_case_kp = kp_dist_entry.value["next_24h_max"]["p90"]
+    if worst_case_kp is None:
+        d = _next_24h_kp_detail_from_3day()
+        worst_case_kp = d.get("value") if d is not None else None
+    if worst_case_kp is None:
+        raise HTTPException(status_code=503, detail="No Kp forecast available.")
+
+    from crewai import LLM
+
+    from risk_batch import assess_fleet
+    from llm_limiter import install_llm_limiter
+
+    llm = LLM(model="gemini/gemini-2.5-flash", temperature=0.2, api_key=os.getenv("GEMINI_API_KEY"))
+    install_llm_limiter()
+    # Only integrate the fused distribution for deterministic fills when the Kp came from it.
+    pmf = kp_max_pmf if body.worst_case_kp is None else None
+    with llm_deadline(RUN_LLM_DEADLINE_SECONDS) as llm_scope:
+        result = assess_fleet(llm.call, float(worst_case_kp), body.real_time_context, assets, kp_pmf=pmf)
+    result.update(portfolio_version=portfolio_ver, degraded=llm_scope.reasons or None)
+    return result
+
+
 @app.post("/api/run")
 def run_full_workflow(body: NewPolicy):
     if not os.getenv("GEMINI_API_KEY"):
         raise HTTPException(status_code=500, detail="GEMINI_API_KEY not configured")
 
-    portfolio = load_portfolio_from_file()
+    portfolio, portfolio_ver = get_portfolio_store().current()
     if not portfolio:
         raise HTTPException(status_code=400, detail="Portfolio data is missing or empty.")
 
+    # Identical concurrent requests share one crew run; results are reused until the next forecast issuance.
+    _roll_kp_fusion()
+    return run_cache.run(body.model_dump(), portfolio_ver, lambda: _run_full_workflow(body, portfolio, portfolio_ver))
+
+
+def _run_full_workflow(body: NewPolicy, portfolio: List[Dict[str, Any]], portfolio_ver: Optional[str] = None) -> Dict[str, Any]:
     setup = build_crew()
     crew = setup["crew"]
     data_task = setup["data_task"]
@@ -707,10 +1008,14 @@ def run_full_workflow(body: NewPolicy):
         "portfolio": portfolio,
     }
 
-    try:
-        result = crew.kickoff(inputs=inputs)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Workflow error: {e}")
+    # Every LLM call in the crew shares one deadline; a refused call degrades to the deterministic paths below.
+    with llm_deadline(RUN_LLM_DEADLINE_SECONDS) as llm_scope:
+        try:
+            result = crew.kickoff(inputs=inputs)
+        except Exception as e:
+            if not llm_scope.degraded:
+                raise HTTPException(status_code=500, detail=f"Workflow error: {e}")
+            result = None
 
     # Parse intermediate outputs where possible
     worst_case_kp = None
@@ -719,12 +1024,41 @@ def run_full_workflow(body: NewPolicy):
     pricing_result = None
 
     kp_detail = None
+    kp_degraded: List[str] = []
+    # Fused next-24h max-Kp distribution; risk fallbacks integrate over it instead of a point max.
+    kp_dist_entry = snapshot.get("kp_distribution")
+    kp_max_pmf = kp_dist_entry.value["next_24h_max"]["pmf"] if kp_dist_entry is not None else None
+    stale_fusion = None
     try:
-        # Preferred: use official 3-day forecast (first day) for next-24h Kp
-        d = _next_24h_kp_detail_from_3day()
-        if d is not None:
-            worst_case_kp = d.get("value")
-            kp_detail = {"source": "3-day-forecast", "period": d.get("period"), "day": d.get("day")}
+        # Preferred: the precomputed fused distribution (reported point value is its p90)
+        if kp_dist_entry is not None:
+            dist = kp_dist_entry.value
+            worst = dist["next_24h_max"]
+            fusion_detail = {
+                "source": "kp-fusion",
+                "mean": worst["mean"],
+                "p50": worst["p50"],
+                "p90": worst["p90"],
+                "p_exceed": worst["p_exceed"],
+                "sources": dist["sources_used"],
+                "anchor": dist.get("anchor"),
+                "stale": bool(dist.get("stale")),
+                "snapshot_digest": kp_dist_entry.digest,
+            }
+            if fusion_detail["stale"]:
+                # Every NOAA input predates the clock; try a live read first and keep this as a last resort.
+                stale_fusion = fusion_detail
+                kp_max_pmf = None
+            else:
+                worst_case_kp = worst["p90"]
+                kp_detail = fusion_detail
+
+        # Next: official 3-day forecast (first day) for next-24h Kp; a stale fusion means it is stale too
+        if worst_case_kp is None and stale_fusion is None:
+            d = _next_24h_kp_detail_from_3day()
+            if d is not None:
+                worst_case_kp = d.get("value")
+                kp_detail = {"source": "3-day-forecast", "period": d.get("period"), "day": d.get("day")}
 
         # Fallback: official JSON forecast API
         if worst_case_kp is None:
@@ -733,6 +1067,13 @@ def run_full_workflow(body: NewPolicy):
                 worst_case_kp = fallback
                 kp_detail = {"source": "noaa-json-forecast"}
 
+        # Nothing fresher: price off the stale distribution, but say so
+        if worst_case_kp is None and stale_fusion is not None:
+            worst_case_kp = stale_fusion["p90"]
+            kp_detail = stale_fusion
+            kp_max_pmf = kp_dist_entry.value["next_24h_max"]["pmf"]
+            kp_degraded.append(f"Kp forecast is stale (fused distribution anchored at {stale_fusion['anchor']})")
+
         # Last resort: parse Data Agent output
         if worst_case_kp is None and data_task.output and getattr(data_task.output, "raw", None):
             raw_str = data_task.output.raw
@@ -784,28 +1125,7 @@ def run_full_workflow(body: NewPolicy):
     # Deterministic fallback for portfolio assessment if JSON missing
     if portfolio_assessment is None and worst_case_kp is not None and portfolio:
         try:
-            bumped_kp = math.ceil(float(worst_case_kp) + 1.0)
-            risk_kp = min(bumped_kp, 9.0)
-            probability = 1.0 / (1.0 + math.exp(-1.5 * (risk_kp - 7)))
-            total_exposure = sum(float(item.get("value_millions", 0.0)) for item in portfolio)
-            pml = sum(float(item.get("value_millions", 0.0)) * probability for item in portfolio)
-            pct = (pml / total_exposure) * 100.0 if total_exposure > 0 else 0.0
-            if pct < 3.0:
-                rec = "Continue Writing New Policies"
-            elif pct < 8.0:
-                rec = "Apply Moderate Risk Surcharge"
-            elif pct < 15.0:
-                rec = "Apply High Risk Surcharge"
-            elif pct < 25.0:
-                rec = "Urgent Reinsurance Required"
-            else:
-                rec = "Temporarily Halt New Policies"
-            portfolio_assessment = {
-                "total_exposure_millions": round(total_exposure, 3),
-                "probable_maximum_loss_millions": round(pml, 3),
-                "strategic_recommendation": rec,
-                "reasoning": f"Fallback computation with risk_kp={risk_kp}, probability={probability:.4f}"
-            }
+            portfolio_assessment = _portfolio_assessment_fallback(portfolio, worst_case_kp, kp_max_pmf)
         except Exception:
             pass
 
@@ -819,6 +1139,8 @@ def run_full_workflow(body: NewPolicy):
         except Exception:
             parsed_prob = None
 
+        if parsed_prob is None and kp_max_pmf is not None:
+            parsed_prob = incident_probability_over(kp_max_pmf, body.shielding_level, body.years_in_orbit)
         if parsed_prob is None and worst_case_kp is not None:
             parsed_prob = _compute_incident_probability(
                 kp=worst_case_kp,
@@ -836,8 +1158,19 @@ def run_full_workflow(body: NewPolicy):
                 "confidence": 0.7,
             }
 
+    # LLM unavailable or out of time: price from the precomputed tables instead of waiting.
+    degraded_pricing = False
+    if llm_scope.degraded and not (pricing_result or {}).get("final_premium_usd"):
+        tables = quote_store.current(portfolio, portfolio_ver)
+        if tables is not None:
+            pricing_result = dict(
+                tables.quote(body.asset_value_millions, body.shielding_level, body.years_in_orbit, body.adjustment_factor),
+                source="quote-tables",
+            )
+            degraded_pricing = True
+
     # Apply business logic to pricing result if present
-    if pricing_result and portfolio_assessment:
+    if pricing_result and portfolio_assessment and not degraded_pricing:
         asset_value_usd = body.asset_value_millions * 1_000_000
         strategic_rec = portfolio_assessment.get("strategic_recommendation", "Continue Writing New Policies")
         
@@ -885,6 +1218,7 @@ def run_full_workflow(body: NewPolicy):
         "individual_risk": individual_risk,
         "portfolio_assessment": portfolio_assessment,
         "pricing_result": pricing_result,
+        "degraded": llm_scope.reasons + kp_degraded or None,
     }
 
 
@@ -894,7 +1228,7 @@ def run_historical_workflow(body: HistoricalPolicy):
     if not os.getenv("GEMINI_API_KEY"):
         raise HTTPException(status_code=500, detail="GEMINI_API_KEY not configured")
 
-    portfolio = load_portfolio_from_file()
+    portfolio = get_portfolio_store().items()
     if not portfolio:
         raise HTTPException(status_code=400, detail="Portfolio data is missing or empty.")
 
@@ -1049,4 +1383,36 @@ def run_historical_workflow(body: HistoricalPolicy):
     }
 
 
+@app.post("/api/stress-test")
+def stress_test(body: StressTestRequest):
+    """Price the whole portfolio against many historical events in one vectorized pass.
+
+    Either pass explicit `events` (each with a Kp) or a `threshold` to use every
+    historical storm episode at that level (optionally within start/end).
+    Returns an event x segment expected-loss matrix, cached per portfolio version.
+    """
+    portfolio, portfolio_ver = get_portfolio_store().current()
+    if not portfolio:
+        raise HTTPException(status_code=400, detail="Portfolio data is missing or empty.")
+
+    if body.events:
+        events = [e.model_dump() for e in body.events]
+    elif body.threshold is not None:
+        if not (0.0 <= body.threshold <= 9.0):
+            raise HTTPException(status_code=400, detail="threshold must be within [0, 9]")
+        try:
+            events = episodes_as_events(body.threshold, body.start, body.end, body.min_duration)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        raise HTTPException(status_code=400, detail="Provide either 'events' or 'threshold'.")
+    if not events:
+        raise HTTPException(status_code=404, detail="No historical events matched the request.")
+
+    try:
+        return stress_cache.run(portfolio, events, body.segment_by, portfolio_ver)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # Run with: uvicorn api_server:app --reload
@@ -0,0 +1,183 @@
+"""
+Inference benchmarks for every registered model and backend.
+
+    python benchmark_models.py                          # all models, all backends
+    python benchmark_models.py --models dst-lstm --output bench.json
+    python benchmark_models.py --compare baseline.json  # exit 1 on regression
+
+Each (model, backend) pair runs in a fresh subprocess. This keeps cold-load
+time and peak RSS honest: there is no warm import cache and no memory left
+over from other runs. Results are written as JSON for regression tracking.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import subprocess
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+BATCH_SIZES = (1, 8, 64, 256, 1024, 4096)
+LATENCY_ITERATIONS = 500
+WARMUP_ITERATIONS = 20
+# Window length used for models that accept any length (Dst).
+DEFAULT_STEPS = 60
+# Relative slowdown tolerated by --compare before a metric counts as a regression.
+DEFAULT_TOLERANCE = 0.25
+
+
+def percentiles(samples_s: Sequence[float]) -> Dict[str, float]:
+    ms = np.asarray(samples_s, dtype=np.float64) * 1000.0
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+    }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0, 1)
+
+
+def benchmark_handler(handler, steps: int, n_features: int, batch_sizes: Sequence[int] = BATCH_SIZES,
+                      iterations: int = LATENCY_ITERATIONS, seed: int = 0) -> Dict[str, Any]:
+    """Single-window latency percentiles and per-batch-size throughput for a loaded handler."""
+    rng = np.random.default_rng(seed)
+    window = rng.normal(size=(1, steps, n_features)).astype(np.float32)
+    for _ in range(WARMUP_ITERATIONS):
+        handler.predict_batch(window)
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        handler.predict_batch(window)
+        samples.append(time.perf_counter() - started)
+
+    throughput = {}
+    for batch in batch_sizes:
+        windows = rng.normal(size=(batch, steps, n_features)).astype(np.float32)
+        handler.predict_batch(windows)  # warm the shape
+        repeats = max(1, min(20, 4096 // batch))
+        started = time.perf_counter()
+        for _ in range(repeats):
+            handler.predict_batch(windows)
+        elapsed = (time.perf_counter() - started) / repeats
+        throughput[str(batch)] = {
+            "seconds_per_batch": round(elapsed, 6),
+            "windows_per_second": round(batch / elapsed, 1),
+        }
+    return {"single_window": percentiles(samples), "throughput": throughput}
+
+
+def run_one(key: str, backend: str, manifest_path: str, iterations: int) -> Dict[str, Any]:
+    """Child-process body: cold-load one model on one backend and benchmark it."""
+    os.environ["MODEL_BACKEND"] = backend
+    started = time.perf_counter()
+    from model_registry import LOADERS, Manifest
+
+    spec = Manifest.from_file(manifest_path).resolve(key)
+    handler = LOADERS[spec.framework](spec, spec.runtime_path)
+    load_seconds = time.perf_counter() - started
+    result = {"model": spec.key, "backend": spec.active_backend, "load_seconds": round(load_seconds, 3)}
+    if not handler.ready:
+        return dict(result, error="model failed to load")
+    result.update(benchmark_handler(handler, spec.n_steps or DEFAULT_STEPS, spec.n_features, iterations=iterations))
+    result["heavy_modules"] = sorted(m for m in ("tensorflow", "torch", "onnxruntime") if m in sys.modules)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def _spawn(key: str, backend: str, manifest_path: str, iterations: int) -> Dict[str, Any]:
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", key, backend,
+           "--manifest", manifest_path, "--iterations", str(iterations)]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or ["no output"]
+        return {"model": key, "backend": backend, "error": tail[0]}
+    return json.loads(lines[-1])
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Regressions in single-window p50 latency or per-batch throughput beyond ``tolerance``."""
+    previous = {(r["model"], r["backend"]): r for r in baseline.get("results", []) if "error" not in r}
+    regressions = []
+    for r in current.get("results", []):
+        base = previous.get((r["model"], r["backend"]))
+        if base is None or "error" in r:
+            continue
+        label = f"{r['model']} [{r['backend']}]"
+        p50, base_p50 = r["single_window"]["p50_ms"], base["single_window"]["p50_ms"]
+        if p50 > base_p50 * (1 + tolerance):
+            regressions.append(f"{label}: single-window p50 {base_p50}ms -> {p50}ms")
+        for batch, stats in r["throughput"].items():
+            base_stats = base["throughput"].get(batch)
+            if base_stats and stats["windows_per_second"] < base_stats["windows_per_second"] / (1 + tolerance):
+                regressions.append(
+                    f"{label}: batch {batch} throughput {base_stats['windows_per_second']} -> "
+                    f"{stats['windows_per_second']} windows/s"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from model_registry import MANIFEST_PATH, Manifest
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--models", nargs="*", help="Model names or name@version (default: all)")
+    parser.add_argument("--backends", nargs="*", default=["native", "onnx"])
+    parser.add_argument("--iterations", type=int, default=LATENCY_ITERATIONS)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--child", nargs=2, metavar=("MODEL", "BACKEND"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_one(args.child[0], args.child[1], args.manifest, args.iterations)))
+        return 0
+
+    manifest = Manifest.from_file(args.manifest)
+    specs = [manifest.resolve(m) for m in args.models] if args.models else list(manifest.specs.values())
+    results = []
+    for spec in specs:
+        for backend in args.backends:
+            if backend == "onnx" and not (spec.onnx_path and os.path.exists(spec.onnx_path)):
+                continue  # Not exported yet.
+            result = _spawn(spec.key, backend, args.manifest, args.iterations)
+            print(json.dumps(result))
+            results.append(result)
+
+    report = {"environment": environment(), "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
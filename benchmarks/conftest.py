@@ -0,0 +1,70 @@
+"""
+Micro-benchmarks for the hot pure-Python paths (pytest-benchmark). They live
+outside tests/ so the regular suite stays fast.
+
+    pip install pytest-benchmark
+    python -m pytest benchmarks/ --benchmark-autosave              # save a run under .benchmarks/
+    python -m pytest benchmarks/ --benchmark-compare \
+        --benchmark-compare-fail=mean:25%                          # fail if >25% slower than the last save
+    BENCH_PORTFOLIO_SIZES=10,10000 python -m pytest benchmarks/    # skip the 1M-asset book
+
+Saved runs are named after the commit, so ``--benchmark-compare=0001`` or
+``pytest-benchmark compare`` tracks a path across commits.
+"""
+import os
+import sys
+import json
+import random
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+FIXTURES = os.path.join(ROOT, "fixtures", "swpc")
+
+# Synthetic book sizes; override with e.g. BENCH_PORTFOLIO_SIZES=10,10000 for a quick run.
+PORTFOLIO_SIZES = [int(n) for n in os.getenv("BENCH_PORTFOLIO_SIZES", "10,10000,1000000").split(",")]
+
+ORBITS = ("GEO", "MEO", "LEO", "HEO")
+SHIELDING = ("Hardened", "Standard", "Light/Legacy")
+MISSIONS = ("Communications", "Earth Observation", "Navigation", "Science")
+
+
+def synthetic_portfolio(n: int, seed: int = 0):
+    """``n`` assets with the same fields and value ranges as portfolio_data.json."""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"Sat-{i:07d}",
+            "value_millions": round(rng.uniform(20, 600), 1),
+            "age": rng.randint(0, 18),
+            "shielding": rng.choice(SHIELDING),
+            "orbit_type": rng.choice(ORBITS),
+            "primary_mission": rng.choice(MISSIONS),
+            "premium": round(rng.uniform(5_000, 250_000), 2),
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(scope="session")
+def fixture_text():
+    def read(name: str) -> str:
+        with open(os.path.join(FIXTURES, name), "r") as f:
+            return f.read()
+    return read
+
+
+@pytest.fixture(scope="session", params=PORTFOLIO_SIZES, ids=lambda n: f"{n}-assets")
+def portfolio(request):
+    return synthetic_portfolio(request.param)
+
+
+@pytest.fixture(scope="session")
+def portfolio_file(portfolio, tmp_path_factory):
+    path = tmp_path_factory.mktemp("portfolio") / f"portfolio-{len(portfolio)}.json"
+    with open(path, "w") as f:
+        json.dump(portfolio, f)
+    return str(path)
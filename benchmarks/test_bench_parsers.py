@@ -0,0 +1,29 @@
+import json
+
+from api_server import _parse_kp_token
+from noaa_feeds import parse_3day_forecast, parse_daily_indices, parse_kp_forecast
+
+KP_TOKENS = ["0", "1-", "2o", "3+", "4-", "5", "5+", "6-", "7o", "8+", "9-", "9", "4.33", "bad", "−2"]
+
+
+def test_parse_kp_token(benchmark):
+    parsed = benchmark(lambda: [_parse_kp_token(t) for t in KP_TOKENS])
+    assert parsed[3] == 3 + 1 / 3
+
+
+def test_parse_3day_forecast(benchmark, fixture_text):
+    text = fixture_text("3-day-forecast.txt")
+    forecast = benchmark(parse_3day_forecast, text)
+    assert len(forecast["breakdown"]) == 8
+
+
+def test_parse_daily_indices(benchmark, fixture_text):
+    text = fixture_text("daily-geomagnetic-indices.txt")
+    days = benchmark(parse_daily_indices, text)
+    assert len(days) == 30
+
+
+def test_parse_kp_forecast(benchmark, fixture_text):
+    rows = json.loads(fixture_text("noaa-planetary-k-index-forecast.json"))
+    series = benchmark(parse_kp_forecast, rows)
+    assert series
@@ -0,0 +1,35 @@
+from api_server import _portfolio_assessment_fallback, load_portfolio_from_file
+from kp_fusion import discretized_normal
+from portfolio_store import PortfolioStore
+from stress_test import PortfolioArrays, run_stress_test
+
+KP_PMF = discretized_normal(5.0, 1.0).tolist()
+EVENTS = [{"name": f"event-{k}", "kp": k} for k in (5.0, 6.0, 7.0, 8.0, 9.0)]
+
+
+def test_pml_fallback(benchmark, portfolio):
+    assessment = benchmark(_portfolio_assessment_fallback, portfolio, 6.33, KP_PMF)
+    assert assessment["total_exposure_millions"] > 0
+
+
+def test_portfolio_arrays(benchmark, portfolio):
+    arrays = benchmark(PortfolioArrays, portfolio)
+    assert len(arrays.values) == len(portfolio)
+
+
+def test_stress_test_aggregation(benchmark, portfolio):
+    arrays = PortfolioArrays(portfolio)
+    result = benchmark(run_stress_test, arrays, EVENTS, "orbit_type")
+    assert len(result["events"]) == len(EVENTS)
+
+
+def test_load_portfolio_from_file(benchmark, portfolio_file, portfolio):
+    items = benchmark.pedantic(load_portfolio_from_file, args=(portfolio_file,), rounds=3, iterations=1)
+    assert len(items) == len(portfolio)
+
+
+def test_portfolio_store_unchanged_file(benchmark, portfolio_file, portfolio):
+    store = PortfolioStore(portfolio_file)
+    store.current()
+    items, _ = benchmark(store.current)
+    assert len(items) == len(portfolio)
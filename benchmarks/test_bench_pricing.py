@@ -0,0 +1,28 @@
+from api_server import _compute_incident_probability
+from kp_fusion import discretized_normal
+from quote_tables import QuoteTables, incident_probability_over
+
+from conftest import synthetic_portfolio
+
+KP_PMF = discretized_normal(5.0, 1.0).tolist()
+
+
+def test_compute_incident_probability(benchmark):
+    p = benchmark(_compute_incident_probability, 7.33, "Light/Legacy", 12)
+    assert 0.0 < p <= 1.0
+
+
+def test_incident_probability_over_distribution(benchmark):
+    p = benchmark(incident_probability_over, KP_PMF, "Standard", 8)
+    assert 0.0 < p < 1.0
+
+
+def test_quote_from_tables(benchmark):
+    tables = QuoteTables(KP_PMF, synthetic_portfolio(10), snapshot_digest="bench")
+    quote = benchmark(tables.quote, 333.3, "Standard", 7.5)
+    assert quote["policy_status"] in ("APPROVED", "MODIFIED", "REJECTED")
+
+
+def test_quote_tables_build(benchmark, portfolio):
+    tables = benchmark(QuoteTables, KP_PMF, portfolio, 1)
+    assert tables.portfolio["total_exposure_millions"] > 0
@@ -0,0 +1,249 @@
+"""
+Record/replay cassettes for the crew's external calls (Gemini via LLM.call,
+web search via SerperDevTool).
+
+    CASSETTE_MODE=record uvicorn api_server:app     # call for real, store every /api/run response
+    CASSETTE_MODE=replay uvicorn api_server:app     # serve stored responses, never call out
+    CASSETTE_MODE=auto   ...                        # replay hits, record misses
+    CASSETTE_MODE=stub   ...                        # canned answers, no cassette file needed
+
+The API installs cassettes when it builds the crew, and tests/conftest.py
+installs them for the test session, where the mode defaults to stub.
+
+Interactions are keyed by a normalized request: the model (or tool) name plus
+the prompt or query, with whitespace collapsed and timestamps masked so
+re-issued forecasts don't change the key. In replay mode a miss raises
+CassetteMiss instead of calling out, and installing a replay cassette whose
+file does not exist fails immediately. CASSETTE_LATENCY sets the simulated
+latency: milliseconds, or "recorded" to replay each call's recorded duration.
+
+Stub mode answers every crew prompt with a fixed, well-formed final answer
+for the agent it addresses (see canned_response), which is enough to drive
+/api/run end to end for load tests without a recording.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import functools
+import threading
+from typing import Any, Callable, Dict, Optional
+
+CASSETTE_MODES = ("off", "record", "replay", "auto", "stub")
+# Defaults; the CASSETTE_* environment variables are read at install time so .env files apply.
+DEFAULT_CASSETTE_DIR = "cassettes"
+DEFAULT_CASSETTE_NAME = "crew"
+
+_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?Z?|\d{4} [A-Z][a-z]{2} \d{1,2} \d{4} UTC")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class CassetteMiss(LookupError):
+    """A replayed request that was never recorded."""
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", _TIMESTAMP.sub("<ts>", text)).strip()
+
+
+def normalize_messages(messages: Any) -> Any:
+    """LLM.call accepts a prompt string or a list of {role, content} dicts."""
+    if isinstance(messages, str):
+        return normalize_text(messages)
+    if isinstance(messages, list):
+        return [
+            {"role": m.get("role"), "content": normalize_text(str(m.get("content", "")))} if isinstance(m, dict)
+            else normalize_text(str(m))
+            for m in messages
+        ]
+    return normalize_text(str(messages))
+
+
+# Crew agent role (as in "You are <role>.") -> final answer to a prompt addressed to it.
+_STUB_INCIDENT_PROBABILITY = 0.02
+_ASSET_VALUE = re.compile(r"asset_value_millions:\s*([0-9]*\.?[0-9]+)")
+
+
+def _stub_pricing_answer(text: str) -> str:
+    m = _ASSET_VALUE.search(text)
+    premium = float(m.group(1)) * 1_000_000 * _STUB_INCIDENT_PROBABILITY if m else 0.0
+    return (f"Base premium ${premium:,.2f}; no portfolio-risk surcharge applied "
+            f"(Continue Writing New Policies). Final Premium: ${premium:,.2f}")
+
+
+_STUB_ANSWERS: Dict[str, Callable[[str], str]] = {
+    "Space Weather Data Analyst": lambda text: json.dumps(
+        {"worst_case_kp": 5.0, "real_time_context": "Stubbed search: no active space weather alerts."}),
+    "GEO Satellite Actuarial Analyst": lambda text: json.dumps(
+        {"incident_probability": _STUB_INCIDENT_PROBABILITY, "risk_category": "Moderate"}),
+    "Chief Risk Officer": lambda text: json.dumps(
+        {"total_exposure_millions": 0.0, "probable_maximum_loss_millions": 0.0,
+         "strategic_recommendation": "Continue Writing New Policies"}),
+    "Pricing Specialist": _stub_pricing_answer,
+}
+
+
+def canned_response(kind: str, request: Dict[str, Any]) -> Any:
+    """Deterministic stand-in for an LLM or search response; same request, same answer."""
+    if kind == "serper":
+        return {"searchParameters": {"q": request.get("query")}, "organic": []}
+    messages = request.get("messages")
+    text = " ".join(m.get("content", "") if isinstance(m, dict) else str(m) for m in messages) \
+        if isinstance(messages, list) else str(messages)
+    for role, answer in _STUB_ANSWERS.items():
+        if f"You are {role}" in text:
+            return f"Thought: I now know the final answer\nFinal Answer: {answer(text)}"
+    return "Thought: I now know the final answer\nFinal Answer: {}"
+
+
+def request_key(kind: str, request: Dict[str, Any]) -> str:
+    canonical = json.dumps({"kind": kind, **request}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:24]
+
+
+class Cassette:
+    """One JSON file of request -> response interactions."""
+
+    def __init__(self, path: str, mode: str = "replay", latency: str = "0"):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"CASSETTE_MODE must be one of {list(CASSETTE_MODES)}, got '{mode}'")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, Dict[str, Any]] = {}
+        if mode != "stub" and os.path.exists(path):
+            with open(path, "r") as f:
+                self._interactions = json.load(f).get("interactions", {})
+
+    def __len__(self) -> int:
+        return len(self._interactions)
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": 1, "interactions": self._interactions}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp, self.path)
+
+    def _replay_delay(self, interaction: Optional[Dict[str, Any]]) -> float:
+        if self.latency == "recorded":
+            return float((interaction or {}).get("duration_s", 0.0))
+        return float(self.latency or 0) / 1000.0
+
+    def play(self, kind: str, request: Dict[str, Any], call: Callable[[], Any]) -> Any:
+        """Serve ``request`` from the cassette, or run ``call`` and record it, depending on mode."""
+        if self.mode == "stub":
+            with self._lock:
+                self.hits += 1
+            delay = self._replay_delay(None)
+            if delay > 0:
+                time.sleep(delay)
+            return canned_response(kind, request)
+        key = request_key(kind, request)
+        with self._lock:
+            interaction = self._interactions.get(key)
+        if interaction is not None and self.mode in ("replay", "auto"):
+            with self._lock:
+                self.hits += 1
+            delay = self._replay_delay(interaction)
+            if delay > 0:
+                time.sleep(delay)
+            return interaction["response"]
+        if self.mode == "replay":
+            with self._lock:
+                self.misses += 1
+            preview = json.dumps(request, default=str)[:200]
+            raise CassetteMiss(f"No recorded {kind} interaction {key} in {self.path}: {preview}")
+
+        started = time.perf_counter()
+        response = call()
+        duration = time.perf_counter() - started
+        try:
+            json.dumps(response)
+        except (TypeError, ValueError):
+            return response  # Tool-call objects and the like are passed through unrecorded.
+        with self._lock:
+            self._interactions[key] = {
+                "kind": kind,
+                "request": request,
+                "response": response,
+                "duration_s": round(duration, 3),
+            }
+            self.recorded += 1
+            self._save()
+        return response
+
+
+def patch_method(cls: type, name: str, kind: str, cassette: Cassette,
+                 request_of: Callable[..., Dict[str, Any]]) -> None:
+    """Route ``cls.name`` through ``cassette``; ``request_of`` builds the normalized request from the call."""
+    original = getattr(cls, name)
+    if getattr(original, "__cassette__", None) is not None:
+        original = original.__wrapped__
+
+    @functools.wraps(original)
+    def wrapper(self, *args, **kwargs):
+        request = request_of(self, *args, **kwargs)
+        return cassette.play(kind, request, lambda: original(self, *args, **kwargs))
+
+    wrapper.__cassette__ = cassette
+    setattr(cls, name, wrapper)
+
+
+def _llm_request(llm, messages, tools=None, *args, **kwargs) -> Dict[str, Any]:
+    names = sorted(
+        (t.get("function", {}).get("name") or t.get("name") or "") if isinstance(t, dict) else str(t)
+        for t in (tools or [])
+    )
+    return {"model": getattr(llm, "model", None), "messages": normalize_messages(messages), "tools": names}
+
+
+def _serper_request(tool, *args, **kwargs) -> Dict[str, Any]:
+    query = kwargs.get("search_query", args[0] if args else "")
+    extra = {k: v for k, v in kwargs.items() if k != "search_query"}
+    return {"tool": "serper", "query": normalize_text(str(query)), "options": extra,
+            "n_results": getattr(tool, "n_results", None), "country": getattr(tool, "country", None)}
+
+
+_active: Optional[Cassette] = None
+_install_lock = threading.Lock()
+
+
+def install_cassettes(mode: Optional[str] = None, directory: Optional[str] = None,
+                      name: Optional[str] = None) -> Optional[Cassette]:
+    """
+    Patch LLM.call and SerperDevTool._run to go through a cassette. Returns
+    None (and patches nothing) when the mode is "off". Replay mode raises
+    FileNotFoundError when the cassette was never recorded, since every call
+    would miss. Safe to call repeatedly.
+    """
+    global _active
+    mode = (mode or os.getenv("CASSETTE_MODE", "off")).lower()
+    if mode == "off":
+        return None
+    directory = directory or os.getenv("CASSETTE_DIR", DEFAULT_CASSETTE_DIR)
+    path = os.path.join(directory, f"{name or os.getenv('CASSETTE_NAME', DEFAULT_CASSETTE_NAME)}.json")
+    if mode == "replay" and not os.path.exists(path):
+        raise FileNotFoundError(f"CASSETTE_MODE=replay but {path} does not exist; record it first or use CASSETTE_MODE=stub")
+    with _install_lock:
+        if _active is not None and _active.path == path and _active.mode == mode:
+            return _active
+        cassette = Cassette(path, mode, os.getenv("CASSETTE_LATENCY", "0"))
+        from crewai import LLM
+
+        patch_method(LLM, "call", "llm", cassette, _llm_request)
+        try:
+            from crewai_tools import SerperDevTool
+        except ImportError:
+            SerperDevTool = None
+        if SerperDevTool is not None:
+            patch_method(SerperDevTool, "_run", "serper", cassette, _serper_request)
+        _active = cassette
+        print("Cassettes: stub (canned answers)" if mode == "stub" else f"Cassettes: {mode} {path} ({len(cassette)} interactions)")
+    return cassette
@@ -0,0 +1,127 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from forecast_snapshot import ForecastSnapshot
+from noaa_feeds import summarize_kp_forecast
+
+# Dashboard field -> snapshot section it is built from (None: portfolio store only).
+DASHBOARD_FIELDS: Dict[str, Optional[str]] = {
+    "portfolio": None,
+    "kp_forecast": "noaa_kp_forecast",
+    "forecast_3day": "noaa_3day",
+    "daily_geomag": "noaa_daily_indices",
+    "kp_distribution": "kp_distribution",
+    "risk": "kp_distribution",
+}
+DEFAULT_HOURS = 72
+DEFAULT_DAYS = 14
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Comma-separated field names in canonical order; all fields when empty."""
+    if not fields:
+        return list(DASHBOARD_FIELDS)
+    wanted = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = wanted - set(DASHBOARD_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown dashboard fields {sorted(unknown)}; expected any of {list(DASHBOARD_FIELDS)}")
+    return [f for f in DASHBOARD_FIELDS if f in wanted]
+
+
+def sections_for(fields: Sequence[str]) -> List[str]:
+    return sorted({DASHBOARD_FIELDS[f] for f in fields if DASHBOARD_FIELDS[f]})
+
+
+def downsample_peaks(points: List[Dict[str, Any]], max_points: int, key: str = "kp") -> List[Dict[str, Any]]:
+    """
+    At most ``max_points`` points, keeping the highest ``key`` in each run of
+    consecutive points. Peaks are what matter on a Kp chart, so they survive.
+    """
+    if max_points <= 0 or len(points) <= max_points:
+        return points
+    out = []
+    n = len(points)
+    for b in range(max_points):
+        bucket = points[b * n // max_points:(b + 1) * n // max_points]
+        if bucket:
+            out.append(max(bucket, key=lambda p: p.get(key) if p.get(key) is not None else float("-inf")))
+    return out
+
+
+def compact_distribution(dist: Dict[str, Any], max_points: int = 0) -> Dict[str, Any]:
+    """The fused Kp distribution without per-bin pmfs or per-source detail."""
+    periods = [{k: p[k] for k in ("start", "end", "mean", "p50", "p90", "p_exceed")} for p in dist.get("periods", [])]
+    next_24h = {k: v for k, v in (dist.get("next_24h_max") or {}).items() if k != "pmf"}
+    return {
+        "anchor": dist.get("anchor"),
+        "stale": dist.get("stale"),
+        "sources_used": dist.get("sources_used"),
+        "periods": downsample_peaks(periods, max_points, key="p90"),
+        "next_24h_max": next_24h,
+    }
+
+
+def portfolio_summary(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    by_orbit: Dict[str, Dict[str, float]] = {}
+    for asset in items:
+        seg = by_orbit.setdefault(str(asset.get("orbit_type", "Unknown")), {"assets": 0, "value_millions": 0.0})
+        seg["assets"] += 1
+        seg["value_millions"] += float(asset.get("value_millions", 0.0) or 0.0)
+    return {
+        "assets": len(items),
+        "total_value_millions": round(sum(s["value_millions"] for s in by_orbit.values()), 3),
+        "total_premium": round(sum(float(a.get("premium", 0.0) or 0.0) for a in items), 2),
+        "by_orbit_type": by_orbit,
+    }
+
+
+def build_dashboard(
+    snapshot: ForecastSnapshot,
+    portfolio: List[Dict[str, Any]],
+    portfolio_ver: str,
+    fields: Sequence[str],
+    now: datetime,
+    hours: int = DEFAULT_HOURS,
+    days: int = DEFAULT_DAYS,
+    max_points: int = 0,
+    risk: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Landing-page payload from in-memory state only. A field whose source has
+    not been ingested yet is null and listed under ``missing``; nothing here
+    calls NOAA.
+    """
+    out: Dict[str, Any] = {"fields": list(fields), "missing": []}
+    digests: Dict[str, Any] = {}
+    for field in fields:
+        section = DASHBOARD_FIELDS[field]
+        entry = snapshot.get(section) if section else None
+        if section and entry is None:
+            out[field] = None
+            out["missing"].append(field)
+            continue
+        if section:
+            digests[field] = entry.digest
+
+        if field == "portfolio":
+            out[field] = {"items": portfolio, "summary": portfolio_summary(portfolio)}
+            digests[field] = portfolio_ver
+        elif field == "kp_forecast":
+            forecast = summarize_kp_forecast(entry.value["series"], hours, now)
+            forecast["series"] = downsample_peaks(forecast["series"], max_points)
+            out[field] = forecast
+        elif field == "forecast_3day":
+            out[field] = entry.value
+        elif field == "daily_geomag":
+            rows = entry.value["days"]
+            out[field] = {"days": rows[-days:] if days > 0 else rows}
+        elif field == "kp_distribution":
+            out[field] = compact_distribution(entry.value, max_points)
+        elif field == "risk":
+            if risk is None:
+                out[field] = None
+                out["missing"].append(field)
+            else:
+                out[field] = risk
+    out["digests"] = digests
+    return out
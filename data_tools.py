@@ -2,12 +2,7 @@ import requests
 import pandas as pd
 from datetime import datetime, timedelta
 from crewai.tools import BaseTool
-
-# Import the new LSTM handler (optional)
-try:
-    from lstm_model_handler import LSTMModelHandler  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    LSTMModelHandler = None
+from noaa_feeds import KP_FORECAST_PRODUCT, SWPC_BASE_URL
 
 # --- Tool 1: Direct NOAA Forecast ---
 class SpaceWeatherTools(BaseTool):
@@ -73,7 +68,7 @@ class SpaceWeatherTools(BaseTool):
         Fallback method that fetches directly from NOAA if the local API is unavailable.
         This maintains the old behavior as a backup.
         """
-        url = "https://services.swpc.noaa.gov/products/noaa-planetary-k-index-forecast.json"
+        url = f"{SWPC_BASE_URL}/{KP_FORECAST_PRODUCT}"
         try:
             response = requests.get(url)
             response.raise_for_status()
@@ -107,23 +102,90 @@ class LSTMForecastTool(BaseTool):
     description: str = (
         "An alternative forecasting tool that uses a pre-trained LSTM model. "
         "It requires a recent history of solar wind data (e.g., speed, density, temperature) "
-        "to predict the Kp index. Use this only if the primary NOAA tool fails or for comparison."
+        "to predict the Kp index. Use this only if the primary NOAA tool fails or for comparison. "
+        "When it reports the model as uncalibrated, its output is not Kp and must not be used "
+        "for risk scoring or pricing."
     )
     
-    def _run(self, recent_solar_wind_data: pd.DataFrame) -> str:
+    def _run(self, recent_solar_wind_data: pd.DataFrame | None = None) -> str:
         """
         The main execution method for the LSTM tool.
+        Without explicit data, it reports the latest nowcast published by the
+        solar wind ingestion poller instead of fetching anything per call.
         """
-        if LSTMModelHandler is None:
+        if recent_solar_wind_data is None:
+            from forecast_snapshot import snapshot
+
+            nowcast = snapshot.value("lstm_nowcast")
+            if not nowcast:
+                return "Error: No LSTM nowcast available yet from the solar wind feed."
+            if nowcast.get("calibrated") is False:
+                return (f"The LSTM model output is {nowcast['kp']:.2f} as of {nowcast['as_of']} UTC "
+                        "(uncalibrated: a relative indicator, not Kp; do not use it for risk scoring).")
+            return f"The custom LSTM model predicts a Kp index of: {nowcast['kp']:.2f} (as of {nowcast['as_of']} UTC)"
+
+        # Imported here: the handler pulls in TensorFlow, which only this tool needs.
+        try:
+            from lstm_model_handle import get_lstm_handler  # type: ignore
+            from model_registry import get_model_registry
+        except Exception:  # pragma: no cover - optional dependency
             return "Error: LSTM model handler not available."
-        handler = LSTMModelHandler()
-        if not getattr(handler, "model", None) or not getattr(handler, "scaler", None):
+        handler = get_lstm_handler()
+        calibrated = get_model_registry().default("kp").calibrated
+        if not handler.ready:
             return "Error: LSTM model is not available or could not be loaded."
         
         prediction = handler.predict(recent_solar_wind_data)
         
+        if prediction is not None and not calibrated:
+            return (f"The LSTM model output is {prediction:.2f} (uncalibrated: a relative indicator, "
+                    "not Kp; do not use it for risk scoring).")
         if prediction is not None:
             return f"The custom LSTM model predicts a Kp index of: {prediction:.2f}"
         else:
             return "Error: LSTM model failed to produce a prediction. Check input data format and model files."
 
+
+
+# --- Tool 3: Dst Forecasting (PyTorch LSTM) ---
+class DstForecastTool(BaseTool):
+    name: str = "Dst Index Forecasting Tool"
+    description: str = (
+        "Estimates the Disturbance storm-time (Dst) index from recent solar wind data using a "
+        "pre-trained PyTorch LSTM. The current model is UNCALIBRATED: its output is a relative "
+        "storm indicator, not nT, and must not be used for risk scoring or pricing."
+    )
+
+    def _run(self, recent_solar_wind_data: pd.DataFrame | None = None) -> str:
+        """
+        Predict Dst from the given window, or from the latest solar wind window
+        published by the ingestion poller when no data is passed.
+        """
+        try:
+            from dst_model_handle import get_dst_handler
+            from model_registry import get_model_registry
+        except Exception:  # pragma: no cover - optional dependency
+            return "Error: Dst model handler not available."
+        handler = get_dst_handler()
+        calibrated = get_model_registry().default("dst").calibrated
+        if not handler.ready:
+            return "Error: Dst model is not available or could not be loaded."
+
+        if recent_solar_wind_data is None:
+            from forecast_snapshot import snapshot
+
+            solar_wind = snapshot.value("solar_wind") or {}
+            if not solar_wind.get("window"):
+                return "Error: No solar wind data available yet for the Dst model."
+            window = solar_wind["window"]
+        else:
+            window = recent_solar_wind_data.to_numpy()
+
+        try:
+            dst = handler.predict(window)
+        except ValueError as e:
+            return f"Error: Dst model input rejected: {e}"
+        if not calibrated:
+            return (f"The Dst LSTM model output is {dst:.1f} (uncalibrated: a relative indicator, "
+                    "not nT; do not use it for risk scoring).")
+        return f"The Dst LSTM model predicts a Dst index of: {dst:.1f} nT"
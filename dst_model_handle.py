@@ -0,0 +1,187 @@
+import os
+import io
+import time
+import types
+import pickle
+import warnings
+
+import numpy as np
+
+from metrics import metrics
+from onnx_backend import OnnxModel, is_onnx_path
+
+# --- Constants ---
+DST_MODEL_PATH = os.path.join('models', 'dstpredict.pth')
+# Input features per time step (same five solar-wind parameters as the Kp LSTM).
+DST_N_FEATURES = 5
+# Intra-op threads for CPU inference. Small recurrent models gain nothing from
+# many threads and oversubscribe the box when several API workers run.
+DST_TORCH_THREADS = int(os.getenv("DST_TORCH_THREADS", "1"))
+DEFAULT_BATCH_SIZE = 1024
+
+
+class _LegacyModule:
+    """Attribute bag standing in for torch modules pickled by an old torch version."""
+
+    dump_patches = False  # read by torch's legacy loader when comparing module source
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+# dstpredict.pth is a whole-module pickle saved from a script (class `__main__.lstm`)
+# under torch 0.4. Those classes no longer unpickle, so each is mapped to an attribute
+# bag and only the parameter tensors are kept.
+_LEGACY_CLASSES = {
+    ("__main__", "lstm"),
+    ("torch.nn.modules.rnn", "LSTM"),
+    ("torch.nn.modules.linear", "Linear"),
+}
+
+
+class _LegacyUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if (module, name) in _LEGACY_CLASSES:
+            return _LegacyModule
+        if module == "torch.nn.backends.thnn":
+            return lambda *args, **kwargs: None
+        return super().find_class(module, name)
+
+
+_legacy_pickle = types.SimpleNamespace(Unpickler=_LegacyUnpickler, load=pickle.load, __name__="pickle")
+
+
+def _build_dst_module(input_dim: int, hidden_dim: int, num_layers: int):
+    """LSTM encoder + linear head; Dst is read from the last time step's hidden state."""
+    import torch
+    from torch import nn
+
+    class DstLSTM(nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.lstm = nn.LSTM(input_dim, hidden_dim, num_layers=num_layers, batch_first=True)
+            self.linear = nn.Linear(hidden_dim, 1)
+
+        def forward(self, x: "torch.Tensor") -> "torch.Tensor":
+            out, _ = self.lstm(x)
+            return self.linear(out[:, -1, :]).squeeze(-1)
+
+    return DstLSTM()
+
+
+class DstModelHandler:
+    """
+    Loads the PyTorch Dst LSTM once and serves batched CPU predictions.
+    """
+    def __init__(self, model_path=DST_MODEL_PATH):
+        self.model = None
+        self.input_dim = DST_N_FEATURES
+        self.load_model(model_path)
+
+    def load_model(self, model_path):
+        """
+        Rebuilds the network from the legacy pickle and pins CPU threading, or
+        opens an ONNX export with onnxruntime (no torch import). Leaves
+        ``model`` as None if the runtime or the file is unavailable.
+        """
+        started = time.perf_counter()
+        try:
+            if is_onnx_path(model_path):
+                print(f"Attempting to load Dst model from: {os.path.abspath(model_path)}")
+                self.model = OnnxModel(model_path)
+                feature_dim = self.model.input_shape[-1]
+                self.input_dim = feature_dim if isinstance(feature_dim, int) else DST_N_FEATURES
+                print("Dst model loaded successfully.")
+                metrics.set("dst.load_seconds", time.perf_counter() - started)
+                return
+
+            import torch
+
+            torch.set_num_threads(DST_TORCH_THREADS)
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass  # Only settable before the first parallel op in the process.
+
+            print(f"Attempting to load Dst model from: {os.path.abspath(model_path)}")
+            with open(model_path, "rb") as f, warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                legacy = torch.load(io.BytesIO(f.read()), map_location="cpu", pickle_module=_legacy_pickle, weights_only=False)
+
+            rnn = legacy._modules["lstm"]
+            head = legacy._modules["linear"]
+            model = _build_dst_module(rnn.input_size, rnn.hidden_size, rnn.num_layers)
+            state = {f"lstm.{k}": v for k, v in rnn._parameters.items()}
+            state.update({f"linear.{k}": v for k, v in head._parameters.items()})
+            model.load_state_dict({k: v.detach().float() for k, v in state.items()})
+            model.eval()
+            self.model = model
+            self.input_dim = rnn.input_size
+            print("Dst model loaded successfully.")
+            metrics.set("dst.load_seconds", time.perf_counter() - started)
+        except FileNotFoundError as e:
+            print(f"Warning: Dst model file not found. {e}. The Dst tool will not be usable.")
+            self.model = None
+        except Exception as e:
+            print(f"An error occurred during Dst model loading: {e}")
+            self.model = None
+
+    # Any window length works; only the feature count is fixed.
+    n_steps = None
+
+    @property
+    def n_features(self) -> int:
+        return self.input_dim
+
+    @property
+    def ready(self) -> bool:
+        return self.model is not None
+
+    def predict_batch(self, windows: np.ndarray, batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+        """
+        Predict Dst (nT) for an (N, T, F) array of input windows in batched
+        ``inference_mode`` calls. Returns an (N,) array.
+        """
+        if not self.ready:
+            raise RuntimeError("Dst model is not loaded.")
+        windows = np.asarray(windows, dtype=np.float32)
+        if windows.ndim != 3 or windows.shape[2] != self.input_dim:
+            raise ValueError(f"Expected (N, T, {self.input_dim}) windows, got {windows.shape}.")
+        n = windows.shape[0]
+        out = np.empty(n, dtype=np.float64)
+        with metrics.timer("dst.inference"):
+            if isinstance(self.model, OnnxModel):
+                for lo in range(0, n, batch_size):
+                    chunk = windows[lo:lo + batch_size]
+                    out[lo:lo + chunk.shape[0]] = self.model(chunk).reshape(-1)
+            else:
+                import torch
+
+                with torch.inference_mode():
+                    for lo in range(0, n, batch_size):
+                        chunk = torch.from_numpy(np.ascontiguousarray(windows[lo:lo + batch_size]))
+                        out[lo:lo + chunk.shape[0]] = self.model(chunk).numpy()
+        metrics.incr("dst.predictions", n)
+        return out
+
+    def predict(self, window: np.ndarray) -> float | None:
+        """Single (T, F) window convenience wrapper; None if the model is unavailable."""
+        if not self.ready:
+            return None
+        return float(self.predict_batch(np.asarray(window)[None, :, :])[0])
+
+
+# --- Process-wide handler ---
+def get_dst_handler(reload: bool = False) -> DstModelHandler:
+    """Return the shared handler for the registry's default Dst model."""
+    from model_registry import get_model_registry
+
+    registry = get_model_registry()
+    handler = registry.get(registry.default("dst").name, reload=reload)
+    metrics.set("dst.ready", 1.0 if handler.ready else 0.0)
+    return handler
+
+
+def warm_dst_handler() -> bool:
+    """Load the shared handler ahead of the first request; returns True if the model is usable."""
+    return get_dst_handler().ready
@@ -0,0 +1,143 @@
+"""
+Export registered models to ONNX and verify them against the native framework.
+
+    python export_models.py                 # every model in the manifest
+    python export_models.py --models kp-lstm --atol 1e-4
+
+Each export is written to models/onnx/<name>-<version>.onnx. It is then run
+next to the original model on random windows at several batch sizes. Only an
+export whose worst absolute error is within --atol is recorded as
+``onnx_path`` in the manifest. Select it with ``"backend": "onnx"`` or
+MODEL_BACKEND=onnx.
+"""
+import os
+import json
+import time
+import argparse
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from model_registry import LOADERS, MANIFEST_PATH, Manifest, ModelSpec
+
+ONNX_DIR = os.path.join('models', 'onnx')
+ONNX_OPSET = 17
+DEFAULT_ATOL = 1e-4
+VERIFY_BATCH_SIZES = (1, 7, 256)
+# Window length used for models that accept any length (Dst).
+DEFAULT_VERIFY_STEPS = 60
+
+
+def onnx_path_for(spec: ModelSpec) -> str:
+    return os.path.join(ONNX_DIR, f"{spec.name}-{spec.version}.onnx")
+
+
+# --- Exporters (one per framework) ---
+def export_keras(spec: ModelSpec, out_path: str) -> None:
+    """Keras -> ONNX via tf2onnx with a dynamic batch axis."""
+    import tensorflow as tf
+    import tf2onnx
+
+    model = tf.keras.models.load_model(spec.path)
+    signature = (tf.TensorSpec((None, spec.n_steps, spec.n_features), tf.float32, name="windows"),)
+    tf2onnx.convert.from_keras(model, input_signature=signature, opset=ONNX_OPSET, output_path=out_path)
+
+
+def export_torch(spec: ModelSpec, out_path: str) -> None:
+    """PyTorch -> ONNX with dynamic batch and sequence axes."""
+    import torch
+
+    handler = LOADERS["torch"](spec, spec.path)
+    if not handler.ready:
+        raise RuntimeError(f"Could not load {spec.key} from {spec.path}")
+    # Trace with batch 1: the exported LSTM then builds its zero initial state from the input shape.
+    dummy = torch.zeros(1, spec.n_steps or DEFAULT_VERIFY_STEPS, spec.n_features)
+    torch.onnx.export(
+        handler.model,
+        dummy,
+        out_path,
+        input_names=["windows"],
+        output_names=["prediction"],
+        dynamic_axes={"windows": {0: "batch", 1: "steps"}, "prediction": {0: "batch"}},
+        opset_version=ONNX_OPSET,
+        dynamo=False,
+    )
+
+
+EXPORTERS = {
+    "keras": export_keras,
+    "torch": export_torch,
+}
+
+
+def verify_export(spec: ModelSpec, onnx_path: str, atol: float = DEFAULT_ATOL, seed: int = 0) -> Dict[str, Any]:
+    """Run the native model and the ONNX export on the same random windows and compare."""
+    native = LOADERS[spec.framework](spec, spec.path)
+    exported = LOADERS[spec.framework](spec, onnx_path)
+    if not native.ready or not exported.ready:
+        raise RuntimeError(f"Could not load both backends for {spec.key}")
+
+    rng = np.random.default_rng(seed)
+    steps = spec.n_steps or DEFAULT_VERIFY_STEPS
+    max_abs_err = 0.0
+    for batch in VERIFY_BATCH_SIZES:
+        windows = rng.normal(size=(batch, steps, spec.n_features)).astype(np.float32)
+        diff = np.abs(native.predict_batch(windows) - exported.predict_batch(windows))
+        max_abs_err = max(max_abs_err, float(diff.max()))
+    return {
+        "model": spec.key,
+        "onnx_path": onnx_path,
+        "batch_sizes": list(VERIFY_BATCH_SIZES),
+        "max_abs_err": max_abs_err,
+        "atol": atol,
+        "passed": max_abs_err <= atol,
+    }
+
+
+def record_onnx_path(manifest_path: str, spec: ModelSpec, onnx_path: str) -> None:
+    with open(manifest_path, "r") as f:
+        data = json.load(f)
+    for entry in data.get("models", []):
+        if entry["name"] == spec.name and str(entry["version"]) == spec.version:
+            entry["onnx_path"] = onnx_path.replace(os.sep, "/")
+    with open(manifest_path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def export_model(spec: ModelSpec, manifest_path: str = MANIFEST_PATH, atol: float = DEFAULT_ATOL,
+                 update_manifest: bool = True) -> Dict[str, Any]:
+    out_path = onnx_path_for(spec)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    started = time.perf_counter()
+    EXPORTERS[spec.framework](spec, out_path)
+    report = verify_export(spec, out_path, atol)
+    report["export_seconds"] = round(time.perf_counter() - started, 3)
+    if report["passed"] and update_manifest:
+        record_onnx_path(manifest_path, spec, out_path)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--models", nargs="*", help="Model names or name@version (default: all)")
+    parser.add_argument("--atol", type=float, default=DEFAULT_ATOL)
+    parser.add_argument("--no-manifest-update", action="store_true")
+    args = parser.parse_args(argv)
+
+    manifest = Manifest.from_file(args.manifest)
+    specs = [manifest.resolve(m) for m in args.models] if args.models else list(manifest.specs.values())
+    failed = 0
+    for spec in specs:
+        try:
+            report = export_model(spec, args.manifest, args.atol, not args.no_manifest_update)
+        except Exception as e:
+            report = {"model": spec.key, "passed": False, "error": f"{type(e).__name__}: {e}"}
+        failed += not report["passed"]
+        print(json.dumps(report))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
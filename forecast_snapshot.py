@@ -0,0 +1,93 @@
+import json
+import time
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class SnapshotEntry:
+    """One published section of the forecast snapshot."""
+    section: str
+    value: Any
+    version: int
+    updated_at: float
+    digest: str
+
+
+def content_digest(value: Any) -> str:
+    """Stable hash of a section value; equal content gives the same digest in every process."""
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+Listener = Callable[[SnapshotEntry], None]
+
+
+class ForecastSnapshot:
+    """
+    Process-wide, in-memory store of the latest forecast data.
+
+    Background pollers publish named sections (NOAA products, solar wind,
+    nowcasts); request handlers only read. Every publish gets a new
+    monotonically increasing version, and listeners are notified after the
+    entry is visible so derived tables can be rebuilt off the request path.
+
+    Versions are process-local (they restart at 1 in every worker), so
+    anything handed to clients, such as ETags, uses the content digests.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, SnapshotEntry] = {}
+        self._listeners: List[Listener] = []
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def publish(self, section: str, value: Any, digest: Optional[str] = None) -> SnapshotEntry:
+        """Publish a section; ``digest`` defaults to a hash of ``value``."""
+        digest = digest or content_digest(value)
+        with self._lock:
+            self._version += 1
+            entry = SnapshotEntry(section, value, self._version, time.time(), digest)
+            self._entries[section] = entry
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(entry)
+            except Exception as e:
+                print(f"Warning: snapshot listener failed for '{section}': {e}")
+        return entry
+
+    def get(self, section: str) -> Optional[SnapshotEntry]:
+        return self._entries.get(section)
+
+    def value(self, section: str, default: Any = None) -> Any:
+        entry = self._entries.get(section)
+        return entry.value if entry is not None else default
+
+    def version(self, *sections: str) -> str:
+        """Composite version of the given sections (all sections if none given)."""
+        with self._lock:
+            names = sections or tuple(sorted(self._entries))
+            return "-".join(
+                f"{self._entries[name].version}" if name in self._entries else "0" for name in names
+            )
+
+    def digest(self, *sections: str) -> str:
+        """Composite content digest of the given sections (all sections if none given)."""
+        with self._lock:
+            names = sections or tuple(sorted(self._entries))
+            return "-".join(self._entries[name].digest if name in self._entries else "0" for name in names)
+
+    def subscribe(self, listener: Listener) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Listener) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+snapshot = ForecastSnapshot()
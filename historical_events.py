@@ -0,0 +1,219 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from historical_store import (
+    DateLike,
+    HistoricalStore,
+    NO_ANOMALY_TYPE,
+    from_epoch_day,
+    get_historical_store,
+    to_epoch_day,
+)
+
+# --- Derivation defaults ---
+# merged_output.csv carries daily-mean Kp, so Kp 5 (G1) is already a storm day.
+STORM_KP_THRESHOLD = 5.0
+CLUSTER_MIN_ANOMALIES = 3
+CLUSTER_MAX_GAP_DAYS = 2
+
+
+def risk_level_for_kp(kp: float) -> str:
+    """Map a peak Kp to the risk labels the web app colours by."""
+    if kp >= 8.0:
+        return "EXTREME"
+    if kp >= 7.0:
+        return "SEVERE"
+    if kp >= 6.0:
+        return "HIGH"
+    if kp >= 5.0:
+        return "MODERATE"
+    return "LOW"
+
+
+def find_runs(mask: np.ndarray) -> np.ndarray:
+    """Return an (n, 2) array of [start, end) row ranges where ``mask`` is True."""
+    padded = np.concatenate(([False], np.asarray(mask, dtype=bool), [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges.reshape(-1, 2)
+
+
+class AnomalyTally:
+    """Prefix sums of anomaly counts per type, so any row range is tallied in O(types)."""
+
+    def __init__(self, store: HistoricalStore):
+        self.types = store.anomaly_types
+        n_types = len(self.types)
+        onehot = np.zeros((len(store), n_types), dtype=np.int32)
+        flagged = np.flatnonzero(store.anomaly)
+        onehot[flagged, store.anomaly_type[flagged]] = 1
+        self.prefix = np.vstack([np.zeros((1, n_types), dtype=np.int32), np.cumsum(onehot, axis=0, dtype=np.int32)])
+
+    def counts(self, lo: int, hi: int) -> np.ndarray:
+        """Anomaly counts per type code for rows [lo, hi)."""
+        return self.prefix[hi] - self.prefix[lo]
+
+    def as_dict(self, counts: np.ndarray) -> Dict[str, int]:
+        return {self.types[code]: int(n) for code, n in enumerate(counts) if n}
+
+
+def describe_range(store: HistoricalStore, tally: AnomalyTally, lo: int, hi: int) -> Dict[str, Any]:
+    kp = store.kp[lo:hi]
+    peak = lo + int(np.argmax(kp))
+    counts = tally.counts(lo, hi)
+    start_day = int(store.epoch_day[lo])
+    end_day = int(store.epoch_day[hi - 1])
+    return {
+        "start": from_epoch_day(start_day),
+        "end": from_epoch_day(end_day),
+        "duration_days": end_day - start_day + 1,
+        "peak_kp": round(float(store.kp[peak]), 3),
+        "peak_date": from_epoch_day(store.epoch_day[peak]),
+        "mean_kp": round(float(kp.mean()), 3),
+        "max_ap": round(float(store.ap[lo:hi].max()), 3),
+        "anomaly_count": int(counts.sum()),
+        "anomaly_counts": tally.as_dict(counts),
+        "risk_level": risk_level_for_kp(float(store.kp[peak])),
+    }
+
+
+def storm_runs(store: HistoricalStore, kp_threshold: float) -> np.ndarray:
+    """[start, end) row ranges of consecutive calendar days with Kp >= threshold."""
+    if not len(store):
+        return np.empty((0, 2), dtype=np.int64)
+    # A gap in the calendar breaks a run even if both sides are above threshold.
+    contiguous = np.diff(store.epoch_day) == 1
+    out = []
+    for lo, hi in find_runs(store.kp >= kp_threshold):
+        breaks = lo + 1 + np.flatnonzero(~contiguous[lo:hi - 1])
+        bounds = np.concatenate(([lo], breaks, [hi]))
+        out.extend(zip(bounds[:-1], bounds[1:]))
+    return np.asarray(out, dtype=np.int64).reshape(-1, 2)
+
+
+def derive_storm_events(
+    store: HistoricalStore,
+    tally: AnomalyTally,
+    kp_threshold: float = STORM_KP_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """Storm events are runs of consecutive calendar days with Kp >= threshold."""
+    events = []
+    for lo, hi in storm_runs(store, kp_threshold):
+        event = describe_range(store, tally, int(lo), int(hi))
+        event["kind"] = "storm"
+        events.append(event)
+    return events
+
+
+def derive_anomaly_clusters(
+    store: HistoricalStore,
+    tally: AnomalyTally,
+    min_anomalies: int = CLUSTER_MIN_ANOMALIES,
+    max_gap_days: int = CLUSTER_MAX_GAP_DAYS,
+) -> List[Dict[str, Any]]:
+    """Anomaly clusters group anomaly days no more than ``max_gap_days`` apart."""
+    rows = np.flatnonzero(store.anomaly)
+    if rows.size == 0:
+        return []
+    gaps = np.diff(store.epoch_day[rows]) > max_gap_days
+    bounds = np.concatenate(([0], np.flatnonzero(gaps) + 1, [rows.size]))
+    clusters = []
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        if b - a < min_anomalies:
+            continue
+        event = describe_range(store, tally, int(rows[a]), int(rows[b - 1]) + 1)
+        event["kind"] = "anomaly_cluster"
+        clusters.append(event)
+    return clusters
+
+
+class HistoricalEventCatalog:
+    """Precomputed storm events and anomaly clusters with filter + pagination."""
+
+    SORT_KEYS = {
+        "start": (lambda e: e["start"], False),
+        "-start": (lambda e: e["start"], True),
+        "peak_kp": (lambda e: e["peak_kp"], True),
+        "anomalies": (lambda e: e["anomaly_count"], True),
+        "duration": (lambda e: e["duration_days"], True),
+    }
+
+    def __init__(self, store: HistoricalStore):
+        self.store = store
+        self.tally = AnomalyTally(store)
+        events = derive_storm_events(store, self.tally) + derive_anomaly_clusters(store, self.tally)
+        events.sort(key=lambda e: (e["start"], e["kind"]))
+        for event in events:
+            event["id"] = f"{event['kind']}-{event['start']}"
+            event["name"] = _event_name(event)
+        self.events = events
+        self._sorted = {key: sorted(events, key=fn, reverse=rev) for key, (fn, rev) in self.SORT_KEYS.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "events": len(self.events),
+            "storms": sum(1 for e in self.events if e["kind"] == "storm"),
+            "anomaly_clusters": sum(1 for e in self.events if e["kind"] == "anomaly_cluster"),
+            "dataset_start": from_epoch_day(self.store.first_day) if len(self.store) else None,
+            "dataset_end": from_epoch_day(self.store.last_day) if len(self.store) else None,
+            "anomaly_types": [t for t in self.store.anomaly_types if t != NO_ANOMALY_TYPE],
+        }
+
+    def query(
+        self,
+        kind: Optional[str] = None,
+        min_kp: float = 0.0,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        anomaly_type: Optional[str] = None,
+        risk_level: Optional[str] = None,
+        sort: str = "start",
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """Filter events overlapping [start, end] and return one page of results."""
+        if sort not in self._sorted:
+            raise ValueError(f"Unknown sort '{sort}'. Expected one of {sorted(self._sorted)}.")
+        start_iso = from_epoch_day(to_epoch_day(start)) if start is not None else None
+        end_iso = from_epoch_day(to_epoch_day(end)) if end is not None else None
+        level = risk_level.upper() if risk_level else None
+
+        matched = [
+            e for e in self._sorted[sort]
+            if (kind is None or e["kind"] == kind)
+            and e["peak_kp"] >= min_kp
+            and (start_iso is None or e["end"] >= start_iso)
+            and (end_iso is None or e["start"] <= end_iso)
+            and (anomaly_type is None or e["anomaly_counts"].get(anomaly_type, 0) > 0)
+            and (level is None or e["risk_level"] == level)
+        ]
+        offset = max(0, int(offset))
+        limit = max(1, min(int(limit), 500))
+        return {
+            "total": len(matched),
+            "offset": offset,
+            "limit": limit,
+            "items": matched[offset:offset + limit],
+        }
+
+
+def _event_name(event: Dict[str, Any]) -> str:
+    month = event["peak_date"][:7]
+    if event["kind"] == "storm":
+        return f"{month} geomagnetic storm (Kp {event['peak_kp']:.1f})"
+    return f"{month} anomaly cluster ({event['anomaly_count']} anomalies)"
+
+
+_catalog: Optional[HistoricalEventCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_event_catalog() -> HistoricalEventCatalog:
+    """Process-wide catalog, derived once from the historical store."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = HistoricalEventCatalog(get_historical_store())
+    return _catalog
@@ -0,0 +1,267 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+# --- Constants ---
+CSV_PATH = "merged_output.csv"
+CACHE_DIR = os.path.join(".cache", "historical")
+CACHE_VERSION = 2
+
+# Column name -> on-disk dtype. Rows are written sorted by epoch_day, so the
+# epoch_day column doubles as the sorted date index.
+COLUMNS: Dict[str, str] = {
+    "epoch_day": "<i4",
+    "kp": "<f4",
+    "ap": "<f4",
+    "anomaly": "u1",
+    "anomaly_type": "<u2",
+}
+
+# Code 0 is reserved for "no anomaly type recorded" (blank / NA in the CSV).
+NO_ANOMALY_TYPE = "NA"
+
+_EPOCH = date(1970, 1, 1)
+
+DateLike = Union[int, str, date, datetime]
+
+
+def to_epoch_day(value: DateLike) -> int:
+    """Convert 'YYYY-MM-DD', a date/datetime, or an int epoch day into days since 1970-01-01."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, str):
+        value = date.fromisoformat(value.strip()[:10])
+    return (value - _EPOCH).days
+
+
+def from_epoch_day(day: int) -> str:
+    """Convert an epoch day back into an ISO 'YYYY-MM-DD' string."""
+    return date.fromordinal(_EPOCH.toordinal() + int(day)).isoformat()
+
+
+class HistoricalStore:
+    """
+    Read-only view over the columnar historical dataset.
+
+    Columns are numpy arrays (memory-mapped when loaded from the cache) of
+    equal length, sorted by ``epoch_day`` so point and range lookups are a
+    binary search.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], anomaly_types: List[str]):
+        self.columns = columns
+        self.anomaly_types = anomaly_types
+        self.epoch_day = columns["epoch_day"]
+        self.kp = columns["kp"]
+        self.ap = columns["ap"]
+        self.anomaly = columns["anomaly"]
+        self.anomaly_type = columns["anomaly_type"]
+
+    def __len__(self) -> int:
+        return int(self.epoch_day.shape[0])
+
+    @property
+    def first_day(self) -> Optional[int]:
+        return int(self.epoch_day[0]) if len(self) else None
+
+    @property
+    def last_day(self) -> Optional[int]:
+        return int(self.epoch_day[-1]) if len(self) else None
+
+    def index_of(self, day: DateLike) -> Optional[int]:
+        """Row index for an exact date, or None if the date is not in the dataset."""
+        d = to_epoch_day(day)
+        i = int(np.searchsorted(self.epoch_day, d, side="left"))
+        if i < len(self) and int(self.epoch_day[i]) == d:
+            return i
+        return None
+
+    def slice_between(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> slice:
+        """Row slice covering ``start <= date <= end`` (either bound may be None)."""
+        lo = 0 if start is None else int(np.searchsorted(self.epoch_day, to_epoch_day(start), side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.epoch_day, to_epoch_day(end), side="right"))
+        return slice(lo, max(lo, hi))
+
+    def between(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy column views for a date range."""
+        sl = self.slice_between(start, end)
+        return {name: col[sl] for name, col in self.columns.items()}
+
+    def type_label(self, code: int) -> str:
+        try:
+            return self.anomaly_types[int(code)]
+        except IndexError:
+            return NO_ANOMALY_TYPE
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """Materialize one row as a JSON-friendly dict."""
+        return {
+            "date": from_epoch_day(self.epoch_day[i]),
+            "kp": round(float(self.kp[i]), 4),
+            "ap": round(float(self.ap[i]), 4),
+            "anomaly": int(self.anomaly[i]),
+            "anomaly_type": self.type_label(self.anomaly_type[i]) if self.anomaly[i] else None,
+        }
+
+    def lookup(self, day: DateLike) -> Optional[Dict[str, Any]]:
+        i = self.index_of(day)
+        return self.row(i) if i is not None else None
+
+
+# --- Cache build / load ---
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_paths(cache_dir: str, csv_path: str) -> Dict[str, str]:
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return {
+        "data": os.path.join(cache_dir, f"{stem}.bin"),
+        "meta": os.path.join(cache_dir, f"{stem}.meta.json"),
+    }
+
+
+def _parse_csv(csv_path: str) -> HistoricalStore:
+    """Parse the anomaly CSV once into typed in-memory columns."""
+    import pandas as pd
+
+    # ADATE and Date carry the same value; only ADATE is read.
+    df = pd.read_csv(csv_path, usecols=["ADATE", "Anamolytype", "Anamoly", "Kp", "ap"])
+    df = df.dropna(subset=["ADATE"])
+    days = (pd.to_datetime(df["ADATE"]).values.astype("datetime64[D]").astype(np.int64)).astype(np.int32)
+
+    labels = df["Anamolytype"].fillna(NO_ANOMALY_TYPE).astype(str).str.strip()
+    labels = labels.where(labels != "", NO_ANOMALY_TYPE)
+    anomaly_types = [NO_ANOMALY_TYPE] + sorted(set(labels) - {NO_ANOMALY_TYPE})
+    codes = {label: i for i, label in enumerate(anomaly_types)}
+
+    order = np.argsort(days, kind="stable")
+    columns = {
+        "epoch_day": days[order],
+        "kp": pd.to_numeric(df["Kp"], errors="coerce").fillna(0.0).to_numpy(np.float32)[order],
+        "ap": pd.to_numeric(df["ap"], errors="coerce").fillna(0.0).to_numpy(np.float32)[order],
+        "anomaly": (pd.to_numeric(df["Anamoly"], errors="coerce").fillna(0) > 0).to_numpy(np.uint8)[order],
+        "anomaly_type": labels.map(codes).to_numpy(np.uint16)[order],
+    }
+    columns = {name: np.ascontiguousarray(col, dtype=COLUMNS[name]) for name, col in columns.items()}
+    return HistoricalStore(columns, anomaly_types)
+
+
+def _write_cache(store: HistoricalStore, paths: Dict[str, str], csv_path: str, csv_hash: str) -> None:
+    """Write columns back-to-back (8-byte aligned) plus a JSON sidecar, atomically."""
+    os.makedirs(os.path.dirname(paths["data"]) or ".", exist_ok=True)
+    layout = {}
+    offset = 0
+    tmp_data = paths["data"] + ".tmp"
+    with open(tmp_data, "wb") as f:
+        for name, dtype in COLUMNS.items():
+            col = store.columns[name]
+            pad = (-offset) % 8
+            if pad:
+                f.write(b"\0" * pad)
+                offset += pad
+            f.write(col.tobytes())
+            layout[name] = {"dtype": dtype, "offset": offset}
+            offset += col.nbytes
+    st = os.stat(csv_path)
+    meta = {
+        "version": CACHE_VERSION,
+        "csv_sha256": csv_hash,
+        "csv_size": st.st_size,
+        "csv_mtime_ns": st.st_mtime_ns,
+        "rows": len(store),
+        "columns": layout,
+        "anomaly_types": store.anomaly_types,
+    }
+    # Data first so a reader never sees new meta pointing at old data.
+    os.replace(tmp_data, paths["data"])
+    _write_meta(paths["meta"], meta)
+
+
+def _write_meta(path: str, meta: Dict[str, Any]) -> None:
+    """Replace the JSON sidecar atomically, so readers never see it half-written."""
+    tmp_meta = path + ".tmp"
+    with open(tmp_meta, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_meta, path)
+
+
+def _read_meta(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r") as f:
+            meta = json.load(f)
+        return meta if meta.get("version") == CACHE_VERSION else None
+    except Exception:
+        return None
+
+
+def _map_cache(paths: Dict[str, str], meta: Dict[str, Any]) -> HistoricalStore:
+    rows = int(meta["rows"])
+    columns = {}
+    for name, spec in meta["columns"].items():
+        if rows == 0:
+            columns[name] = np.empty(0, dtype=spec["dtype"])
+            continue
+        columns[name] = np.memmap(paths["data"], dtype=spec["dtype"], mode="r", offset=spec["offset"], shape=(rows,))
+    return HistoricalStore(columns, list(meta["anomaly_types"]))
+
+
+def load_historical_store(csv_path: str = CSV_PATH, cache_dir: str = CACHE_DIR) -> HistoricalStore:
+    """
+    Return the dataset as memory-mapped columns, rebuilding the cache only when
+    the CSV content changes.
+
+    A matching (size, mtime) skips hashing entirely; otherwise the CSV is hashed
+    and the cache is reused if the hash still matches.
+    """
+    paths = _cache_paths(cache_dir, csv_path)
+    meta = _read_meta(paths["meta"])
+    st = os.stat(csv_path)
+
+    if meta and os.path.exists(paths["data"]):
+        if meta.get("csv_size") == st.st_size and meta.get("csv_mtime_ns") == st.st_mtime_ns:
+            return _map_cache(paths, meta)
+        csv_hash = _sha256_file(csv_path)
+        if meta.get("csv_sha256") == csv_hash:
+            # Content unchanged (e.g. fresh checkout); refresh the stat fingerprint.
+            meta.update({"csv_size": st.st_size, "csv_mtime_ns": st.st_mtime_ns})
+            try:
+                _write_meta(paths["meta"], meta)
+            except OSError:
+                pass
+            return _map_cache(paths, meta)
+    else:
+        csv_hash = _sha256_file(csv_path)
+
+    store = _parse_csv(csv_path)
+    try:
+        _write_cache(store, paths, csv_path, csv_hash)
+    except OSError:
+        # Read-only checkout: serve the freshly parsed in-memory columns.
+        return store
+    return _map_cache(paths, _read_meta(paths["meta"]) or {})
+
+
+_store: Optional[HistoricalStore] = None
+_store_lock = threading.Lock()
+
+
+def get_historical_store() -> HistoricalStore:
+    """Process-wide store, loaded on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = load_historical_store()
+    return _store
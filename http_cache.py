@@ -0,0 +1,148 @@
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from metrics import metrics
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the stdlib encoder.
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only.
+    brotli = None
+
+# Bodies smaller than this go out uncompressed; the headers would eat the saving.
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+MAX_CACHED_BODIES = 256
+
+
+def dumps(value: Any) -> bytes:
+    """Compact JSON bytes, via orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """Default response class: same output as JSONResponse, faster encoder."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@dataclass(frozen=True)
+class Representation:
+    """One serialized resource version with its precompressed variants."""
+    etag: str
+    identity: bytes
+    gzip: Optional[bytes] = None
+    br: Optional[bytes] = None
+
+
+def _etag(key: str, version: str) -> str:
+    digest = hashlib.sha256(f"{key}\0{version}".encode("utf-8")).hexdigest()[:24]
+    return f'"{digest}"'
+
+
+def _variant_etag(etag: str, encoding: str) -> str:
+    # Each encoding is a different byte sequence, so a strong ETag must differ too.
+    return etag if encoding == "identity" else f'{etag[:-1]}-{encoding}"'
+
+
+def _accepted_encodings(request: Request) -> set:
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def _if_none_match(request: Request) -> set:
+    header = request.headers.get("if-none-match", "")
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored.
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+class ResponseCache:
+    """
+    Serialized, precompressed response bodies keyed by (resource, version).
+
+    ``version`` is whatever identifies the data behind a resource. It must be
+    derived from content (usually snapshot digests), not a process-local
+    counter: ETags outlive restarts and are shared across workers. A conditional request whose ETag still matches
+    gets a 304 without building or serializing anything. Otherwise the body is
+    encoded and compressed once per version and shared by every later request.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_BODIES):
+        self.max_entries = max_entries
+        self._bodies: "OrderedDict[str, Representation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def representation(self, key: str, version: str, build: Callable[[], Any]) -> Representation:
+        etag = _etag(key, version)
+        with self._lock:
+            cached = self._bodies.get(key)
+            if cached is not None and cached.etag == etag:
+                self._bodies.move_to_end(key)
+                metrics.incr("http_cache.hits")
+                return cached
+        metrics.incr("http_cache.misses")
+        with metrics.timer("http_cache.encode"):
+            body = dumps(build())
+            large = len(body) >= COMPRESS_MIN_BYTES
+            rep = Representation(
+                etag=etag,
+                identity=body,
+                gzip=gzip.compress(body, GZIP_LEVEL, mtime=0) if large else None,
+                br=brotli.compress(body, quality=BROTLI_QUALITY) if large and brotli is not None else None,
+            )
+        with self._lock:
+            self._bodies[key] = rep
+            self._bodies.move_to_end(key)
+            while len(self._bodies) > self.max_entries:
+                self._bodies.popitem(last=False)
+        return rep
+
+    def respond(self, request: Request, key: str, version: Any, build: Callable[[], Any], max_age: int) -> Response:
+        """A 200 with ETag/Cache-Control and the best accepted encoding, or a 304."""
+        etag = _etag(key, str(version))
+        accepted = _accepted_encodings(request)
+        headers: Dict[str, str] = {"Cache-Control": f"public, max-age={int(max_age)}", "Vary": "Accept-Encoding"}
+
+        presented = _if_none_match(request)
+        known = {_variant_etag(etag, enc) for enc in ("identity", "gzip", "br")}
+        if "*" in presented or presented & known:
+            metrics.incr("http_cache.not_modified")
+            headers["ETag"] = next(iter(presented & known), etag)
+            return Response(status_code=304, headers=headers)
+
+        rep = self.representation(key, str(version), build)
+        if rep.br is not None and "br" in accepted:
+            encoding, body = "br", rep.br
+        elif rep.gzip is not None and ("gzip" in accepted or "*" in accepted):
+            encoding, body = "gzip", rep.gzip
+        else:
+            encoding, body = "identity", rep.identity
+        headers["ETag"] = _variant_etag(rep.etag, encoding)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bodies.clear()
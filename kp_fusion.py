@@ -0,0 +1,257 @@
+import math
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from forecast_snapshot import ForecastSnapshot, SnapshotEntry, snapshot as default_snapshot
+from metrics import metrics
+
+# Kp is reported in thirds (0, 0+, 1-, 1o, ... 9o); distributions live on that grid.
+KP_GRID = np.arange(28, dtype=np.float64) / 3.0
+PERIOD_HOURS = 3
+HORIZON_PERIODS = 24        # 72 hours, the span of the NOAA 3-day forecast
+NEXT_24H_PERIODS = 8
+EXCEEDANCE_LEVELS = (5, 6, 7, 8)
+
+# Each source is a normal around its point forecast. The spread grows with lead
+# time; the weights set each source's share of the mixture. The LSTM nowcast
+# only speaks for the next few hours.
+SOURCE_MODELS: Dict[str, Dict[str, float]] = {
+    "noaa_3day": {"sigma": 0.67, "growth_per_day": 0.33, "weight": 1.0},
+    "noaa_json": {"sigma": 0.67, "growth_per_day": 0.33, "weight": 1.0},
+    "lstm": {"sigma": 0.5, "growth_per_day": 2.0, "weight": 1.5, "max_lead_hours": 6.0},
+}
+
+INPUT_SECTIONS = ("noaa_3day", "noaa_kp_forecast", "lstm_nowcast")
+OUTPUT_SECTION = "kp_distribution"
+
+_EDGES = np.concatenate(([-np.inf], (KP_GRID[:-1] + KP_GRID[1:]) / 2.0, [np.inf]))
+_erf = np.vectorize(math.erf, otypes=[np.float64])
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        t = datetime.fromisoformat(str(value).replace("Z", "").replace(" ", "T"))
+    except ValueError:
+        return None
+    return t.replace(tzinfo=None) if t.tzinfo is None else t.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _floor_period(t: datetime) -> datetime:
+    return t.replace(hour=t.hour - t.hour % PERIOD_HOURS, minute=0, second=0, microsecond=0)
+
+
+def discretized_normal(mean: float, sigma: float) -> np.ndarray:
+    """Normal(mean, sigma) binned onto KP_GRID; the tails fold into 0 and 9."""
+    z = (_EDGES - mean) / (sigma * math.sqrt(2.0))
+    cdf = 0.5 * (1.0 + _erf(z))
+    return np.diff(cdf)
+
+
+def pmf_stats(pmf: np.ndarray) -> Dict[str, Any]:
+    cdf = np.cumsum(pmf)
+    return {
+        "mean": round(float(pmf @ KP_GRID), 3),
+        "p50": round(float(KP_GRID[np.searchsorted(cdf, 0.5)]), 2),
+        "p90": round(float(KP_GRID[min(np.searchsorted(cdf, 0.9), len(KP_GRID) - 1)]), 2),
+        "p_exceed": {f"kp{lvl}": round(float(pmf[KP_GRID >= lvl - 1e-9].sum()), 4) for lvl in EXCEEDANCE_LEVELS},
+    }
+
+
+def expected_over(pmf: List[float] | np.ndarray, fn: Callable[[np.ndarray], np.ndarray]) -> float:
+    """E[fn(Kp)] under a distribution on KP_GRID (fn must be vectorized over Kp)."""
+    return float(np.asarray(pmf, dtype=np.float64) @ np.asarray(fn(KP_GRID), dtype=np.float64))
+
+
+# --- Source extraction: (period start, kp, lead hours) per source ---
+def _three_day_points(forecast: Optional[Dict[str, Any]]) -> List[Tuple[datetime, float, float]]:
+    if not forecast:
+        return []
+    issued = _parse_time(forecast.get("issued"))
+    points = []
+    for d, day in enumerate(forecast.get("days") or []):
+        day_start = _parse_time(day)
+        if day_start is None:
+            continue
+        for row in forecast.get("breakdown") or []:
+            values = row.get("values") or []
+            if d >= len(values):
+                continue
+            start = day_start + timedelta(hours=int(str(row.get("period", "00"))[:2]))
+            lead = (start - issued).total_seconds() / 3600.0 if issued else 0.0
+            points.append((start, float(values[d]), max(0.0, lead)))
+    return points
+
+
+def _json_rows(forecast: Optional[Dict[str, Any]]) -> List[Tuple[datetime, float, Any]]:
+    series = (forecast or {}).get("series") or []
+    rows = [(_parse_time(r.get("t")), float(r["kp"]), r.get("observed")) for r in series]
+    return [r for r in rows if r[0] is not None]
+
+
+def _json_reference(forecast: Optional[Dict[str, Any]]) -> Optional[datetime]:
+    """Latest observed/estimated period: the point the JSON forecast was issued from."""
+    measured = [t for t, _, kind in _json_rows(forecast) if kind in ("observed", "estimated")]
+    return max(measured) if measured else None
+
+
+def _json_points(forecast: Optional[Dict[str, Any]]) -> List[Tuple[datetime, float, float]]:
+    rows = _json_rows(forecast)
+    reference = _json_reference(forecast)
+    return [
+        (t, kp, max(0.0, (t - reference).total_seconds() / 3600.0) if reference else 0.0)
+        for t, kp, kind in rows
+        if kind in ("predicted", "estimated")
+    ]
+
+
+def _lstm_points(nowcast: Optional[Dict[str, Any]], periods: List[datetime]) -> List[Tuple[datetime, float, float]]:
+    as_of = _parse_time((nowcast or {}).get("as_of"))
+    if as_of is None or nowcast.get("kp") is None:
+        return []
+    if nowcast.get("calibrated") is False:
+        # Relative model output, not Kp: it must not move the distribution that prices policies.
+        return []
+    max_lead = SOURCE_MODELS["lstm"]["max_lead_hours"]
+    points = []
+    for start in periods:
+        lead = (start - as_of).total_seconds() / 3600.0
+        if -PERIOD_HOURS < lead <= max_lead:
+            points.append((start, float(nowcast["kp"]), max(0.0, lead)))
+    return points
+
+
+def fuse_kp_forecasts(
+    three_day: Optional[Dict[str, Any]],
+    json_forecast: Optional[Dict[str, Any]],
+    nowcast: Optional[Dict[str, Any]] = None,
+    now: Optional[datetime] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Per-3-hour Kp distributions over the next 72 hours from every available source,
+    plus the distribution of the maximum over the next 24 hours.
+
+    Each period's distribution is the weighted mixture of its sources. The 24h
+    maximum treats periods as independent, which is the conservative choice for
+    a max (correlated errors would make it narrower).
+    """
+    by_source = {"noaa_3day": _three_day_points(three_day), "noaa_json": _json_points(json_forecast)}
+    starts = sorted({p[0] for points in by_source.values() for p in points})
+    anchor = _floor_period(now or _utcnow())
+    stale = False
+    if not starts:
+        return None
+    if starts[-1] < anchor:
+        # Forecasts older than the clock (e.g. offline fixtures): anchor at their own issue time.
+        issued = [t for t in (_parse_time((three_day or {}).get("issued")), _json_reference(json_forecast)) if t]
+        anchor, stale = (_floor_period(max(issued)) if issued else starts[0]), True
+    periods = [anchor + timedelta(hours=PERIOD_HOURS * k) for k in range(HORIZON_PERIODS)]
+    by_source["lstm"] = _lstm_points(nowcast, periods)
+
+    contributions: Dict[datetime, List[Dict[str, float]]] = {}
+    for source, points in by_source.items():
+        model = SOURCE_MODELS[source]
+        for start, kp, lead in points:
+            sigma = model["sigma"] + model["growth_per_day"] * lead / 24.0
+            contributions.setdefault(start, []).append(
+                {"source": source, "kp": round(kp, 3), "sigma": round(sigma, 3), "weight": model["weight"]}
+            )
+
+    out_periods = []
+    pmfs = []
+    for start in periods:
+        sources = contributions.get(start)
+        if not sources:
+            continue
+        weights = np.array([s["weight"] for s in sources])
+        pmf = sum(w * discretized_normal(s["kp"], s["sigma"]) for w, s in zip(weights, sources)) / weights.sum()
+        pmfs.append(pmf)
+        out_periods.append({
+            "start": start.isoformat() + "Z",
+            "end": (start + timedelta(hours=PERIOD_HOURS)).isoformat() + "Z",
+            **pmf_stats(pmf),
+            "pmf": np.round(pmf, 5).tolist(),
+            "sources": sources,
+        })
+    if not out_periods:
+        return None
+
+    # Max over independent periods: P(max <= k) = prod_i P(Kp_i <= k).
+    first_day = np.array(pmfs[:NEXT_24H_PERIODS])
+    cdf_max = np.prod(np.cumsum(first_day, axis=1), axis=0)
+    max_pmf = np.diff(np.concatenate(([0.0], cdf_max)))
+    return {
+        "grid": np.round(KP_GRID, 4).tolist(),
+        "anchor": anchor.isoformat() + "Z",
+        "stale": stale,
+        "periods": out_periods,
+        "next_24h_max": {**pmf_stats(max_pmf), "pmf": np.round(max_pmf, 5).tolist()},
+        "sources_used": sorted(s for s, points in by_source.items() if points),
+    }
+
+
+class KpFusion:
+    """
+    Snapshot listener that refits the Kp distribution when any input section
+    changes and publishes it as 'kp_distribution'. Requests only read the result,
+    after calling ``roll`` so a fit from an earlier 3-hour period is redone first.
+    """
+
+    def __init__(self, snapshot: ForecastSnapshot = default_snapshot, now: Callable[[], datetime] = _utcnow):
+        self.snapshot = snapshot
+        self.now = now
+        self._last: Optional[Dict[str, Any]] = None
+        self._period: Optional[datetime] = None
+        self._lock = threading.RLock()
+
+    def __call__(self, entry: SnapshotEntry) -> None:
+        if entry.section in INPUT_SECTIONS:
+            self.refresh()
+
+    def refresh(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            now = self.now()
+            with metrics.timer("kp_fusion.refresh"):
+                fused = fuse_kp_forecasts(
+                    self.snapshot.value("noaa_3day"),
+                    self.snapshot.value("noaa_kp_forecast"),
+                    self.snapshot.value("lstm_nowcast"),
+                    now=now,
+                )
+            self._period = _floor_period(now)
+            # Only republish on change, so the snapshot version tracks real forecast updates.
+            if fused is None or fused == self._last:
+                return fused
+            self._last = fused
+            self.snapshot.publish(OUTPUT_SECTION, dict(fused, inputs_digest=self.snapshot.digest(*INPUT_SECTIONS)))
+            return fused
+
+    def roll(self) -> None:
+        """
+        Refit if the clock has entered a new 3-hour period since the last fit.
+        NOAA issues hours apart, so without this the anchor and the next-24h
+        window would trail the clock until the next input update.
+        """
+        period = _floor_period(self.now())
+        if self._period is None or self._period == period:
+            return
+        with self._lock:
+            if self._period != period:
+                metrics.incr("kp_fusion.rollovers")
+                self.refresh()
+
+
+def install_kp_fusion(snapshot: ForecastSnapshot = default_snapshot) -> KpFusion:
+    """Subscribe a KpFusion to the snapshot and fit it once from whatever is already there."""
+    fusion = KpFusion(snapshot)
+    snapshot.subscribe(fusion)
+    fusion.refresh()
+    return fusion
@@ -0,0 +1,343 @@
+"""
+Shared limits around every LLM call: per-model concurrency caps, a
+per-request deadline, bounded retries with jittered backoff, and a circuit
+breaker per model.
+
+    with llm_deadline(90) as scope:
+        result = crew.kickoff(inputs=inputs)
+    if scope.degraded:
+        ...  # some call was refused or timed out; fall back to deterministic pricing
+
+A call that cannot finish inside the deadline, or that meets an open
+breaker, raises LLMUnavailable at once instead of waiting on the provider.
+Each attempt runs on its own thread, so a hung request is abandoned when
+its timeout passes. The abandoned thread keeps its concurrency slot until
+the provider answers, so the cap still reflects what the provider sees.
+
+Settings (read when the limiter is first used):
+    LLM_MAX_CONCURRENCY         default cap per model (4)
+    LLM_MODEL_CONCURRENCY       per-model overrides, "gemini/gemini-2.5-flash=4,gemini/gemini-2.5-flash-lite=8"
+    LLM_CALL_TIMEOUT_SECONDS    per-attempt timeout (60)
+    LLM_MAX_RETRIES             retries after the first attempt (2)
+    LLM_BREAKER_FAILURES        consecutive failures that open a breaker (5)
+    LLM_BREAKER_RESET_SECONDS   how long a breaker stays open before a trial call (30)
+"""
+import os
+import time
+import random
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from metrics import metrics
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_CALL_TIMEOUT_SECONDS = 60.0
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_RESET_SECONDS = 30.0
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+
+# Provider errors that will fail the same way again (matched by class name so litellm stays optional).
+_PERMANENT_ERRORS = ("AuthenticationError", "BadRequestError", "NotFoundError", "PermissionDeniedError",
+                     "ContextWindowExceededError", "LLMContextLengthExceededException")
+
+
+class LLMUnavailable(RuntimeError):
+    """An LLM call refused by the limiter: breaker open or deadline passed."""
+
+
+class LLMDeadlineExceeded(LLMUnavailable):
+    """The request's LLM deadline passed before the call could complete."""
+
+
+def _retryable(error: BaseException) -> bool:
+    if isinstance(error, (LLMUnavailable, ValueError, TypeError, KeyError)):
+        return False
+    return not any(cls.__name__ in _PERMANENT_ERRORS for cls in type(error).__mro__)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> one half-open trial -> closed or open again."""
+
+    def __init__(self, failure_threshold: int = DEFAULT_BREAKER_FAILURES,
+                 reset_seconds: float = DEFAULT_BREAKER_RESET_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if self.clock() - self._opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self.clock() - self._opened_at < self.reset_seconds or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def cancel(self) -> None:
+        """An allowed call that never reached the provider: free the trial slot, record nothing."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self._opened_at = self.clock()
+            self._trial_in_flight = False
+
+
+class LLMScope:
+    """Deadline for the LLM calls of one request, and a record of any that were refused."""
+
+    def __init__(self, seconds: Optional[float]):
+        self.deadline = time.monotonic() + seconds if seconds is not None else None
+        self.reasons: List[str] = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> Optional[float]:
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    def refuse(self, reason: str) -> None:
+        with self._lock:
+            if reason not in self.reasons:
+                self.reasons.append(reason)
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.reasons)
+
+
+_scope: "contextvars.ContextVar[Optional[LLMScope]]" = contextvars.ContextVar("llm_scope", default=None)
+_guarded: "contextvars.ContextVar[bool]" = contextvars.ContextVar("llm_guarded", default=False)
+
+
+@contextmanager
+def llm_deadline(seconds: Optional[float]) -> Iterator[LLMScope]:
+    """Bound every LLM call made in this context (and threads started with a copy of it)."""
+    scope = LLMScope(seconds)
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+def _parse_caps(spec: str) -> Dict[str, int]:
+    caps = {}
+    for item in spec.split(","):
+        model, sep, cap = item.strip().rpartition("=")
+        if sep and model:
+            caps[model] = max(1, int(cap))
+    return caps
+
+
+class LLMLimiter:
+    """Per-model semaphores and breakers plus the retry loop that every guarded call goes through."""
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, model_caps: Optional[Dict[str, int]] = None,
+                 call_timeout: float = DEFAULT_CALL_TIMEOUT_SECONDS, max_retries: int = DEFAULT_MAX_RETRIES,
+                 breaker_failures: int = DEFAULT_BREAKER_FAILURES,
+                 breaker_reset_seconds: float = DEFAULT_BREAKER_RESET_SECONDS,
+                 retry_base: float = RETRY_BASE_SECONDS, retry_max: float = RETRY_MAX_SECONDS,
+                 seed: Optional[int] = None):
+        self.max_concurrency = max_concurrency
+        self.model_caps = dict(model_caps or {})
+        self.call_timeout = call_timeout
+        self.max_retries = max_retries
+        self.breaker_failures = breaker_failures
+        self.breaker_reset_seconds = breaker_reset_seconds
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._rng = random.Random(seed)
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LLMLimiter":
+        return cls(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+            model_caps=_parse_caps(os.getenv("LLM_MODEL_CONCURRENCY", "")),
+            call_timeout=float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", DEFAULT_CALL_TIMEOUT_SECONDS)),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+            breaker_failures=int(os.getenv("LLM_BREAKER_FAILURES", DEFAULT_BREAKER_FAILURES)),
+            breaker_reset_seconds=float(os.getenv("LLM_BREAKER_RESET_SECONDS", DEFAULT_BREAKER_RESET_SECONDS)),
+        )
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(model)
+            if breaker is None:
+                breaker = self._breakers[model] = CircuitBreaker(self.breaker_failures, self.breaker_reset_seconds)
+            return breaker
+
+    def _semaphore(self, model: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._semaphores.get(model)
+            if sem is None:
+                sem = self._semaphores[model] = threading.BoundedSemaphore(self.model_caps.get(model, self.max_concurrency))
+            return sem
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            models = sorted(set(self._breakers) | set(self._semaphores))
+        return {m: {"breaker": self.breaker(m).state, "cap": self.model_caps.get(m, self.max_concurrency)} for m in models}
+
+    def _refuse(self, scope: Optional[LLMScope], error: LLMUnavailable) -> LLMUnavailable:
+        metrics.incr("llm.refused")
+        if scope is not None:
+            scope.refuse(str(error))
+        return error
+
+    def _attempt(self, model: str, fn: Callable[[], Any], scope: Optional[LLMScope]) -> Any:
+        """One call on its own thread, holding a concurrency slot until the provider answers."""
+        remaining = scope.remaining() if scope is not None else None
+        if remaining is not None and remaining <= 0:
+            raise self._refuse(scope, LLMDeadlineExceeded(f"LLM deadline passed before calling {model}"))
+        sem = self._semaphore(model)
+        if not sem.acquire(timeout=remaining):
+            raise self._refuse(scope, LLMDeadlineExceeded(f"LLM deadline passed waiting for a {model} slot"))
+
+        box: Dict[str, Any] = {}
+        done = threading.Event()
+        ctx = contextvars.copy_context()
+
+        def target():
+            try:
+                box["result"] = ctx.run(fn)
+            except BaseException as e:
+                box["error"] = e
+            finally:
+                sem.release()
+                done.set()
+
+        threading.Thread(target=target, name=f"llm-{model}", daemon=True).start()
+        timeout = self.call_timeout if remaining is None else min(self.call_timeout, remaining)
+        if not done.wait(timeout):
+            metrics.incr("llm.timeouts")
+            if timeout < self.call_timeout:
+                raise self._refuse(scope, LLMDeadlineExceeded(f"LLM deadline passed during a {model} call"))
+            raise TimeoutError(f"{model} call exceeded {self.call_timeout:.0f}s")
+        if "error" in box:
+            raise box["error"]
+        return box["result"]
+
+    def call(self, model: str, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` (one LLM request) under the limits for ``model``."""
+        scope = _scope.get()
+        breaker = self.breaker(model)
+        for attempt in range(self.max_retries + 1):
+            if not breaker.allow():
+                raise self._refuse(scope, LLMUnavailable(f"Circuit breaker open for {model}"))
+            metrics.incr("llm.calls")
+            try:
+                with metrics.timer("llm.call"):
+                    result = self._attempt(model, fn, scope)
+            except LLMUnavailable:
+                breaker.cancel()
+                raise
+            except Exception as e:
+                breaker.record_failure()
+                metrics.incr("llm.failures")
+                metrics.set(f"llm.breaker_open.{model}", 0 if breaker.state == "closed" else 1)
+                if attempt >= self.max_retries or not _retryable(e):
+                    raise
+                # Full jitter, never sleeping past the deadline.
+                delay = self._rng.uniform(0, min(self.retry_max, self.retry_base * (2 ** attempt)))
+                remaining = scope.remaining() if scope is not None else None
+                if remaining is not None and delay >= remaining:
+                    raise self._refuse(scope, LLMDeadlineExceeded(f"LLM deadline leaves no time to retry {model}")) from e
+                metrics.incr("llm.retries")
+                time.sleep(delay)
+            else:
+                breaker.record_success()
+                metrics.set(f"llm.breaker_open.{model}", 0)
+                return result
+
+
+def guard_class(cls: type, limiter: "LLMLimiter") -> None:
+    """Route ``cls.call`` through ``limiter``; a no-op if it already is."""
+    original = cls.__dict__.get("call")
+    if original is None or getattr(original, "__llm_limiter__", None) is not None:
+        return
+
+    @functools.wraps(original, updated=())
+    def wrapper(self, *args, **kwargs):
+        if _guarded.get():  # A provider delegating to another guarded call() is limited once.
+            return original(self, *args, **kwargs)
+        model = str(getattr(self, "model", None) or cls.__name__)
+
+        def guarded():
+            _guarded.set(True)
+            return original(self, *args, **kwargs)
+
+        return limiter.call(model, guarded)
+
+    wrapper.__llm_limiter__ = limiter
+    setattr(cls, "call", wrapper)
+
+
+def _llm_classes() -> List[type]:
+    """crewai's LLM plus every loaded provider class that implements call() itself."""
+    from crewai import LLM
+
+    try:
+        from crewai.llms.base_llm import BaseLLM
+    except ImportError:  # Older crewai: LLM is the only implementation.
+        BaseLLM = LLM
+    seen, stack = [], [LLM, BaseLLM]
+    while stack:
+        cls = stack.pop()
+        if cls in seen:
+            continue
+        seen.append(cls)
+        stack.extend(cls.__subclasses__())
+    return [cls for cls in seen if cls is not BaseLLM and "call" in cls.__dict__]
+
+
+_limiter: Optional[LLMLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_llm_limiter() -> LLMLimiter:
+    """Process-wide limiter configured from the environment."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = LLMLimiter.from_env()
+    return _limiter
+
+
+def install_llm_limiter() -> LLMLimiter:
+    """
+    Guard call() on crewai's LLM and on every provider class loaded so far.
+    Provider classes load when the first LLM for them is built, so call this
+    after constructing one. Safe to call repeatedly.
+    """
+    limiter = get_llm_limiter()
+    for cls in _llm_classes():
+        guard_class(cls, limiter)
+    return limiter
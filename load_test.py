@@ -0,0 +1,341 @@
+"""
+Load generator for the API with throughput, latency and memory reports.
+
+    python load_test.py                                   # every scenario, local worker + NOAA stand-in
+    python load_test.py --scenarios dashboard --concurrency 64 --duration 30
+    python load_test.py --url http://127.0.0.1:8000       # an already running server
+    python load_test.py --compare load_baseline.json      # exit 1 on regression
+    python load_test.py --llm replay                      # crew calls from cassettes/crew.json
+
+By default the harness starts the offline NOAA stand-in (swpc_standin.py)
+and one uvicorn worker pointed at it. Crew scenarios answer LLM and search
+calls with deterministic canned responses (CASSETTE_MODE=stub), or with
+--llm replay from a recorded cassette, so no external service is contacted. Each scenario reports RPS, p50/p95/p99
+latency, error rate, status counts, per-endpoint latency and the worker's
+RSS. Results are written as JSON for baseline comparison.
+
+Requires httpx.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmark_models import environment, percentiles
+from cassettes import DEFAULT_CASSETTE_DIR, DEFAULT_CASSETTE_NAME
+
+DEFAULT_DURATION = 20.0
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PORT = 8766  # the stand-in's CLI default is 8765
+# Relative change tolerated by --compare before a metric counts as a regression.
+DEFAULT_TOLERANCE = 0.25
+# Absolute error-rate increase tolerated by --compare.
+ERROR_RATE_TOLERANCE = 0.01
+
+RequestSpec = Tuple[str, str, Optional[Dict[str, Any]]]  # method, path, JSON body
+
+SHIELDING = ("Standard", "Hardened", "Light/Legacy")
+HISTORICAL_EVENTS = (
+    ("March 1989 Geomagnetic Storm", "1989-03-13", 9.0),
+    ("Halloween Storms", "2003-10-29", 9.0),
+    ("St. Patrick's Day Storm", "2015-03-17", 8.0),
+    ("Gannon Storm", "2024-05-10", 9.0),
+    ("Bastille Day Event", "2000-07-15", 9.0),
+)
+
+
+def _policy(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "asset_value_millions": round(rng.uniform(50, 800), 1),
+        "shielding_level": rng.choice(SHIELDING),
+        "years_in_orbit": rng.randint(0, 15),
+        "adjustment_factor": 1.0,
+    }
+
+
+def _historical_policy(rng: random.Random) -> Dict[str, Any]:
+    name, date, kp = rng.choice(HISTORICAL_EVENTS)
+    return dict(_policy(rng), historical_kp=kp, historical_event_name=name, historical_date=date)
+
+
+@dataclass
+class Scenario:
+    """A weighted request mix. ``burst`` > 0 fires that many requests at once, then waits ``burst_interval``."""
+    name: str
+    mix: List[Tuple[float, Callable[[random.Random], RequestSpec]]]
+    revalidate: bool = False  # send If-None-Match like a polling browser
+    burst: int = 0
+    burst_interval: float = 2.0
+
+    def pick(self, rng: random.Random) -> RequestSpec:
+        weights = [w for w, _ in self.mix]
+        return rng.choices([make for _, make in self.mix], weights)[0](rng)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "dashboard": Scenario(
+        "dashboard",
+        [
+            (4.0, lambda rng: ("GET", "/api/dashboard", None)),
+            (2.0, lambda rng: ("GET", "/api/kp-forecast", None)),
+            (1.0, lambda rng: ("GET", "/api/daily-geomag?limit=14", None)),
+            (1.0, lambda rng: ("GET", "/api/forecast-3day", None)),
+            (1.0, lambda rng: ("GET", "/api/kp-distribution", None)),
+            (1.0, lambda rng: ("GET", "/api/portfolio", None)),
+        ],
+        revalidate=True,
+    ),
+    "historical": Scenario(
+        "historical",
+        [
+            (3.0, lambda rng: ("POST", "/api/stress-test", {"threshold": rng.choice([6.0, 7.0, 8.0])})),
+            (1.0, lambda rng: ("POST", "/api/run-historical", _historical_policy(rng))),
+        ],
+        burst=8,
+    ),
+    "quote": Scenario(
+        "quote",
+        [
+            (1.0, lambda rng: ("POST", "/api/run", _policy(rng))),
+            (3.0, lambda rng: ("POST", "/api/quote", _policy(rng))),
+        ],
+    ),
+}
+
+
+# --- Measurement ---
+@dataclass
+class Sample:
+    endpoint: str
+    status: int
+    seconds: float
+    error: Optional[str] = None
+
+
+def summarize(samples: List[Sample], elapsed: float, rss: Dict[str, Optional[float]]) -> Dict[str, Any]:
+    ok = [s for s in samples if 0 < s.status < 400]
+    errors = len(samples) - len(ok)
+    statuses: Dict[str, int] = {}
+    by_endpoint: Dict[str, List[float]] = {}
+    transport_errors: Dict[str, int] = {}
+    for s in samples:
+        statuses[str(s.status)] = statuses.get(str(s.status), 0) + 1
+        if s.error:
+            transport_errors[s.error] = transport_errors.get(s.error, 0) + 1
+        by_endpoint.setdefault(s.endpoint, []).append(s.seconds)
+    return {
+        "requests": len(samples),
+        "elapsed_seconds": round(elapsed, 3),
+        "rps": round(len(ok) / elapsed, 2) if elapsed > 0 else 0.0,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "status_counts": statuses,
+        "transport_errors": transport_errors,
+        "latency": percentiles([s.seconds for s in ok]) if ok else None,
+        "by_endpoint": {ep: dict(percentiles(t), count=len(t)) for ep, t in sorted(by_endpoint.items())},
+        "rss_mb": rss,
+    }
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of ``pid`` from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024.0, 1)
+    except OSError:
+        return None
+    return None
+
+
+async def _sample_rss(pid: Optional[int], stop: asyncio.Event, out: Dict[str, Optional[float]]) -> None:
+    if pid is None:
+        return
+    out["start"] = out["peak"] = rss_mb(pid)
+    while not stop.is_set():
+        current = rss_mb(pid)
+        if current is not None:
+            out["peak"] = max(out["peak"] or 0.0, current)
+            out["end"] = current
+        try:
+            await asyncio.wait_for(stop.wait(), 0.5)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_scenario(client, scenario: Scenario, duration: float, concurrency: int,
+                       seed: int = 0, worker_pid: Optional[int] = None) -> Dict[str, Any]:
+    """Drive ``scenario`` through an httpx.AsyncClient for ``duration`` seconds."""
+    samples: List[Sample] = []
+    etags: Dict[str, str] = {}
+    deadline = time.perf_counter() + duration
+
+    async def one(rng: random.Random) -> None:
+        method, path, body = scenario.pick(rng)
+        endpoint = path.split("?", 1)[0]
+        headers = {"Accept-Encoding": "gzip"}
+        if scenario.revalidate and path in etags:
+            headers["If-None-Match"] = etags[path]
+        started = time.perf_counter()
+        error = None
+        try:
+            resp = await client.request(method, path, json=body, headers=headers)
+            status = resp.status_code
+            if scenario.revalidate and resp.headers.get("etag"):
+                etags[path] = resp.headers["etag"]
+        except Exception as e:
+            status, error = 0, type(e).__name__  # connection error or timeout
+        samples.append(Sample(endpoint, status, time.perf_counter() - started, error))
+
+    async def closed_loop(worker: int) -> None:
+        rng = random.Random(seed * 1000 + worker)
+        while time.perf_counter() < deadline:
+            await one(rng)
+
+    async def bursts() -> None:
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            await asyncio.gather(*(one(random.Random(rng.random())) for _ in range(scenario.burst)))
+            await asyncio.sleep(scenario.burst_interval)
+
+    rss: Dict[str, Optional[float]] = {"start": None, "peak": None, "end": None}
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_rss(worker_pid, stop, rss))
+    started = time.perf_counter()
+    if scenario.burst > 0:
+        await bursts()
+    else:
+        await asyncio.gather(*(closed_loop(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+    return summarize(samples, elapsed, rss)
+
+
+# --- Worker and stand-in ---
+def start_worker(port: int, env: Dict[str, str]) -> subprocess.Popen:
+    cmd = [sys.executable, "-m", "uvicorn", "api_server:app", "--host", "127.0.0.1",
+           "--port", str(port), "--workers", "1", "--log-level", "warning"]
+    return subprocess.Popen(cmd, env=dict(os.environ, **env), cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_healthy(url: str, timeout: float = 60.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/api/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"API at {url} did not become healthy within {timeout:.0f}s")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Regressions in RPS, p95 latency or error rate beyond the tolerances."""
+    regressions = []
+    for name, result in current.get("scenarios", {}).items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        if result["rps"] < base["rps"] / (1 + tolerance):
+            regressions.append(f"{name}: rps {base['rps']} -> {result['rps']}")
+        if result.get("latency") and base.get("latency"):
+            p95, base_p95 = result["latency"]["p95_ms"], base["latency"]["p95_ms"]
+            if p95 > base_p95 * (1 + tolerance):
+                regressions.append(f"{name}: p95 {base_p95}ms -> {p95}ms")
+        if result["error_rate"] > base["error_rate"] + ERROR_RATE_TOLERANCE:
+            regressions.append(f"{name}: error rate {base['error_rate']} -> {result['error_rate']}")
+    return regressions
+
+
+async def _run_all(url: str, names: List[str], args, worker_pid: Optional[int]) -> Dict[str, Any]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(args.concurrency, 64))
+    results = {}
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        for name in names:
+            result = await run_scenario(client, SCENARIOS[name], args.duration, args.concurrency, args.seed, worker_pid)
+            print(json.dumps({"scenario": name, **{k: result[k] for k in ("requests", "rps", "error_rate", "latency")}}))
+            results[name] = result
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="Seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="Target an already running API instead of starting a worker")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--noaa-latency-ms", type=float, default=0.0, help="Stand-in NOAA latency")
+    parser.add_argument("--llm", choices=("stub", "replay"), default="stub",
+                        help="Crew LLM/search calls: canned answers, or a recorded cassette")
+    parser.add_argument("--llm-latency", default="recorded",
+                        help="CASSETTE_LATENCY for crew calls (ms; 'recorded' is 0 for stubs)")
+    parser.add_argument("--output", default="load_results.json")
+    parser.add_argument("--compare", help="Baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    cassette = os.path.join(os.getenv("CASSETTE_DIR", DEFAULT_CASSETTE_DIR),
+                            f"{os.getenv('CASSETTE_NAME', DEFAULT_CASSETTE_NAME)}.json")
+    if args.url is None and args.llm == "replay" and not os.path.exists(cassette):
+        # Every crew call would miss and /api/run would only measure 500s.
+        parser.error(f"--llm replay needs a recorded cassette at {cassette} (record one with CASSETTE_MODE=record uvicorn api_server:app)")
+
+    standin = worker = None
+    url = args.url
+    try:
+        if url is None:
+            from swpc_standin import Faults, SwpcStandIn
+
+            standin = SwpcStandIn(faults=Faults(latency_ms=args.noaa_latency_ms), seed=args.seed).start()
+            worker = start_worker(args.port, {
+                "SWPC_BASE_URL": standin.url,
+                "CASSETTE_MODE": args.llm,
+                "CASSETTE_LATENCY": args.llm_latency,
+                "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", args.llm),
+                # crewai otherwise exports telemetry and, on a first run, blocks 20s on a "view traces?" prompt.
+                "CREWAI_DISABLE_TELEMETRY": "true",
+                "OTEL_SDK_DISABLED": "true",
+                "CREWAI_TESTING": "true",
+            })
+            url = f"http://127.0.0.1:{args.port}"
+        wait_healthy(url)
+        results = asyncio.run(_run_all(url, args.scenarios, args, worker.pid if worker else None))
+    finally:
+        if worker is not None:
+            worker.terminate()
+            worker.wait(timeout=10)
+        if standin is not None:
+            standin.stop()
+
+    config = {k: getattr(args, k) for k in ("duration", "concurrency", "seed", "noaa_latency_ms", "llm", "llm_latency")}
+    report = {"environment": environment(), "config": dict(config, url=args.url or "local"), "scenarios": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} scenarios to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,48 +1,113 @@
 import numpy as np
 import pandas as pd
-import joblib
-from tensorflow.keras.models import load_model
 import os
+import time
+import threading
+
+from metrics import metrics
+from onnx_backend import OnnxModel, is_onnx_path
 
 # --- Constants ---
-# Assumes your models are in a sub-folder named 'models'
-MODEL_PATH = os.path.join('models', 'your_lstm_model.h5')
-SCALER_PATH = os.path.join('models', 'your_scaler.pkl')
+# The shipped Kp model (see models/manifest.json). No scaler file was shipped
+# with it, so inputs pass through unscaled unless a scaler path is given.
+MODEL_PATH = os.path.join('agents', 'kp_forecasting_model.h5')
+SCALER_PATH = None
 
 # The number of past time steps the model was trained on
 N_STEPS = 60 # Example: Trained on 60 minutes of data to predict the next step
 # The number of features the model expects (e.g., speed, density, temperature, etc.)
 N_FEATURES = 5 # Example: If you used 5 solar wind parameters as input
+# Windows per model call in the batched API; bounds peak memory for long backtests.
+DEFAULT_BATCH_SIZE = 1024
+# Index of the Kp target within the scaler's feature columns.
+TARGET_INDEX = 0
+
+
+def sliding_windows(series: np.ndarray, n_steps: int = N_STEPS, stride: int = 1) -> np.ndarray:
+    """
+    All length-``n_steps`` windows over a (T, F) series as a zero-copy strided
+    view of shape (N, n_steps, F), where N = (T - n_steps) // stride + 1.
+    """
+    series = np.asarray(series)
+    if series.ndim != 2:
+        raise ValueError(f"Expected a (T, F) series, got shape {series.shape}.")
+    if series.shape[0] < n_steps:
+        raise ValueError(f"Need at least {n_steps} time steps, got {series.shape[0]}.")
+    windows = np.lib.stride_tricks.sliding_window_view(series, n_steps, axis=0)
+    # sliding_window_view puts the window axis last: (N, F, n_steps) -> (N, n_steps, F).
+    return windows.transpose(0, 2, 1)[::stride]
+
+
+def scaler_affine(scaler) -> tuple[np.ndarray, np.ndarray] | None:
+    """
+    (scale, offset) such that ``scaler.transform(X) == X * scale + offset`` for
+    the common sklearn scalers, or None if the scaler is not affine-known.
+    """
+    if hasattr(scaler, "min_") and hasattr(scaler, "scale_"):  # MinMaxScaler
+        return np.asarray(scaler.scale_, dtype=np.float64), np.asarray(scaler.min_, dtype=np.float64)
+    if hasattr(scaler, "mean_") and hasattr(scaler, "scale_"):  # StandardScaler
+        scale = 1.0 / np.asarray(scaler.scale_, dtype=np.float64)
+        mean = np.asarray(scaler.mean_ if scaler.mean_ is not None else 0.0, dtype=np.float64)
+        return scale, -mean * scale
+    return None
+
 
 class LSTMModelHandler:
     """
     A class to encapsulate the loading and prediction logic for a pre-trained
     LSTM model and its associated scaler.
+
+    Input shape defaults to (N_STEPS, N_FEATURES); models registered with a
+    different window take theirs from the manifest. Without a scaler path the
+    inputs are assumed to be pre-scaled (identity transform).
     """
-    def __init__(self, model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    n_steps = N_STEPS
+    n_features = N_FEATURES
+
+    def __init__(self, model_path=MODEL_PATH, scaler_path=SCALER_PATH, n_steps=N_STEPS, n_features=N_FEATURES):
         self.model = None
         self.scaler = None
+        self._affine = None
+        self.n_steps = n_steps
+        self.n_features = n_features
         self.load_model_and_scaler(model_path, scaler_path)
 
     def load_model_and_scaler(self, model_path, scaler_path):
         """
-        Loads the Keras model and the joblib scaler from disk.
-        Handles errors if the files are not found.
+        Loads the model (Keras, or an ONNX export via onnxruntime) and the
+        joblib scaler from disk. Handles errors if the files are not found.
         """
+        started = time.perf_counter()
         try:
+            # TensorFlow and joblib are only needed once a model is actually loaded,
+            # and an ONNX export avoids TensorFlow entirely.
             print(f"Attempting to load model from: {os.path.abspath(model_path)}")
-            self.model = load_model(model_path)
-            print(f"Attempting to load scaler from: {os.path.abspath(scaler_path)}")
-            self.scaler = joblib.load(scaler_path)
+            if is_onnx_path(model_path):
+                self.model = OnnxModel(model_path)
+            else:
+                from tensorflow.keras.models import load_model
+
+                self.model = load_model(model_path)
+            if scaler_path is None:
+                self._affine = (np.ones(self.n_features), np.zeros(self.n_features))
+            else:
+                import joblib
+
+                print(f"Attempting to load scaler from: {os.path.abspath(scaler_path)}")
+                self.scaler = joblib.load(scaler_path)
+                self._affine = scaler_affine(self.scaler)
             print("LSTM model and scaler loaded successfully.")
+            metrics.set("lstm.load_seconds", time.perf_counter() - started)
         except FileNotFoundError as e:
             print(f"Warning: Model or scaler file not found. {e}. The LSTM tool will not be usable.")
             self.model = None
             self.scaler = None
+            self._affine = None
         except Exception as e:
             print(f"An error occurred during model/scaler loading: {e}")
             self.model = None
             self.scaler = None
+            self._affine = None
 
     def prepare_input_data(self, recent_data: pd.DataFrame) -> np.ndarray | None:
         """
@@ -55,24 +120,29 @@ class LSTMModelHandler:
         Returns:
             A numpy array ready for model prediction, or None if an error occurs.
         """
-        if self.scaler is None:
-            print("Error: Scaler is not loaded. Cannot prepare data.")
-            return None
-            
-        if len(recent_data) < N_STEPS:
-            print(f"Error: Not enough data provided. Expected {N_STEPS} time steps, but got {len(recent_data)}.")
-            return None
-
-        # Ensure the data has the correct number of features
-        if recent_data.shape[1] != N_FEATURES:
-            print(f"Error: Incorrect number of features. Expected {N_FEATURES}, but got {recent_data.shape[1]}.")
+        if not self._check_recent_data(recent_data):
             return None
 
         # Scale the data using the pre-trained scaler
-        scaled_data = self.scaler.transform(recent_data.tail(N_STEPS))
+        scaled_data = self.scale(np.asarray(recent_data.tail(self.n_steps), dtype=np.float64))
         
         # Reshape for LSTM input: [1, n_steps, n_features]
-        return scaled_data.reshape(1, N_STEPS, N_FEATURES)
+        return scaled_data.reshape(1, self.n_steps, self.n_features)
+
+    def _check_recent_data(self, recent_data: pd.DataFrame) -> bool:
+        if self.scaler is None and self._affine is None:
+            print("Error: Scaler is not loaded. Cannot prepare data.")
+            return False
+            
+        if len(recent_data) < self.n_steps:
+            print(f"Error: Not enough data provided. Expected {self.n_steps} time steps, but got {len(recent_data)}.")
+            return False
+
+        # Ensure the data has the correct number of features
+        if recent_data.shape[1] != self.n_features:
+            print(f"Error: Incorrect number of features. Expected {self.n_features}, but got {recent_data.shape[1]}.")
+            return False
+        return True
 
     def predict(self, input_data: pd.DataFrame) -> float | None:
         """
@@ -88,22 +158,167 @@ class LSTMModelHandler:
             print("Error: Model is not loaded. Cannot make a prediction.")
             return None
 
-        prepared_input = self.prepare_input_data(input_data)
-        if prepared_input is None:
+        if not self._check_recent_data(input_data):
             return None
-        
-        # Make a prediction
-        predicted_scaled = self.model.predict(prepared_input)
-        
-        # The scaler was likely trained on all features including the target.
-        # To inverse transform, we need to create a dummy array of the correct shape.
-        dummy_array = np.zeros((1, N_FEATURES))
-        dummy_array[0, 0] = predicted_scaled[0, 0] # Assuming Kp is the first feature
-        
-        # Inverse transform to get the actual Kp value
-        predicted_kp = self.scaler.inverse_transform(dummy_array)[0, 0]
-        
-        return predicted_kp
+
+        window = np.asarray(input_data.tail(self.n_steps), dtype=np.float64)[None, :, :]
+        return float(self.predict_batch(window)[0])
+
+    # --- Batched inference ---
+    def scale(self, raw: np.ndarray) -> np.ndarray:
+        """Scale a (..., F) array of raw features, vectorized over all leading axes."""
+        raw = np.asarray(raw, dtype=np.float64)
+        if self._affine is not None:
+            scale, offset = self._affine
+            return raw * scale + offset
+        flat = raw.reshape(-1, raw.shape[-1])
+        return self.scaler.transform(flat).reshape(raw.shape)
+
+    def unscale_target(self, scaled: np.ndarray) -> np.ndarray:
+        """Inverse-transform scaled Kp predictions without building a dummy feature array."""
+        scaled = np.asarray(scaled, dtype=np.float64).reshape(-1)
+        if self._affine is not None:
+            scale, offset = self._affine
+            return (scaled - offset[TARGET_INDEX]) / scale[TARGET_INDEX]
+        dummy = np.zeros((scaled.shape[0], self.n_features))
+        dummy[:, TARGET_INDEX] = scaled
+        return self.scaler.inverse_transform(dummy)[:, TARGET_INDEX]
+
+    def _infer_scaled(self, scaled_windows: np.ndarray, batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+        """One model call per ``batch_size`` windows; returns flat scaled predictions."""
+        n = scaled_windows.shape[0]
+        out = np.empty(n, dtype=np.float64)
+        with metrics.timer("lstm.inference"):
+            for lo in range(0, n, batch_size):
+                chunk = np.ascontiguousarray(scaled_windows[lo:lo + batch_size], dtype=np.float32)
+                if chunk.shape[0] <= 32:
+                    # Direct call skips predict()'s per-call dataset/callback setup on small batches.
+                    pred = np.asarray(self.model(chunk, training=False))
+                else:
+                    pred = self.model.predict(chunk, batch_size=chunk.shape[0], verbose=0)
+                out[lo:lo + chunk.shape[0]] = np.asarray(pred).reshape(chunk.shape[0], -1)[:, 0]
+        metrics.incr("lstm.predictions", n)
+        return out
+
+    def predict_batch(self, windows: np.ndarray, batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+        """
+        Predict Kp for an (N, n_steps, n_features) array of raw (unscaled) windows.
+
+        Scaling, inference and the inverse transform each run once over the whole
+        batch. Returns an (N,) array of Kp values.
+        """
+        if not self.ready:
+            raise RuntimeError("LSTM model or scaler is not loaded.")
+        windows = np.asarray(windows)
+        if windows.ndim != 3 or windows.shape[1:] != (self.n_steps, self.n_features):
+            raise ValueError(f"Expected (N, {self.n_steps}, {self.n_features}) windows, got {windows.shape}.")
+        return self.unscale_target(self._infer_scaled(self.scale(windows), batch_size))
+
+    def predict_series(
+        self,
+        series: np.ndarray | pd.DataFrame,
+        stride: int = 1,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> np.ndarray:
+        """
+        Rolling-window forecast over a long (T, n_features) series.
+
+        The series is scaled once and windows are strided views into it, so
+        backtesting T steps costs O(T * F) scaling plus ceil(N / batch_size)
+        model calls. Element i is the prediction from the window ending at row
+        ``n_steps - 1 + i * stride``.
+        """
+        if not self.ready:
+            raise RuntimeError("LSTM model or scaler is not loaded.")
+        raw = np.asarray(series, dtype=np.float64)
+        if raw.ndim != 2 or raw.shape[1] != self.n_features:
+            raise ValueError(f"Expected a (T, {self.n_features}) series, got shape {raw.shape}.")
+        windows = sliding_windows(self.scale(raw), self.n_steps, stride)
+        return self.unscale_target(self._infer_scaled(windows, batch_size))
+
+    @property
+    def ready(self) -> bool:
+        return self.model is not None and (self.scaler is not None or self._affine is not None)
+
+
+class StreamingLSTMPredictor:
+    """
+    Per-sample Kp nowcasts from a pre-scaled ring buffer of the last N_STEPS rows.
+
+    The buffer is stored twice back-to-back (length 2 * n_steps) and every
+    sample is written to both halves, so the latest window is always one
+    contiguous slice. Appending costs O(F) and inference reads the slice
+    directly, with no rescaling or reshaping of the history.
+    """
+
+    def __init__(self, handler: "LSTMModelHandler | None" = None, n_steps: int | None = None, n_features: int | None = None):
+        self.handler = handler
+        self.n_steps = n_steps or getattr(handler, "n_steps", N_STEPS)
+        self.n_features = n_features or getattr(handler, "n_features", N_FEATURES)
+        self._buf = np.zeros((2 * self.n_steps, self.n_features), dtype=np.float32)
+        self._pos = 0       # next write slot in [0, n_steps)
+        self._count = 0     # samples seen, saturating at n_steps
+        self._lock = threading.Lock()
+
+    def _handler(self) -> "LSTMModelHandler":
+        return self.handler if self.handler is not None else get_lstm_handler()
+
+    @property
+    def ready(self) -> bool:
+        return self._count >= self.n_steps
+
+    def append(self, sample) -> None:
+        """Scale one raw (F,) observation and push it into the buffer."""
+        row = np.asarray(sample, dtype=np.float64).reshape(-1)
+        if row.shape[0] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {row.shape[0]}.")
+        scaled = self._handler().scale(row)
+        with self._lock:
+            self._buf[self._pos] = scaled
+            self._buf[self._pos + self.n_steps] = scaled
+            self._pos = (self._pos + 1) % self.n_steps
+            self._count = min(self._count + 1, self.n_steps)
+
+    def extend(self, samples) -> None:
+        for sample in np.asarray(samples, dtype=np.float64):
+            self.append(sample)
+
+    def window(self) -> np.ndarray:
+        """The scaled (n_steps, F) window, oldest row first, as a view into the buffer."""
+        return self._buf[self._pos:self._pos + self.n_steps]
+
+    def predict(self) -> float | None:
+        """Kp nowcast from the current window, or None until n_steps samples have arrived."""
+        handler = self._handler()
+        if not self.ready or not handler.ready:
+            return None
+        with self._lock:
+            scaled = handler._infer_scaled(self.window()[None, :, :], batch_size=1)
+        return float(handler.unscale_target(scaled)[0])
+
+    def push(self, sample) -> float | None:
+        """Append one observation and return the refreshed nowcast."""
+        self.append(sample)
+        return self.predict()
+
+
+# --- Process-wide handler ---
+# Loading the Keras model costs seconds, so the model registry keeps one warm
+# handler per registered model; this returns the default Kp model.
+def get_lstm_handler(reload: bool = False) -> LSTMModelHandler:
+    """Return the shared handler for the registry's default Kp model."""
+    from model_registry import get_model_registry
+
+    registry = get_model_registry()
+    handler = registry.get(registry.default("kp").name, reload=reload)
+    metrics.set("lstm.ready", 1.0 if handler.ready else 0.0)
+    return handler
+
+
+def warm_lstm_handler() -> bool:
+    """Load the shared handler ahead of the first request; returns True if the model is usable."""
+    return get_lstm_handler().ready
+
 
 # Example of how you would use this class (for testing)
 # if __name__ == '__main__':
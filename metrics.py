@@ -0,0 +1,75 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator
+
+# Keep the most recent N observations per timer for percentile estimates.
+RESERVOIR_SIZE = 1024
+
+
+class Metrics:
+    """
+    Minimal in-process metrics registry: gauges, counters and timers.
+
+    Timers keep a bounded window of recent samples so percentiles reflect
+    current behaviour without unbounded memory.
+    """
+
+    def __init__(self, reservoir_size: int = RESERVOIR_SIZE):
+        self.reservoir_size = reservoir_size
+        self._lock = threading.Lock()
+        self._gauges: Dict[str, float] = {}
+        self._counters: Dict[str, int] = {}
+        self._samples: Dict[str, Deque[float]] = {}
+        self._totals: Dict[str, Dict[str, float]] = {}
+
+    def set(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = float(value)
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.reservoir_size)
+                self._totals[name] = {"count": 0, "sum": 0.0}
+            samples.append(float(seconds))
+            totals = self._totals[name]
+            totals["count"] += 1
+            totals["sum"] += float(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            timers = {}
+            for name, samples in self._samples.items():
+                ordered = sorted(samples)
+                n = len(ordered)
+                totals = self._totals[name]
+                timers[name] = {
+                    "count": int(totals["count"]),
+                    "mean_ms": round(totals["sum"] / totals["count"] * 1000.0, 3) if totals["count"] else None,
+                    "p50_ms": round(ordered[n // 2] * 1000.0, 3) if n else None,
+                    "p95_ms": round(ordered[min(n - 1, int(n * 0.95))] * 1000.0, 3) if n else None,
+                    "max_ms": round(ordered[-1] * 1000.0, 3) if n else None,
+                }
+            return {
+                "gauges": dict(self._gauges),
+                "counters": dict(self._counters),
+                "timers": timers,
+            }
+
+
+metrics = Metrics()
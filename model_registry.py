@@ -0,0 +1,280 @@
+import os
+import json
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from metrics import metrics
+
+MANIFEST_PATH = os.path.join('models', 'manifest.json')
+TARGETS = ("kp", "dst")
+# "native" runs the framework the model was trained in; "onnx" runs its verified
+# ONNX export under onnxruntime. MODEL_BACKEND overrides every manifest entry.
+BACKENDS = ("native", "onnx")
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """One manifest entry: where a model lives and the input shape it expects."""
+    name: str
+    version: str
+    framework: str
+    target: str
+    path: str
+    scaler: Optional[str] = None
+    n_steps: Optional[int] = None
+    n_features: int = 5
+    # Input column order, named as in the SWPC solar wind products; None when not fed from them.
+    features: Optional[Tuple[str, ...]] = None
+    warm: bool = True
+    description: str = ""
+    backend: str = "native"
+    onnx_path: Optional[str] = None
+    # False when outputs are not known to be in the target's physical units (e.g. no scaler or
+    # original forward() survived); served values are then flagged and kept out of pricing.
+    calibrated: bool = True
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.version}"
+
+    @property
+    def active_backend(self) -> str:
+        backend = os.getenv("MODEL_BACKEND") or self.backend
+        if backend == "onnx" and not (self.onnx_path and os.path.exists(self.onnx_path)):
+            return "native"  # No export yet: run the original model.
+        return backend
+
+    @property
+    def runtime_path(self) -> str:
+        return self.onnx_path if self.active_backend == "onnx" else self.path
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(asdict(self), key=self.key)
+
+
+@dataclass(frozen=True)
+class EnsembleSpec:
+    """Weighted average of same-target, same-shape registered models."""
+    name: str
+    members: tuple
+    weights: tuple
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "members": list(self.members), "weights": list(self.weights)}
+
+
+# --- Loaders (one per framework; ``path`` is the native file or its ONNX export) ---
+def _load_keras(spec: ModelSpec, path: str):
+    from lstm_model_handle import LSTMModelHandler
+
+    return LSTMModelHandler(path, spec.scaler, n_steps=spec.n_steps, n_features=spec.n_features)
+
+
+def _load_torch(spec: ModelSpec, path: str):
+    from dst_model_handle import DstModelHandler
+
+    return DstModelHandler(path)
+
+
+LOADERS: Dict[str, Callable[[ModelSpec, str], Any]] = {
+    "keras": _load_keras,
+    "torch": _load_torch,
+}
+
+
+def _version_key(version: str) -> tuple:
+    """Order versions numerically per dotted component, so "10" sorts after "9"."""
+    return tuple((0, int(p), "") if p.isdigit() else (1, 0, p) for p in version.split("."))
+
+
+class Manifest:
+    """Parsed, validated manifest: model specs, per-target defaults and ensembles."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.specs: Dict[str, ModelSpec] = {}
+        for entry in data.get("models", []):
+            features = tuple(entry["features"]) if entry.get("features") else None
+            spec = ModelSpec(**{**entry, "version": str(entry["version"]), "features": features})
+            if features is not None and len(features) != spec.n_features:
+                raise ValueError(f"{spec.key}: {len(features)} features listed for n_features={spec.n_features}")
+            if spec.framework not in LOADERS:
+                raise ValueError(f"{spec.key}: unknown framework '{spec.framework}'")
+            if spec.target not in TARGETS:
+                raise ValueError(f"{spec.key}: target must be one of {list(TARGETS)}")
+            if spec.backend not in BACKENDS:
+                raise ValueError(f"{spec.key}: backend must be one of {list(BACKENDS)}")
+            if spec.key in self.specs:
+                raise ValueError(f"Duplicate model '{spec.key}' in manifest")
+            self.specs[spec.key] = spec
+
+        self.defaults: Dict[str, str] = dict(data.get("defaults", {}))
+        for target, name in self.defaults.items():
+            self.resolve(name)
+
+        self.ensembles: Dict[str, EnsembleSpec] = {}
+        for name, cfg in data.get("ensembles", {}).items():
+            members = tuple(self.resolve(m).key for m in cfg["members"])
+            weights = tuple(float(w) for w in cfg.get("weights") or [1.0] * len(members))
+            if not members or len(weights) != len(members):
+                raise ValueError(f"Ensemble '{name}' needs one weight per member")
+            shapes = {(self.specs[k].target, self.specs[k].n_steps, self.specs[k].n_features) for k in members}
+            if len(shapes) != 1:
+                raise ValueError(f"Ensemble '{name}' mixes targets or input shapes: {sorted(shapes, key=str)}")
+            self.ensembles[name] = EnsembleSpec(name, members, weights)
+
+    @classmethod
+    def from_file(cls, path: str) -> "Manifest":
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def resolve(self, name: str, version: Optional[str] = None) -> ModelSpec:
+        """Spec for ``name`` (or ``name@version``); the highest version when none is given."""
+        if version is None and "@" in name:
+            name, version = name.split("@", 1)
+        if version is not None:
+            spec = self.specs.get(f"{name}@{version}")
+            if spec is None:
+                raise KeyError(f"Unknown model '{name}@{version}'")
+            return spec
+        candidates = [s for s in self.specs.values() if s.name == name]
+        if not candidates:
+            raise KeyError(f"Unknown model '{name}'")
+        return max(candidates, key=lambda s: _version_key(s.version))
+
+
+class ModelRegistry:
+    """
+    Keeps one warm handler per registered model.
+
+    Handlers are loaded at startup (``warm``) or on first use, and replaced by
+    ``reload``, which builds every new handler before swapping them in, so
+    requests never wait on a cold load while models are being changed.
+    """
+
+    def __init__(self, manifest_path: str = MANIFEST_PATH):
+        self.manifest_path = manifest_path
+        self.manifest = Manifest.from_file(manifest_path)
+        self._handlers: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    # --- Lookup ---
+    def specs(self) -> List[ModelSpec]:
+        return list(self.manifest.specs.values())
+
+    def resolve(self, name: str, version: Optional[str] = None) -> ModelSpec:
+        return self.manifest.resolve(name, version)
+
+    def default(self, target: str) -> ModelSpec:
+        if target not in self.manifest.defaults:
+            raise KeyError(f"No default model configured for target '{target}'")
+        return self.resolve(self.manifest.defaults[target])
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._handlers
+
+    # --- Loading ---
+    def _load(self, spec: ModelSpec):
+        with metrics.timer("models.load"):
+            handler = LOADERS[spec.framework](spec, spec.runtime_path)
+        metrics.set(f"models.{spec.key}.ready", 1.0 if handler.ready else 0.0)
+        return handler
+
+    def get(self, name: str, version: Optional[str] = None, load: bool = True, reload: bool = False):
+        """
+        Handler for a registered model. With ``load=False`` a model that is not
+        already warm raises LookupError instead of loading on the caller's thread.
+        """
+        spec = self.resolve(name, version)
+        handler = self._handlers.get(spec.key)
+        if handler is not None and not reload:
+            return handler
+        if not load:
+            raise LookupError(f"Model '{spec.key}' is not loaded")
+        with self._load_lock:
+            handler = self._handlers.get(spec.key)
+            if handler is None or reload:
+                handler = self._load(spec)
+                with self._lock:
+                    self._handlers[spec.key] = handler
+        return handler
+
+    def warm(self, targets: Optional[Sequence[str]] = None) -> Dict[str, bool]:
+        """Load every ``warm`` model (optionally only for some targets); returns readiness per model."""
+        status = {}
+        for spec in self.specs():
+            if spec.warm and (targets is None or spec.target in targets):
+                status[spec.key] = self.get(spec.name, spec.version).ready
+        return status
+
+    def reload(self) -> Dict[str, bool]:
+        """
+        Re-read the manifest and swap in new or changed models.
+
+        Unchanged handlers are kept; new ones are loaded before the swap, and
+        entries removed from the manifest are dropped afterwards.
+        """
+        manifest = Manifest.from_file(self.manifest_path)
+        with self._load_lock:
+            current = dict(self._handlers)
+            handlers: Dict[str, Any] = {}
+            for key, spec in manifest.specs.items():
+                unchanged = key in current and self.manifest.specs.get(key) == spec
+                if unchanged:
+                    handlers[key] = current[key]
+                elif spec.warm:
+                    handlers[key] = self._load(spec)
+            with self._lock:
+                self.manifest = manifest
+                self._handlers = handlers
+        metrics.incr("models.reloads")
+        return {key: h.ready for key, h in handlers.items()}
+
+    # --- Inference ---
+    def predict(self, name: str, windows: np.ndarray, version: Optional[str] = None, load: bool = True) -> np.ndarray:
+        handler = self.get(name, version, load=load)
+        if not handler.ready:
+            raise LookupError(f"Model '{self.resolve(name, version).key}' failed to load")
+        return handler.predict_batch(windows)
+
+    def predict_ensemble(self, name: str, windows: np.ndarray, load: bool = True) -> Dict[str, Any]:
+        """Weighted mean of every member's prediction; each member sees the whole batch in one call."""
+        ensemble = self.manifest.ensembles.get(name)
+        if ensemble is None:
+            raise KeyError(f"Unknown ensemble '{name}'")
+        windows = np.asarray(windows, dtype=np.float32)
+        members = {key: self.predict(key, windows, load=load) for key in ensemble.members}
+        weights = np.asarray(ensemble.weights, dtype=np.float64)
+        stacked = np.stack([members[key] for key in ensemble.members])
+        return {
+            "mean": (weights @ stacked) / weights.sum(),
+            "members": members,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "models": [
+                dict(s.as_dict(), loaded=self.is_loaded(s.key), active_backend=s.active_backend)
+                for s in self.specs()
+            ],
+            "defaults": dict(self.manifest.defaults),
+            "ensembles": [e.as_dict() for e in self.manifest.ensembles.values()],
+        }
+
+
+# --- Process-wide registry ---
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the shared ModelRegistry, reading the manifest once."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry(os.getenv("MODEL_MANIFEST", MANIFEST_PATH))
+    return _registry
@@ -0,0 +1,421 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from forecast_snapshot import ForecastSnapshot, snapshot as default_snapshot
+from metrics import metrics
+
+# --- SWPC geomagnetic forecast products ---
+# Point at a stand-in (see swpc_standin.py) for offline runs and load tests.
+SWPC_BASE_URL = os.getenv("SWPC_BASE_URL", "https://services.swpc.noaa.gov").rstrip("/")
+KP_FORECAST_PRODUCT = "products/noaa-planetary-k-index-forecast.json"
+THREE_DAY_PRODUCT = "text/3-day-forecast.txt"
+DAILY_INDICES_PRODUCT = "text/daily-geomagnetic-indices.txt"
+# NOAA reissues the 3-day forecast twice a day; polling more often only picks up corrections.
+NOAA_POLL_INTERVAL_SECONDS = 900
+
+TextFetcher = Callable[[str], str]
+
+
+def http_text_fetcher(product: str, base_url: Optional[str] = None) -> str:
+    import requests
+
+    resp = requests.get(f"{base_url or SWPC_BASE_URL}/{product}", timeout=15)
+    resp.raise_for_status()
+    return resp.text
+
+
+class FixtureTextFetcher:
+    """Serve raw product text from local copies (same file names as SWPC)."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def __call__(self, product: str) -> str:
+        with open(os.path.join(self.directory, os.path.basename(product)), "r") as f:
+            return f.read()
+
+
+def default_text_fetcher() -> TextFetcher:
+    fixture_dir = os.getenv("SWPC_FIXTURE_DIR")
+    return FixtureTextFetcher(fixture_dir) if fixture_dir else http_text_fetcher
+
+
+def parse_kp_forecast(rows: List[List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Rows of the NOAA planetary K-index forecast product as
+    ``{"t", "kp", "observed"}`` dicts sorted by time. ``observed`` is
+    "observed", "estimated" or "predicted".
+    """
+    if not rows or len(rows) < 2:
+        return []
+    columns = rows[0]
+    out = []
+    for rec in rows[1:]:
+        item = dict(zip(columns, rec))
+        try:
+            kp = float(item.get("kp"))
+            t = datetime.fromisoformat(str(item.get("time_tag")).replace(" ", "T"))
+        except (TypeError, ValueError):
+            continue
+        out.append({"t": t.isoformat(), "kp": max(0.0, min(9.0, kp)), "observed": item.get("observed")})
+    out.sort(key=lambda r: r["t"])
+    return out
+
+
+def parse_3day_forecast(text: str) -> Dict[str, Any]:
+    """Parse NOAA 3-day forecast text into structured JSON.
+
+    Returns:
+    {
+      issued: ISO8601 string or null,
+      observed_max_kp: float | null,
+      expected_max_kp: float | null,
+      days: ["YYYY-MM-DD", "YYYY-MM-DD", "YYYY-MM-DD"],
+      breakdown: [ { period: "00-03UT", values: [d1, d2, d3] }, ... ],
+      rationale: string
+    }
+    """
+    lines = text.splitlines()
+    # Parse issued timestamp
+    issued_iso = None
+    for ln in lines:
+        if ln.startswith(":Issued:"):
+            # Example: ":Issued: 2025 Sep 26 1230 UTC"
+            try:
+                parts = ln.split(":", 2)[2].strip()
+                # Convert '2025 Sep 26 1230 UTC' to ISO
+                dt = datetime.strptime(parts.replace(" UTC", ""), "%Y %b %d %H%M")
+                issued_iso = dt.strftime("%Y-%m-%dT%H:%M:00Z")
+            except Exception:
+                pass
+            break
+
+    # Parse observed and expected max kp
+    observed_max = None
+    expected_max = None
+    for ln in lines:
+        if "greatest observed 3 hr Kp" in ln:
+            # The value follows 'was'/'is'; the '3' in '3 hr Kp' is not it.
+            m = re.search(r"\b(?:was|is)\s+(\d+\.\d+|\d+)", ln)
+            if m:
+                try:
+                    observed_max = float(m.group(1))
+                except Exception:
+                    pass
+        if "greatest expected 3 hr Kp" in ln:
+            m = re.search(r"\b(?:was|is)\s+(\d+\.\d+|\d+)", ln)
+            if m:
+                try:
+                    expected_max = float(m.group(1))
+                except Exception:
+                    pass
+
+    # Find breakdown header and parse grid
+    breakdown_rows = []
+    day_labels = []
+    rationale = ""
+    try:
+        start_idx = None
+        for i, ln in enumerate(lines):
+            if ln.strip().startswith("NOAA Kp index breakdown"):
+                start_idx = i
+                break
+        if start_idx is not None:
+            # Next lines: blank, then header with three day labels
+            i = start_idx + 1
+            # Skip blank lines
+            while i < len(lines) and not lines[i].strip():
+                i += 1
+            # Header line with dates
+            if i < len(lines):
+                header = lines[i]
+                # tokens like 'Sep 26       Sep 27       Sep 28'
+                day_tokens = [t for t in header.split() if t.isalpha() or t.isdigit() or (len(t) == 3 and t.isalpha())]
+                # A simpler approach: just split and grab the last 6 tokens and join pairs
+                raw = header.strip().split()
+                # Attempt to reconstruct labels as pairs month day
+                tmp = []
+                j = 0
+                while j < len(raw):
+                    if raw[j].isalpha() and j + 1 < len(raw) and raw[j+1].isdigit():
+                        tmp.append(f"{raw[j]} {raw[j+1]}")
+                        j += 2
+                    else:
+                        j += 1
+                day_labels = tmp[:3]
+                i += 1
+
+            # Parse 8 time rows until blank line
+            count = 0
+            while i < len(lines) and count < 8:
+                row = lines[i]
+                if not row.strip():
+                    break
+                # Example: '00-03UT       2.33         2.33         2.33'
+                m = re.match(r"\s*([0-9]{2}-[0-9]{2}UT)\s+(.+)$", row)
+                if m:
+                    period = m.group(1)
+                    # Drop NOAA scale annotations such as '(G1)' so their digits aren't read as Kp.
+                    rest = re.sub(r"\([^)]*\)", " ", m.group(2))
+                    nums = re.findall(r"\d+\.\d+|\d+", rest)
+                    values = [float(x) for x in nums[:3]] if nums else []
+                    breakdown_rows.append({"period": period, "values": values})
+                    count += 1
+                i += 1
+
+        # Capture rationale paragraph following the breakdown
+        # Find line starting with 'Rationale:' near the breakdown region
+        for k in range((start_idx or 0), min((start_idx or 0) + 100, len(lines))):
+            if lines[k].strip().startswith("Rationale:"):
+                rationale = lines[k].split(":", 1)[1].strip()
+                # Include subsequent lines until blank
+                t = k + 1
+                extra = []
+                while t < len(lines) and lines[t].strip():
+                    extra.append(lines[t].strip())
+                    t += 1
+                if extra:
+                    rationale += " " + " ".join(extra)
+                break
+    except Exception:
+        pass
+
+    # Try to attach year to day labels using the line that contains the 3-day range
+    year = None
+    for ln in lines:
+        if "Sep" in ln and "202" in ln and "NOAA Kp index breakdown" in lines[start_idx] if 'start_idx' in locals() and start_idx is not None else True:
+            m = re.search(r"(20\d{2})", ln)
+            if m:
+                year = int(m.group(1))
+                break
+    # Fallback: look earlier line with 'Sep 26-Sep 28 2025'
+    if year is None:
+        for ln in lines:
+            m = re.search(r"(20\d{2})", ln)
+            if m:
+                year = int(m.group(1))
+                break
+
+    # Build ISO dates if possible
+    from calendar import month_abbr
+    month_map = {m: i for i, m in enumerate(month_abbr) if m}
+    iso_days = []
+    if year and len(day_labels) == 3:
+        for label in day_labels:
+            try:
+                mon_str, day_str = label.split()
+                mon = month_map.get(mon_str[:3], None)
+                day = int(day_str)
+                if mon:
+                    iso_days.append(f"{year:04d}-{mon:02d}-{day:02d}")
+            except Exception:
+                iso_days.append(label)
+    else:
+        iso_days = day_labels
+
+    return {
+        "issued": issued_iso,
+        "observed_max_kp": observed_max,
+        "expected_max_kp": expected_max,
+        "days": iso_days,
+        "breakdown": breakdown_rows,
+        "rationale": rationale,
+    }
+
+
+def parse_daily_indices(text: str) -> List[Dict[str, Any]]:
+    """
+    Rows of the NOAA daily geomagnetic indices text product, oldest first:
+    ``{"date", "ap", "kp_values", "kp_max", "kp_avg"}``.
+
+    Each data line is ``YYYY MM DD``, then A and eight K-indices for
+    Fredericksburg, College and the planetary estimate. Only the planetary
+    Kp values are decimals, and the planetary Ap comes just before them.
+    """
+    rows = []
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) < 4 or line.startswith((":", "#")):
+            continue
+        try:
+            y, m, d = int(parts[0]), int(parts[1]), int(parts[2])
+        except ValueError:
+            continue
+        if y < 1900 or not (1 <= m <= 12) or not (1 <= d <= 31):
+            continue
+
+        # Trailing decimal values are the planetary Kp (up to 8).
+        kp_vals: List[float] = []
+        i = len(parts) - 1
+        while i > 2 and "." in parts[i] and len(kp_vals) < 8:
+            try:
+                val = float(parts[i])
+            except ValueError:
+                break
+            if 0.0 <= val <= 9.0:
+                kp_vals.insert(0, val)
+            i -= 1
+        ap_val: Optional[float] = None
+        if kp_vals and i > 2:
+            try:
+                ap = float(parts[i])
+                ap_val = ap if 0 <= ap <= 400 else None
+            except ValueError:
+                pass
+
+        rows.append({
+            "date": f"{y:04d}-{m:02d}-{d:02d}",
+            "ap": ap_val,
+            "kp_values": kp_vals,
+            "kp_max": max(kp_vals) if kp_vals else None,
+            "kp_avg": sum(kp_vals) / len(kp_vals) if kp_vals else None,
+        })
+    rows.sort(key=lambda r: r["date"])
+    return rows
+
+
+def summarize_kp_forecast(series: List[Dict[str, Any]], hours: int, now: datetime) -> Dict[str, Any]:
+    """Kp series for the next ``hours`` from ``now`` with overall and per-day aggregates."""
+    horizon = now + timedelta(hours=max(1, min(hours, 168)))  # cap at 7 days
+    rows = [(datetime.fromisoformat(r["t"]), float(r["kp"])) for r in series]
+    window = [(t, kp) for t, kp in rows if now <= t <= horizon]
+    if not window:
+        # fallback: take next 72 rows as-is
+        window = rows[:72]
+
+    kps = [kp for _, kp in window]
+    by_day: Dict[str, List[float]] = {}
+    for t, kp in window:
+        by_day.setdefault(t.date().isoformat(), []).append(kp)
+    return {
+        "series": [{"t": t.isoformat(), "kp": kp} for t, kp in window],
+        "summary": {
+            "max": max(kps) if kps else None,
+            "min": min(kps) if kps else None,
+            "avg": sum(kps) / len(kps) if kps else None,
+        },
+        "daily": [
+            {"date": day, "max": max(vals), "min": min(vals), "avg": sum(vals) / len(vals)}
+            for day, vals in by_day.items()
+        ],
+    }
+
+
+def seconds_until_next_poll(interval: float = NOAA_POLL_INTERVAL_SECONDS, now: Optional[float] = None) -> int:
+    """Pollers tick on wall-clock multiples of the interval, so this is when data can next change."""
+    now = time.time() if now is None else now
+    return max(1, int(interval - now % interval))
+
+
+def _complete_3day(forecast: Dict[str, Any]) -> bool:
+    rows = forecast.get("breakdown") or []
+    return len(rows) == 8 and all(len(r["values"]) == len(forecast.get("days") or []) for r in rows)
+
+
+def _complete_daily(indices: Dict[str, Any]) -> bool:
+    days = indices.get("days") or []
+    return bool(days) and len(days[-1]["kp_values"]) == 8
+
+
+# product -> (snapshot section, parser, completeness check). An incomplete
+# parse (e.g. a body cut off mid-transfer) is never published.
+PRODUCTS = {
+    KP_FORECAST_PRODUCT: ("noaa_kp_forecast", lambda raw: {"series": parse_kp_forecast(json.loads(raw))},
+                          lambda value: bool(value["series"])),
+    THREE_DAY_PRODUCT: ("noaa_3day", parse_3day_forecast, _complete_3day),
+    DAILY_INDICES_PRODUCT: ("noaa_daily_indices", lambda raw: {"days": parse_daily_indices(raw)}, _complete_daily),
+}
+NOAA_SECTIONS = tuple(section for section, _, _ in PRODUCTS.values())
+
+
+class NoaaForecastPoller:
+    """
+    Polls the NOAA geomagnetic products and publishes them to the snapshot.
+
+    Sections: 'noaa_kp_forecast' ({"series": [...]}), 'noaa_3day' (the
+    parsed 3-day forecast) and 'noaa_daily_indices' ({"days": [...]}). A
+    section is only republished when the product content changes, so
+    snapshot versions track NOAA issuances rather than poll ticks.
+    """
+
+    def __init__(
+        self,
+        fetcher: Optional[TextFetcher] = None,
+        snapshot: ForecastSnapshot = default_snapshot,
+        interval: float = NOAA_POLL_INTERVAL_SECONDS,
+    ):
+        self.fetcher = fetcher or default_text_fetcher()
+        self.snapshot = snapshot
+        self.interval = interval
+        self._digests: Dict[str, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _changed(self, product: str, raw: str) -> Optional[str]:
+        """The product's content digest if it differs from the last one seen, else None."""
+        digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        if self._digests.get(product) == digest:
+            return None
+        self._digests[product] = digest
+        return digest
+
+    def poll_once(self) -> List[str]:
+        """Fetch every product; returns the sections that were republished."""
+        published = []
+        errors = []
+        for product, (section, parse, complete) in PRODUCTS.items():
+            try:
+                with metrics.timer("noaa.poll"):
+                    raw = self.fetcher(product)
+            except Exception as e:
+                # One unavailable product should not hold back the others.
+                metrics.incr("noaa.poll_errors")
+                errors.append(f"{product}: {e}")
+                continue
+            digest = self._changed(product, raw)
+            if digest is None:
+                continue
+            try:
+                value = parse(raw)
+                if not complete(value):
+                    raise ValueError("incomplete product")
+            except Exception as e:
+                # Truncated or garbled body: forget its digest so the next poll retries it.
+                self._digests.pop(product, None)
+                metrics.incr("noaa.parse_errors")
+                errors.append(f"{product}: unparseable response ({e})")
+                continue
+            self.snapshot.publish(section, value, digest=digest[:16])
+            published.append(section)
+        if errors and len(errors) == len(PRODUCTS):
+            raise RuntimeError("; ".join(errors))
+        for error in errors:
+            print(f"Warning: NOAA product fetch failed: {error}")
+        return published
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                metrics.incr("noaa.poll_errors")
+                print(f"Warning: NOAA forecast poll failed: {e}")
+            self._stop.wait(seconds_until_next_poll(self.interval))
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="noaa-forecast-poll", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
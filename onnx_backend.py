@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+
+# Intra-op threads per session. Single windows are latency-bound, and API
+# workers already run in parallel, so one thread per session is the default.
+ORT_THREADS = int(os.getenv("ORT_THREADS", "1"))
+
+
+class OnnxModel:
+    """
+    Keras-compatible wrapper over an onnxruntime session.
+
+    Supports ``model(x, training=False)`` and ``model.predict(x, ...)`` so the
+    existing handlers can use it in place of a Keras or torch model. It imports
+    only onnxruntime, not TensorFlow or torch.
+    """
+
+    def __init__(self, path: str, threads: int = ORT_THREADS):
+        import onnxruntime as ort
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.path = path
+        self.session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.input_shape = self.session.get_inputs()[0].shape
+
+    def __call__(self, x, training=False) -> np.ndarray:
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        return self.session.run(None, {self.input_name: x})[0]
+
+    def predict(self, x, batch_size=None, verbose=0) -> np.ndarray:
+        return self(x)
+
+
+def is_onnx_path(path) -> bool:
+    return str(path).lower().endswith(".onnx")
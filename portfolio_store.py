@@ -0,0 +1,65 @@
+import os
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from stress_test import portfolio_version
+
+PORTFOLIO_PATH = "portfolio_data.json"
+
+
+class PortfolioStore:
+    """
+    The portfolio file held in memory with its content version.
+
+    The file is re-read only when its modification time or size changes, so
+    readers pay a stat() instead of a parse and hash. A missing or unreadable
+    file reads as an empty portfolio.
+    """
+
+    def __init__(self, path: str = PORTFOLIO_PATH):
+        self.path = path
+        self._stamp: Optional[Tuple[float, int]] = None
+        self._items: List[Dict[str, Any]] = []
+        self._version = portfolio_version([])
+        self._lock = threading.Lock()
+
+    def _file_stamp(self) -> Optional[Tuple[float, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    def current(self) -> Tuple[List[Dict[str, Any]], str]:
+        """(items, version) for the file as it is now."""
+        stamp = self._file_stamp()
+        with self._lock:
+            if stamp != self._stamp:
+                try:
+                    with open(self.path, "r") as f:
+                        items = json.load(f)
+                except Exception:
+                    items = []
+                self._items, self._version, self._stamp = items, portfolio_version(items), stamp
+            return self._items, self._version
+
+    def items(self) -> List[Dict[str, Any]]:
+        return self.current()[0]
+
+    def version(self) -> str:
+        return self.current()[1]
+
+
+_store: Optional[PortfolioStore] = None
+_store_lock = threading.Lock()
+
+
+def get_portfolio_store() -> PortfolioStore:
+    """Process-wide store over PORTFOLIO_PATH."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PortfolioStore()
+    return _store
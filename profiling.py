@@ -0,0 +1,262 @@
+"""
+Opt-in statistical profiling of individual requests.
+
+    PROFILE_TOKEN=secret uvicorn api_server:app
+    curl -H "X-Profile-Token: secret" -X POST .../api/run ...   # response carries X-Profile-Id
+    curl -H "X-Profile-Token: secret" .../api/profiles/<id> > run.folded
+    flamegraph.pl run.folded > run.svg                          # or drop it into speedscope
+
+A profiled request is sampled by a background thread that walks every
+thread's Python stack each PROFILE_INTERVAL_MS. Samples are process-wide
+for the duration of the request, so work handed to worker threads (crew
+tasks, NOAA fetches) is included; each stack is rooted at its thread name,
+and idle threads are dropped. PROFILE_SAMPLE_RATE profiles that fraction
+of requests without a header. Output is one collapsed-stack file (the
+format flamegraph.pl, inferno and speedscope read) plus a JSON summary per
+request, in PROFILE_DIR.
+
+With neither PROFILE_TOKEN nor PROFILE_SAMPLE_RATE set the middleware is
+not installed at all.
+"""
+import os
+import sys
+import hmac
+import json
+import time
+import random
+import secrets
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from metrics import metrics
+
+PROFILE_HEADER = "x-profile-token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+# Routes that serve stored profiles; never profiled themselves.
+PROFILES_PATH = "/api/profiles"
+DEFAULT_PROFILE_DIR = "profiles"
+DEFAULT_INTERVAL_MS = 5.0
+# Oldest profiles are pruned beyond this many.
+MAX_PROFILES = 200
+MAX_STACK_DEPTH = 128
+
+# (file, function) pairs that mean a thread is parked, not working.
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    base = os.path.basename(filename)
+    if base == "__init__.py":
+        base = f"{os.path.basename(os.path.dirname(filename))}/{base}"
+    return f"{base}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES
+
+
+def collapse_stack(thread_name: str, frame) -> str:
+    """One sample as a collapsed-stack line prefix: root;caller;...;leaf."""
+    labels: List[str] = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(thread_name.replace(";", ":").replace(" ", "_"))
+    return ";".join(reversed(labels))
+
+
+class RequestProfile:
+    """Samples all thread stacks on a background thread until stopped, then writes the result."""
+
+    def __init__(self, profile_id: str, directory: str, interval: float, meta: Dict[str, Any]):
+        self.id = profile_id
+        self.directory = directory
+        self.interval = interval
+        self.meta = meta
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._started = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{profile_id}", daemon=True)
+
+    def start(self) -> "RequestProfile":
+        self._thread.start()
+        return self
+
+    def sample(self) -> None:
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own or _is_idle(frame):
+                continue
+            self.stacks[collapse_stack(names.get(ident, f"thread-{ident}"), frame)] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+        try:
+            self.write()
+        except OSError as e:
+            print(f"Warning: could not write profile {self.id}: {e}")
+
+    def stop(self, **meta: Any) -> None:
+        """Stop sampling; the files are written from the sampler thread so the caller never waits."""
+        self.meta.update(meta, duration_ms=round((time.perf_counter() - self._started) * 1000.0, 3))
+        self._stop.set()
+
+    def write(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{self.id}.folded"), "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        summary = {
+            "id": self.id,
+            **self.meta,
+            "interval_ms": round(self.interval * 1000.0, 3),
+            "samples": self.samples,
+            "distinct_stacks": len(self.stacks),
+        }
+        with open(os.path.join(self.directory, f"{self.id}.json"), "w") as f:
+            json.dump(summary, f, indent=2)
+        metrics.incr("profiling.captured")
+        _prune(self.directory, MAX_PROFILES)
+
+
+def _prune(directory: str, keep: int) -> None:
+    summaries = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".json")),
+        key=os.path.getmtime,
+    )
+    for path in summaries[:-keep] if len(summaries) > keep else []:
+        for suffix in (".json", ".folded"):
+            try:
+                os.remove(path[: -len(".json")] + suffix)
+            except OSError:
+                pass
+
+
+def new_profile_id() -> str:
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{secrets.token_hex(4)}"
+
+
+def valid_profile_id(profile_id: str) -> bool:
+    return bool(profile_id) and all(c.isalnum() or c == "-" for c in profile_id)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles requests carrying the admin token, plus a random sample."""
+
+    def __init__(self, app, token: Optional[str] = None, sample_rate: float = 0.0,
+                 directory: str = DEFAULT_PROFILE_DIR, interval_ms: float = DEFAULT_INTERVAL_MS,
+                 seed: Optional[int] = None):
+        self.app = app
+        self.token = token
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.interval = interval_ms / 1000.0
+        self._rng = random.Random(seed)
+
+    def authorized(self, headers: Dict[str, str]) -> bool:
+        supplied = headers.get(PROFILE_HEADER)
+        return bool(self.token and supplied) and hmac.compare_digest(supplied, self.token)
+
+    def _trigger(self, scope) -> Optional[str]:
+        # Reading profiles needs the token too; profiling those reads would only push real profiles out.
+        path = scope.get("path", "")
+        if path == PROFILES_PATH or path.startswith(PROFILES_PATH + "/"):
+            return None
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        if self.authorized(headers):
+            return "header"
+        if self.sample_rate > 0 and self._rng.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(new_profile_id(), self.directory, self.interval, {
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "trigger": trigger,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        }).start()
+        status = {"code": 500}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = {**message, "headers": [*message.get("headers", []),
+                                                  (PROFILE_ID_HEADER.lower().encode(), profile.id.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.stop(status=status["code"])
+
+
+class ProfileStore:
+    """Read access to the profiles a ProfilingMiddleware wrote."""
+
+    def __init__(self, directory: str = DEFAULT_PROFILE_DIR, token: Optional[str] = None):
+        self.directory = directory
+        self.token = token
+
+    def authorized(self, supplied: Optional[str]) -> bool:
+        """Without a configured token (sampling only) profiles are readable by anyone who can reach the API."""
+        if not self.token:
+            return True
+        return bool(supplied) and hmac.compare_digest(supplied, self.token)
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted((n for n in os.listdir(self.directory) if n.endswith(".json")), reverse=True)
+        out = []
+        for name in names[:limit]:
+            try:
+                with open(os.path.join(self.directory, name), "r") as f:
+                    out.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return out
+
+    def folded(self, profile_id: str) -> Optional[str]:
+        if not valid_profile_id(profile_id):
+            return None
+        try:
+            with open(os.path.join(self.directory, f"{profile_id}.folded"), "r") as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+def install_profiling(app) -> Optional[ProfileStore]:
+    """
+    Add ProfilingMiddleware to ``app`` if PROFILE_TOKEN or PROFILE_SAMPLE_RATE
+    is set. Returns the store for reading profiles, or None when disabled.
+    """
+    token = os.getenv("PROFILE_TOKEN") or None
+    sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0") or 0)
+    if not token and sample_rate <= 0:
+        return None
+    directory = os.getenv("PROFILE_DIR", DEFAULT_PROFILE_DIR)
+    interval_ms = float(os.getenv("PROFILE_INTERVAL_MS", str(DEFAULT_INTERVAL_MS)))
+    app.add_middleware(ProfilingMiddleware, token=token, sample_rate=sample_rate,
+                       directory=directory, interval_ms=interval_ms)
+    print(f"Profiling enabled: {'token' if token else 'no token'}, sample rate {sample_rate}, output in {directory}/")
+    return ProfileStore(directory, token)
@@ -0,0 +1,248 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from forecast_snapshot import ForecastSnapshot, SnapshotEntry, snapshot as default_snapshot
+from kp_fusion import KP_GRID, OUTPUT_SECTION as KP_DISTRIBUTION
+from metrics import metrics
+from stress_test import (
+    RECOMMENDATION_LADDER,
+    HALT_RECOMMENDATION,
+    PortfolioArrays,
+    incident_probability_matrix,
+    portfolio_version,
+    recommendation_for_pml_pct,
+    shielding_multiplier,
+)
+
+# --- Quote model (same formulas as the pricing tool prompt) ---
+LOADING = 1.20
+FIXED_FEE_USD = 10000.0
+MAX_PREMIUM_FRACTION = 0.15     # above this share of asset value coverage is reduced
+REJECT_PREMIUM_FRACTION = 0.50  # above this the policy is uneconomical
+SURCHARGE_BY_RECOMMENDATION = {
+    "Continue Writing New Policies": 1.0,
+    "Apply Moderate Risk Surcharge": 1.75,
+    "Apply High Risk Surcharge": 2.5,
+    "Urgent Reinsurance Required": 3.0,
+    HALT_RECOMMENDATION: 5.0,
+}
+
+# --- Table axes ---
+SHIELDING_CLASSES = ("Hardened", "Standard", "Light/Legacy")
+AGE_GRID = np.arange(0, 41, dtype=np.float64)
+VALUE_BANDS_MILLIONS = np.array([1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000], dtype=np.float64)
+MAX_CACHED_VERSIONS = 4
+
+
+def risk_category(probability: float) -> str:
+    return "Low" if probability < 0.02 else "Moderate" if probability < 0.08 else "High"
+
+
+def shielding_class(shielding: str) -> int:
+    """Index into SHIELDING_CLASSES; any shielding maps to its multiplier's class."""
+    mult = shielding_multiplier(shielding)
+    return 0 if mult < 1.0 else 2 if mult > 1.0 else 1
+
+
+def incident_probability_over(pmf: Sequence[float], shielding: str, years_in_orbit: int) -> float:
+    """The deterministic incident probability integrated over a Kp distribution on KP_GRID."""
+    shield = np.array([shielding_multiplier(shielding)])
+    age = np.array([1.0 + 0.015 * max(0, int(years_in_orbit))])
+    return float(np.asarray(pmf, dtype=np.float64) @ incident_probability_matrix(KP_GRID, shield, age)[:, 0])
+
+
+def portfolio_probability(kp: np.ndarray) -> np.ndarray:
+    """CRO portfolio model: bump Kp up to the next whole level (+1, capped at 9), then the logistic curve."""
+    risk_kp = np.minimum(np.ceil(np.asarray(kp, dtype=np.float64) + 1.0), 9.0)
+    return 1.0 / (1.0 + np.exp(-1.5 * (risk_kp - 7)))
+
+
+def portfolio_probability_over(pmf: Sequence[float]) -> float:
+    return float(np.asarray(pmf, dtype=np.float64) @ portfolio_probability(KP_GRID))
+
+
+def _interp(x: float, grid: np.ndarray, values: np.ndarray) -> float:
+    """Piecewise-linear lookup, extrapolating linearly past either end of the grid."""
+    if x <= grid[0] or x >= grid[-1]:
+        lo, hi = (0, 1) if x <= grid[0] else (-2, -1)
+        slope = (values[hi] - values[lo]) / (grid[hi] - grid[lo])
+        return float(values[lo] + slope * (x - grid[lo]))
+    return float(np.interp(x, grid, values))
+
+
+class QuoteTables:
+    """
+    Incident probabilities and premiums over every (shielding, age, value band)
+    for one forecast snapshot and one portfolio version, plus the portfolio's
+    recommendation tier. Quotes are lookups plus linear interpolation.
+    """
+
+    def __init__(self, kp_pmf: Sequence[float], portfolio: List[Dict[str, Any]], snapshot_digest: str,
+                 portfolio_ver: Optional[str] = None):
+        pmf = np.asarray(kp_pmf, dtype=np.float64)
+        self.snapshot_digest = snapshot_digest
+        self.portfolio_version = portfolio_ver or portfolio_version(portfolio)
+
+        # (shield, age) incident probability, integrated over the Kp distribution.
+        shield = np.array([shielding_multiplier(s) for s in SHIELDING_CLASSES])
+        age_factor = 1.0 + 0.015 * AGE_GRID
+        flat_shield = np.repeat(shield, len(AGE_GRID))
+        flat_age = np.tile(age_factor, len(SHIELDING_CLASSES))
+        prob = pmf @ incident_probability_matrix(KP_GRID, flat_shield, flat_age)
+        self.incident_probability = prob.reshape(len(SHIELDING_CLASSES), len(AGE_GRID))
+
+        # Portfolio tier: PML over the same distribution -> recommendation -> surcharge.
+        arrays = PortfolioArrays(portfolio)
+        exposure = arrays.total_exposure
+        pml = exposure * portfolio_probability_over(pmf)
+        self.pml_pct = pml / exposure * 100.0 if exposure > 0 else 0.0
+        self.recommendation = recommendation_for_pml_pct(self.pml_pct)
+        self.surcharge = SURCHARGE_BY_RECOMMENDATION[self.recommendation]
+        self.portfolio = {
+            "total_exposure_millions": round(exposure, 3),
+            "probable_maximum_loss_millions": round(pml, 3),
+            "pml_pct_of_exposure": round(self.pml_pct, 3),
+            "strategic_recommendation": self.recommendation,
+            "surcharge_multiplier": self.surcharge,
+        }
+
+        # (shield, age, value band) premium before the underwriter adjustment and viability caps.
+        value_usd = VALUE_BANDS_MILLIONS * 1_000_000
+        base = self.incident_probability[:, :, None] * value_usd[None, None, :] * LOADING + FIXED_FEE_USD
+        self.base_premium_usd = base
+        self.premium_usd = base * self.surcharge
+
+    @staticmethod
+    def tiers() -> List[Dict[str, Any]]:
+        """The PML% ladder with its recommendation and surcharge per tier."""
+        lower = 0.0
+        out = []
+        for upper, rec in RECOMMENDATION_LADDER:
+            out.append({"pml_pct_from": lower, "pml_pct_to": upper, "recommendation": rec,
+                        "surcharge_multiplier": SURCHARGE_BY_RECOMMENDATION[rec]})
+            lower = upper
+        out.append({"pml_pct_from": lower, "pml_pct_to": None, "recommendation": HALT_RECOMMENDATION,
+                    "surcharge_multiplier": SURCHARGE_BY_RECOMMENDATION[HALT_RECOMMENDATION]})
+        return out
+
+    def quote(self, asset_value_millions: float, shielding: str, years_in_orbit: int, adjustment_factor: float = 1.0) -> Dict[str, Any]:
+        s = shielding_class(shielding)
+        years = max(0.0, float(years_in_orbit))
+        probability = min(1.0, max(0.0, _interp(years, AGE_GRID, self.incident_probability[s])))
+        value = max(0.0, float(asset_value_millions))
+        # Premium is linear in value, so interpolating across value bands is exact.
+        base = _interp(value, VALUE_BANDS_MILLIONS, [_interp(years, AGE_GRID, col) for col in self.base_premium_usd[s].T])
+        base *= adjustment_factor
+        calculated = base * self.surcharge
+        asset_value_usd = value * 1_000_000
+
+        quote = {
+            "incident_probability": round(probability, 6),
+            "risk_category": risk_category(probability),
+            "base_premium_usd": round(base, 2),
+            "strategic_recommendation": self.recommendation,
+            "surcharge_multiplier": self.surcharge,
+            "calculated_premium_usd": round(calculated, 2),
+            "snapshot_digest": self.snapshot_digest,
+            "portfolio_version": self.portfolio_version,
+        }
+        cap = asset_value_usd * MAX_PREMIUM_FRACTION
+        if calculated > asset_value_usd * REJECT_PREMIUM_FRACTION:
+            quote.update({"policy_status": "REJECTED", "final_premium_usd": None,
+                          "rejection_reason": "Premium exceeds economic viability threshold",
+                          "alternative_options": {"partial_coverage": {
+                              "coverage_amount": asset_value_usd * 0.50,
+                              "premium_usd": round(cap, 2),
+                              "deductible": asset_value_usd * 0.25}}})
+        elif calculated > cap:
+            coverage = cap / calculated
+            quote.update({"policy_status": "MODIFIED", "final_premium_usd": round(cap, 2),
+                          "coverage_percentage": round(coverage * 100, 1),
+                          "coverage_amount_usd": round(asset_value_usd * coverage, 2),
+                          "deductible_usd": round(asset_value_usd * 0.10, 2)})
+        else:
+            quote.update({"policy_status": "APPROVED", "final_premium_usd": round(calculated, 2),
+                          "coverage_percentage": 100.0, "coverage_amount_usd": asset_value_usd})
+        return quote
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "snapshot_digest": self.snapshot_digest,
+            "portfolio_version": self.portfolio_version,
+            "portfolio": self.portfolio,
+            "tiers": self.tiers(),
+            "shielding_classes": list(SHIELDING_CLASSES),
+            "age_grid": AGE_GRID.tolist(),
+            "value_bands_millions": VALUE_BANDS_MILLIONS.tolist(),
+            "incident_probability": np.round(self.incident_probability, 6).tolist(),
+        }
+
+
+class QuoteTableStore:
+    """
+    Builds QuoteTables whenever a new Kp distribution is published, keyed by
+    (snapshot digest, portfolio version). The last few versions are kept so
+    a request pinned to a digest can still be answered.
+    """
+
+    def __init__(self, portfolio_loader: Callable[[], List[Dict[str, Any]]],
+                 snapshot: ForecastSnapshot = default_snapshot, max_versions: int = MAX_CACHED_VERSIONS):
+        self.portfolio_loader = portfolio_loader
+        self.snapshot = snapshot
+        self.max_versions = max_versions
+        self._tables: "OrderedDict[tuple, QuoteTables]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, entry: SnapshotEntry) -> None:
+        if entry.section == KP_DISTRIBUTION:
+            self.rebuild(entry)
+
+    def rebuild(self, entry: Optional[SnapshotEntry] = None, portfolio: Optional[List[Dict[str, Any]]] = None,
+                portfolio_ver: Optional[str] = None) -> Optional[QuoteTables]:
+        entry = entry or self.snapshot.get(KP_DISTRIBUTION)
+        if entry is None:
+            return None
+        portfolio = portfolio if portfolio is not None else self.portfolio_loader()
+        with metrics.timer("quote_tables.build"):
+            tables = QuoteTables(entry.value["next_24h_max"]["pmf"], portfolio, entry.digest, portfolio_ver)
+        with self._lock:
+            self._tables[(tables.snapshot_digest, tables.portfolio_version)] = tables
+            while len(self._tables) > self.max_versions:
+                self._tables.popitem(last=False)
+        return tables
+
+    def current(self, portfolio: Optional[List[Dict[str, Any]]] = None,
+                portfolio_ver: Optional[str] = None) -> Optional[QuoteTables]:
+        """
+        Tables for the latest distribution and the given (or current) portfolio;
+        built on a miss. Pass ``portfolio_ver`` when it is already known (e.g.
+        from the portfolio store) so the lookup does not re-hash the book.
+        """
+        entry = self.snapshot.get(KP_DISTRIBUTION)
+        if entry is None:
+            return None
+        portfolio = portfolio if portfolio is not None else self.portfolio_loader()
+        key = (entry.digest, portfolio_ver or portfolio_version(portfolio))
+        with self._lock:
+            tables = self._tables.get(key)
+        if tables is None:
+            # Portfolio edited since the last forecast update; rebuilding takes about a millisecond.
+            metrics.incr("quote_tables.misses")
+            tables = self.rebuild(entry, portfolio, portfolio_ver)
+        return tables
+
+    def get(self, snapshot_digest: str, portfolio_ver: str) -> Optional[QuoteTables]:
+        with self._lock:
+            return self._tables.get((snapshot_digest, portfolio_ver))
+
+
+def install_quote_tables(portfolio_loader: Callable[[], List[Dict[str, Any]]],
+                         snapshot: ForecastSnapshot = default_snapshot) -> QuoteTableStore:
+    """Subscribe a QuoteTableStore to the snapshot and build from the current distribution, if any."""
+    store = QuoteTableStore(portfolio_loader, snapshot)
+    snapshot.subscribe(store)
+    store.rebuild()
+    return store
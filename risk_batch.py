@@ -0,0 +1,209 @@
+"""
+Batched risk assessment: one LLM prompt per chunk of assets instead of one
+per asset.
+
+The geophysical context and modelling instructions are sent once per chunk,
+and the assets follow as a compact table. The model answers with a JSON
+array of per-asset probabilities. Chunks are sized by asset count and by
+prompt length so that a large fleet stays inside the model's context
+window. Independent chunks run in parallel; the LLM limiter still applies
+per call. Any asset missing or invalid in the reply is asked again once,
+then priced by the deterministic curve.
+"""
+import os
+import re
+import json
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from kp_fusion import KP_GRID
+from metrics import metrics
+from quote_tables import risk_category
+from stress_test import incident_probability_matrix, shielding_multiplier
+
+# Rows per prompt, and a prompt-length ceiling (~4 characters per token) for the asset table.
+DEFAULT_CHUNK_ASSETS = int(os.getenv("RISK_BATCH_CHUNK_ASSETS", "50"))
+DEFAULT_MAX_TABLE_CHARS = int(os.getenv("RISK_BATCH_MAX_TABLE_CHARS", "12000"))
+DEFAULT_PARALLEL_CHUNKS = int(os.getenv("RISK_BATCH_PARALLEL_CHUNKS", "4"))
+TABLE_HEADER = "id|value_musd|shielding|years_in_orbit"
+
+_KP_VALUE = re.compile(r"(\d+\.\d+)")
+_JSON_ARRAY = re.compile(r"\[.*\]", re.DOTALL)
+
+
+def parse_kp_value(worst_case_kp: Any) -> Optional[float]:
+    """The Kp value out of an agent's free-text or numeric worst_case_kp."""
+    match = _KP_VALUE.search(str(worst_case_kp))
+    if match:
+        return float(match.group(1))
+    try:
+        return float(worst_case_kp)
+    except (ValueError, TypeError):
+        return None
+
+
+def _cell(value: Any) -> str:
+    return str(value).replace("|", "/").replace("\n", " ").strip()
+
+
+def asset_row(asset: Dict[str, Any]) -> str:
+    value = float(asset.get("value_millions", 0.0) or 0.0)
+    years = int(asset.get("years_in_orbit", asset.get("age", 0)) or 0)
+    return f"{_cell(asset.get('id'))}|{value:g}|{_cell(asset.get('shielding', 'Standard'))}|{years}"
+
+
+def chunk_assets(assets: Sequence[Dict[str, Any]], max_assets: int = DEFAULT_CHUNK_ASSETS,
+                 max_table_chars: int = DEFAULT_MAX_TABLE_CHARS) -> List[List[Dict[str, Any]]]:
+    """Consecutive chunks of at most ``max_assets`` rows and ``max_table_chars`` of table text."""
+    chunks: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    size = len(TABLE_HEADER) + 1
+    for asset in assets:
+        row = len(asset_row(asset)) + 1
+        if current and (len(current) >= max_assets or size + row > max_table_chars):
+            chunks.append(current)
+            current, size = [], len(TABLE_HEADER) + 1
+        current.append(asset)
+        size += row
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_batch_prompt(kp_value: float, real_time_context: str, assets: Sequence[Dict[str, Any]]) -> str:
+    table = "\n".join([TABLE_HEADER, *(asset_row(a) for a in assets)])
+    return f"""
+            You are an expert space weather actuary pricing 24-hour policies for a fleet of geostationary (GEO) satellites. Calculate a precise incident probability for every asset in the table.
+
+            **Geophysical Data (applies to every asset):**
+            - Maximum Predicted Kp Index (next 24h): {kp_value}
+            - Current Real-Time Alerts from Web Search: {real_time_context}
+
+            **Risk Modeling Instructions:**
+            1.  **Baseline Risk Profile:** GEO satellites are primarily vulnerable to surface charging anomalies. The base probability of an anomaly follows a non-linear logistic curve based on the Kp index. A Kp index of 7 represents a 50% probability midpoint. The risk is negligible below Kp 4 but grows rapidly above Kp 5.
+            2.  **Asset-Specific Adjustments:**
+                - A 'Hardened' shielding level should significantly decrease the base probability (e.g., by 40-50%).
+                - A 'Light/Legacy' shielding should increase it (e.g., by 30-40%).
+                - For every year in orbit, slightly increase the risk to account for material degradation (e.g., 1-2% increase per year).
+            3.  **Contextual Adjustment:** If a significant G-scale storm watch or other real-time alert is present, you MUST increase every probability to reflect this heightened, immediate risk.
+
+            **Assets ({len(assets)} rows, pipe-separated):**
+            {table}
+
+            Your final answer MUST be ONLY a JSON array with one object per asset, in table order, with the keys "id", "incident_probability", "risk_category" and "confidence".
+            Example: [{{"id": "Sat-1", "incident_probability": 0.025, "risk_category": "Moderate", "confidence": 0.9}}]
+            """
+
+
+def parse_batch_response(text: Any, ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """Per-asset results keyed by id; rows for unknown ids or with invalid probabilities are dropped."""
+    match = _JSON_ARRAY.search(str(text or ""))
+    if not match:
+        return {}
+    try:
+        rows = json.loads(match.group(0))
+    except ValueError:
+        return {}
+    wanted = set(ids)
+    out: Dict[str, Dict[str, Any]] = {}
+    for row in rows if isinstance(rows, list) else []:
+        if not isinstance(row, dict) or str(row.get("id")) not in wanted:
+            continue
+        try:
+            probability = float(row.get("incident_probability"))
+        except (TypeError, ValueError):
+            continue
+        if not 0.0 <= probability <= 1.0:
+            continue
+        out[str(row["id"])] = {
+            "id": str(row["id"]),
+            "incident_probability": probability,
+            "risk_category": row.get("risk_category"),
+            "confidence": row.get("confidence"),
+            "source": "llm",
+        }
+    return out
+
+
+def deterministic_probabilities(assets: Sequence[Dict[str, Any]], kp_value: float,
+                                kp_pmf: Optional[Sequence[float]] = None) -> np.ndarray:
+    """The logistic fallback curve per asset, integrated over ``kp_pmf`` (on KP_GRID) when given."""
+    shield = np.array([shielding_multiplier(a.get("shielding", "")) for a in assets], dtype=np.float64)
+    years = np.array([max(0, int(a.get("years_in_orbit", a.get("age", 0)) or 0)) for a in assets], dtype=np.float64)
+    age_factor = 1.0 + 0.015 * years
+    if kp_pmf is not None:
+        return np.asarray(kp_pmf, dtype=np.float64) @ incident_probability_matrix(KP_GRID, shield, age_factor)
+    return incident_probability_matrix(np.array([kp_value]), shield, age_factor)[0]
+
+
+def assess_fleet(
+    call: Callable[[str], Any],
+    kp_value: float,
+    real_time_context: str,
+    assets: Sequence[Dict[str, Any]],
+    kp_pmf: Optional[Sequence[float]] = None,
+    max_assets: int = DEFAULT_CHUNK_ASSETS,
+    max_table_chars: int = DEFAULT_MAX_TABLE_CHARS,
+    parallel: int = DEFAULT_PARALLEL_CHUNKS,
+) -> Dict[str, Any]:
+    """
+    Incident probability for every asset, via ``call(prompt) -> text`` (an
+    LLM's call method) once per chunk. Assets the model leaves out are
+    re-asked in one more batch, then filled deterministically.
+    """
+    assets = [a for a in assets if a.get("id") is not None]
+    results: Dict[str, Dict[str, Any]] = {}
+    usage = {"calls": 0, "prompt_chars": 0, "failed_calls": 0}
+
+    def run_chunk(prompt: str, ids: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        metrics.incr("risk_batch.calls")
+        try:
+            reply = call(prompt)
+        except Exception as e:
+            print(f"Warning: batched risk assessment call failed for {len(ids)} assets: {e}")
+            return None
+        return parse_batch_response(reply, ids)
+
+    pending = assets
+    for _ in range(2):  # first pass, then one retry for whatever is missing
+        chunks = chunk_assets(pending, max_assets, max_table_chars)
+        if not chunks:
+            break
+        prompts = [build_batch_prompt(kp_value, real_time_context, c) for c in chunks]
+        usage["calls"] += len(prompts)
+        usage["prompt_chars"] += sum(len(p) for p in prompts)
+        with ThreadPoolExecutor(max_workers=max(1, min(parallel, len(chunks)))) as pool:
+            # Copy the context so the caller's LLM deadline applies inside the pool.
+            futures = [
+                pool.submit(contextvars.copy_context().run, run_chunk, prompt, [str(a["id"]) for a in chunk])
+                for prompt, chunk in zip(prompts, chunks)
+            ]
+            for future in futures:
+                parsed = future.result()
+                if parsed is None:
+                    usage["failed_calls"] += 1
+                else:
+                    results.update(parsed)
+        pending = [a for a in pending if str(a["id"]) not in results]
+
+    if pending:
+        metrics.incr("risk_batch.deterministic_assets", len(pending))
+        for asset, p in zip(pending, deterministic_probabilities(pending, kp_value, kp_pmf)):
+            probability = float(p)
+            results[str(asset["id"])] = {
+                "id": str(asset["id"]),
+                "incident_probability": round(probability, 6),
+                "risk_category": risk_category(probability),
+                "confidence": 0.7,
+                "source": "deterministic",
+            }
+
+    return {
+        "kp_value": kp_value,
+        "assets": [results[str(a["id"])] for a in assets],
+        "deterministic_assets": len(pending),
+        "usage": usage,
+    }
@@ -1,8 +1,9 @@
 import os
-import re
 from crewai.tools import BaseTool
 from crewai import LLM
 
+from risk_batch import parse_kp_value
+
 class RiskAssessmentTools(BaseTool):
     name: str = "GEO Satellite Risk Assessment Tool"
     description: str = (
@@ -26,14 +27,9 @@ class RiskAssessmentTools(BaseTool):
         )
 
         # Extract Kp index
-        kp_value_match = re.search(r"(\d+\.\d+)", worst_case_kp)
-        if not kp_value_match:
-            try:
-                kp_value = float(worst_case_kp)
-            except (ValueError, TypeError):
-                return "Error: Could not parse Kp value from input."
-        else:
-            kp_value = float(kp_value_match.group(1))
+        kp_value = parse_kp_value(worst_case_kp)
+        if kp_value is None:
+            return "Error: Could not parse Kp value from input."
 
         prompt = f"""
             Analyze the following insurance case for a 24-hour policy. You are an expert space weather actuary. Your task is to calculate a precise incident probability.
@@ -0,0 +1,107 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from forecast_snapshot import ForecastSnapshot, SnapshotEntry, snapshot as default_snapshot
+from metrics import metrics
+
+# Snapshot sections a crew run reads; a new issuance of any of them starts a new cache generation.
+RUN_SECTIONS = ("kp_distribution", "noaa_3day", "noaa_kp_forecast")
+MAX_CACHED_RUNS = 128
+
+
+class _Flight:
+    """One in-progress computation that concurrent identical requests wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+
+
+class RunCache:
+    """
+    Single-flight plus bounded LRU for full workflow runs, keyed by
+    (inputs, forecast snapshot version, portfolio version).
+
+    Identical requests that arrive while a run is in progress wait for it
+    instead of starting their own crew; its result, or its error, goes to all
+    of them. Only successful results are cached, and not those degraded to
+    the deterministic fallback. Subscribed to the snapshot, the cache empties
+    itself when a forecast section in RUN_SECTIONS is republished, and a run
+    that straddles a new issuance is returned but not stored.
+    """
+
+    def __init__(self, snapshot: ForecastSnapshot = default_snapshot, sections: Sequence[str] = RUN_SECTIONS,
+                 max_entries: int = MAX_CACHED_RUNS):
+        self.snapshot = snapshot
+        self.sections = tuple(sections)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, entry: SnapshotEntry) -> None:
+        if entry.section in self.sections:
+            self.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def forecast_version(self) -> str:
+        return self.snapshot.version(*self.sections)
+
+    def key(self, inputs: Dict[str, Any], portfolio_ver: str, forecast_ver: Optional[str] = None) -> str:
+        key_src = json.dumps(
+            [inputs, forecast_ver if forecast_ver is not None else self.forecast_version(), portfolio_ver],
+            sort_keys=True, separators=(",", ":"), default=str,
+        )
+        return hashlib.sha256(key_src.encode("utf-8")).hexdigest()
+
+    def run(self, inputs: Dict[str, Any], portfolio_ver: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """The cached result for ``inputs``, the result of an identical run in progress, or ``compute()``."""
+        forecast_ver = self.forecast_version()
+        key = self.key(inputs, portfolio_ver, forecast_ver)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                metrics.incr("run_cache.hits")
+                return dict(hit, cached=True)
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            metrics.incr("run_cache.coalesced")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return dict(flight.result, cached=True)
+
+        metrics.incr("run_cache.misses")
+        try:
+            result = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            flight.result = result
+            with self._lock:
+                # Degraded (deterministic fallback) results are shared with waiters but not kept.
+                if self.forecast_version() == forecast_ver and not result.get("degraded"):
+                    self._entries[key] = result
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+        return dict(result, cached=False)
@@ -0,0 +1,195 @@
+import os
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from forecast_snapshot import ForecastSnapshot, snapshot as default_snapshot
+from metrics import metrics
+from noaa_feeds import SWPC_BASE_URL
+
+# --- SWPC real-time solar wind products (1-minute cadence) ---
+PLASMA_PRODUCT = "products/solar-wind/plasma-1-day.json"
+MAG_PRODUCT = "products/solar-wind/mag-1-day.json"
+
+# Features published in the 'solar_wind' section (and fed to the Dst model), in this order.
+# The Kp LSTM takes its own columns from its manifest entry.
+SOLAR_WIND_FEATURES = ("speed", "density", "temperature", "bz_gsm", "bt")
+POLL_INTERVAL_SECONDS = 60
+# Short data gaps (minutes) are interpolated; longer ones drop the affected rows.
+MAX_GAP_MINUTES = 10
+
+Fetcher = Callable[[str], List[List[Any]]]
+
+
+def http_fetcher(product: str, base_url: Optional[str] = None) -> List[List[Any]]:
+    import requests
+
+    resp = requests.get(f"{base_url or SWPC_BASE_URL}/{product}", timeout=15)
+    resp.raise_for_status()
+    return resp.json()
+
+
+class FixtureFetcher:
+    """Serve products from local JSON copies (same file names as SWPC) for tests and offline runs."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def __call__(self, product: str) -> List[List[Any]]:
+        with open(os.path.join(self.directory, os.path.basename(product)), "r") as f:
+            return json.load(f)
+
+
+def default_fetcher() -> Fetcher:
+    fixture_dir = os.getenv("SWPC_FIXTURE_DIR")
+    return FixtureFetcher(fixture_dir) if fixture_dir else http_fetcher
+
+
+def _product_frame(rows: List[List[Any]]) -> pd.DataFrame:
+    if not rows or len(rows) < 2:
+        return pd.DataFrame()
+    columns, records = rows[0], rows[1:]
+    df = pd.DataFrame(records, columns=columns)
+    df["time_tag"] = pd.to_datetime(df["time_tag"])
+    df = df.set_index("time_tag")
+    return df.apply(pd.to_numeric, errors="coerce")
+
+
+def align_solar_wind(plasma: List[List[Any]], mag: List[List[Any]],
+                     features: Sequence[str] = SOLAR_WIND_FEATURES) -> pd.DataFrame:
+    """
+    Join plasma and magnetometer products on a 1-minute grid.
+
+    Returns a DataFrame indexed by minute with ``features`` columns and no
+    missing values; gaps up to MAX_GAP_MINUTES are linearly interpolated.
+    """
+    joined = _product_frame(plasma).join(_product_frame(mag), how="outer")
+    missing = [c for c in features if c not in joined.columns]
+    if joined.empty or missing:
+        return pd.DataFrame(columns=list(features))
+    grid = joined[list(features)].sort_index().resample("1min").mean()
+    grid = grid.interpolate(method="time", limit=MAX_GAP_MINUTES, limit_area="inside")
+    return grid.dropna()
+
+
+class SolarWindIngestor:
+    """
+    Polls SWPC 1-minute plasma/mag data, keeps a fixed-size feature window and
+    feeds new minutes into the streaming LSTM predictor. The window length,
+    the predictor's input columns and the calibration flag come from the
+    registry's default Kp model unless given.
+
+    Publishes two snapshot sections: 'solar_wind' (latest aligned features)
+    and 'lstm_nowcast' (Kp nowcast from the current window). The nowcast
+    carries the model's ``calibrated`` flag so consumers can keep an
+    uncalibrated model's output out of pricing.
+    """
+
+    def __init__(
+        self,
+        fetcher: Optional[Fetcher] = None,
+        predictor=None,
+        snapshot: ForecastSnapshot = default_snapshot,
+        interval: float = POLL_INTERVAL_SECONDS,
+        window_size: Optional[int] = None,
+        calibrated: Optional[bool] = None,
+        features: Optional[Sequence[str]] = None,
+    ):
+        from lstm_model_handle import N_STEPS
+
+        spec = None
+        if window_size is None or calibrated is None or features is None:
+            from model_registry import get_model_registry
+
+            spec = get_model_registry().default("kp")
+        self.fetcher = fetcher or default_fetcher()
+        self.predictor = predictor
+        self.snapshot = snapshot
+        self.interval = interval
+        self.window_size = window_size or spec.n_steps or N_STEPS
+        self.calibrated = spec.calibrated if calibrated is None else calibrated
+        self.features = tuple(features or spec.features or SOLAR_WIND_FEATURES)
+        # Published features first, then any extra columns the Kp model needs.
+        self.columns = tuple(dict.fromkeys(SOLAR_WIND_FEATURES + self.features))
+        self.window = pd.DataFrame(columns=list(self.columns))
+        self._last_ts: Optional[pd.Timestamp] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _get_predictor(self):
+        if self.predictor is None:
+            from lstm_model_handle import StreamingLSTMPredictor, get_lstm_handler
+
+            handler = get_lstm_handler()
+            if not handler.ready:
+                return None
+            if handler.n_features != len(self.features):
+                # The loaded model does not take the columns its manifest entry lists.
+                return None
+            self.predictor = StreamingLSTMPredictor(handler)
+        return self.predictor
+
+    def poll_once(self) -> Optional[Dict[str, Any]]:
+        """Fetch, align and ingest any minutes newer than the last poll."""
+        with metrics.timer("solar_wind.poll"):
+            aligned = align_solar_wind(self.fetcher(PLASMA_PRODUCT), self.fetcher(MAG_PRODUCT), self.columns)
+        if aligned.empty:
+            return None
+
+        fresh = aligned if self._last_ts is None else aligned[aligned.index > self._last_ts]
+        # Only the tail can influence the window, so bootstrap with at most window_size rows.
+        fresh = fresh.tail(self.window_size)
+        if fresh.empty:
+            return None
+        self._last_ts = fresh.index[-1]
+        self.window = fresh.copy() if self.window.empty else pd.concat([self.window, fresh]).tail(self.window_size)
+        metrics.incr("solar_wind.minutes_ingested", len(fresh))
+
+        latest = fresh.iloc[-1]
+        self.snapshot.publish("solar_wind", {
+            "as_of": self._last_ts.isoformat(),
+            "features": {name: round(float(latest[name]), 4) for name in SOLAR_WIND_FEATURES},
+            "window_rows": int(len(self.window)),
+            # Raw feature window (oldest first) for on-demand models such as the Dst predictor.
+            "window": np.round(self.window[list(SOLAR_WIND_FEATURES)].to_numpy(dtype=np.float64), 4).tolist(),
+        })
+
+        predictor = self._get_predictor()
+        if predictor is None:
+            return None
+        predictor.extend(fresh[list(self.features)].to_numpy(dtype=np.float64))
+        kp = predictor.predict()
+        if kp is None:
+            return None
+        nowcast = {
+            "kp": round(max(0.0, min(9.0, kp)), 3),
+            "as_of": self._last_ts.isoformat(),
+            "source": "lstm",
+            "calibrated": self.calibrated,
+        }
+        self.snapshot.publish("lstm_nowcast", nowcast)
+        return nowcast
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                metrics.incr("solar_wind.poll_errors")
+                print(f"Warning: solar wind poll failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="solar-wind-ingest", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -0,0 +1,169 @@
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from historical_events import AnomalyTally, describe_range, storm_runs
+from historical_store import (
+    HistoricalStore,
+    from_epoch_day,
+    get_historical_store,
+    to_epoch_day,
+)
+
+# Thresholds indexed up front. merged_output.csv holds daily-mean Kp, which
+# peaks a little above 8, so these span "active" through "extreme" days.
+DEFAULT_THRESHOLDS: Tuple[float, ...] = (4.0, 5.0, 6.0, 7.0, 8.0)
+
+
+def _bound_day(value: Optional[str], is_end: bool) -> Optional[int]:
+    """Accept 'YYYY', 'YYYY-MM' or 'YYYY-MM-DD'; a bare year/month covers the whole period."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if len(value) == 4 and value.isdigit():
+        return to_epoch_day(f"{value}-12-31" if is_end else f"{value}-01-01")
+    if len(value) == 7:
+        first = to_epoch_day(f"{value}-01")
+        if not is_end:
+            return first
+        y, m = int(value[:4]), int(value[5:7])
+        next_month = f"{y + (m == 12):04d}-{m % 12 + 1:02d}-01"
+        return to_epoch_day(next_month) - 1
+    return to_epoch_day(value)
+
+
+class EpisodeIntervals:
+    """
+    Storm episodes for one Kp threshold, stored as parallel arrays.
+
+    Episodes at a single threshold never overlap, so sorting by start also
+    sorts by end; an overlap query is two binary searches plus the matches.
+    """
+
+    def __init__(self, store: HistoricalStore, tally: AnomalyTally, threshold: float):
+        self.threshold = threshold
+        runs = storm_runs(store, threshold)
+        self.rows = runs
+        if runs.size:
+            self.start = store.epoch_day[runs[:, 0]].astype(np.int64)
+            self.end = store.epoch_day[runs[:, 1] - 1].astype(np.int64)
+            # reduceat over [lo0, hi0, lo1, hi1, ...]; even slots are the per-run maxima.
+            # The sentinel keeps a run that ends on the last row in bounds.
+            kp = np.append(np.asarray(store.kp, dtype=np.float32), np.float32(0))
+            self.peak_kp = np.maximum.reduceat(kp, runs.ravel())[::2]
+            self.anomalies = (tally.prefix[runs[:, 1]] - tally.prefix[runs[:, 0]]).sum(axis=1)
+        else:
+            self.start = self.end = np.empty(0, dtype=np.int64)
+            self.peak_kp = np.empty(0, dtype=np.float32)
+            self.anomalies = np.empty(0, dtype=np.int64)
+        self.duration = self.end - self.start + 1
+        self._store = store
+        self._tally = tally
+
+    def __len__(self) -> int:
+        return int(self.start.shape[0])
+
+    def overlapping(self, start_day: Optional[int], end_day: Optional[int]) -> slice:
+        """Index range of episodes intersecting [start_day, end_day]."""
+        lo = 0 if start_day is None else int(np.searchsorted(self.end, start_day, side="left"))
+        hi = len(self) if end_day is None else int(np.searchsorted(self.start, end_day, side="right"))
+        return slice(lo, max(lo, hi))
+
+    def episode(self, i: int) -> Dict[str, Any]:
+        lo, hi = self.rows[i]
+        event = describe_range(self._store, self._tally, int(lo), int(hi))
+        event["threshold"] = self.threshold
+        return event
+
+
+class StormEpisodeIndex:
+    """Interval index of storm episodes across several Kp thresholds."""
+
+    def __init__(self, store: HistoricalStore, thresholds: Iterable[float] = DEFAULT_THRESHOLDS):
+        self.store = store
+        self.tally = AnomalyTally(store)
+        self._levels: Dict[float, EpisodeIntervals] = {}
+        self._lock = threading.Lock()
+        for t in thresholds:
+            self.level(t)
+
+    @property
+    def thresholds(self) -> List[float]:
+        return sorted(self._levels)
+
+    def level(self, threshold: float) -> EpisodeIntervals:
+        """Episodes for a threshold (rounded to 0.1), built on first request for non-default values."""
+        threshold = round(float(threshold), 1)
+        intervals = self._levels.get(threshold)
+        if intervals is None:
+            with self._lock:
+                intervals = self._levels.get(threshold)
+                if intervals is None:
+                    intervals = EpisodeIntervals(self.store, self.tally, threshold)
+                    self._levels[threshold] = intervals
+        return intervals
+
+    def query(
+        self,
+        threshold: float,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        min_duration: int = 1,
+        min_peak_kp: float = 0.0,
+        min_anomalies: int = 0,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        """Episodes at ``threshold`` overlapping [start, end] with optional duration/peak/anomaly floors."""
+        intervals = self.level(threshold)
+        window = intervals.overlapping(_bound_day(start, False), _bound_day(end, True))
+        keep = (
+            (intervals.duration[window] >= min_duration)
+            & (intervals.peak_kp[window] >= min_peak_kp)
+            & (intervals.anomalies[window] >= min_anomalies)
+        )
+        hits = np.flatnonzero(keep) + window.start
+        offset = max(0, int(offset))
+        limit = max(1, min(int(limit), 1000))
+        return {
+            "threshold": intervals.threshold,
+            "total": int(hits.size),
+            "offset": offset,
+            "limit": limit,
+            "items": [intervals.episode(int(i)) for i in hits[offset:offset + limit]],
+        }
+
+    def episodes_at(self, day: str, threshold: float) -> List[Dict[str, Any]]:
+        """Episode (if any) containing ``day`` at ``threshold``."""
+        d = to_epoch_day(day)
+        intervals = self.level(threshold)
+        sl = intervals.overlapping(d, d)
+        return [intervals.episode(i) for i in range(sl.start, sl.stop)]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        out = []
+        for t in self.thresholds:
+            lv = self._levels[t]
+            out.append({
+                "threshold": t,
+                "episodes": len(lv),
+                "longest_days": int(lv.duration.max()) if len(lv) else 0,
+                "first": from_epoch_day(lv.start[0]) if len(lv) else None,
+                "last": from_epoch_day(lv.end[-1]) if len(lv) else None,
+            })
+        return out
+
+
+_index: Optional[StormEpisodeIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_storm_index() -> StormEpisodeIndex:
+    """Process-wide episode index over the historical store."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = StormEpisodeIndex(get_historical_store())
+    return _index
@@ -0,0 +1,189 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+SEGMENT_FIELDS = ("orbit_type", "shielding", "primary_mission", "id")
+MAX_CACHED_RESULTS = 64
+
+# PML as % of total exposure -> CRO recommendation (same ladder as the CRO tool prompt).
+RECOMMENDATION_LADDER = (
+    (3.0, "Continue Writing New Policies"),
+    (8.0, "Apply Moderate Risk Surcharge"),
+    (15.0, "Apply High Risk Surcharge"),
+    (25.0, "Urgent Reinsurance Required"),
+)
+HALT_RECOMMENDATION = "Temporarily Halt New Policies"
+
+
+def recommendation_for_pml_pct(pct: float) -> str:
+    """Strategic recommendation for a PML expressed as % of total exposure."""
+    for upper, rec in RECOMMENDATION_LADDER:
+        if pct < upper:
+            return rec
+    return HALT_RECOMMENDATION
+
+
+def shielding_multiplier(shielding: str) -> float:
+    """Hardened -45%, Light/Legacy +35%, everything else unchanged."""
+    s = (shielding or "").lower()
+    if "hardened" in s:
+        return 0.55
+    if "light" in s or "legacy" in s:
+        return 1.35
+    return 1.0
+
+
+def incident_probability_matrix(kps: np.ndarray, shield_mult: np.ndarray, age_factor: np.ndarray) -> np.ndarray:
+    """
+    (events x assets) incident probabilities: the deterministic logistic curve
+    used by the /api/run fallback, broadcast over every event and asset.
+    """
+    kps = np.clip(np.asarray(kps, dtype=np.float64), 0.0, 9.0)
+    base = 1.0 / (1.0 + np.exp(-1.5 * (kps - 7.0)))
+    return np.clip(base[:, None] * (shield_mult * age_factor)[None, :], 0.0, 1.0)
+
+
+def portfolio_version(portfolio: List[Dict[str, Any]]) -> str:
+    """Content hash of the portfolio; any edit to the book yields a new version."""
+    canonical = json.dumps(portfolio, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class PortfolioArrays:
+    """Columnar view of the portfolio used by the vectorized pricing pass."""
+
+    def __init__(self, portfolio: List[Dict[str, Any]], version: Optional[str] = None):
+        self.version = version or portfolio_version(portfolio)
+        self.records = portfolio
+        self.values = np.array([float(a.get("value_millions", 0.0) or 0.0) for a in portfolio], dtype=np.float64)
+        self.shield_mult = np.array([shielding_multiplier(a.get("shielding", "")) for a in portfolio], dtype=np.float64)
+        ages = np.array([max(0, int(a.get("age", 0) or 0)) for a in portfolio], dtype=np.float64)
+        self.age_factor = 1.0 + 0.015 * ages
+
+    @property
+    def total_exposure(self) -> float:
+        return float(self.values.sum())
+
+    def segments(self, field: str) -> Dict[str, Any]:
+        """Segment labels plus an (assets x segments) one-hot matrix for aggregation."""
+        labels = [str(a.get(field) or "Unknown") for a in self.records]
+        names = sorted(set(labels))
+        col = {name: j for j, name in enumerate(names)}
+        onehot = np.zeros((len(labels), len(names)), dtype=np.float64)
+        onehot[np.arange(len(labels)), [col[label] for label in labels]] = 1.0
+        return {"names": names, "onehot": onehot}
+
+
+def run_stress_test(
+    arrays: PortfolioArrays,
+    events: Sequence[Dict[str, Any]],
+    segment_by: str = "orbit_type",
+) -> Dict[str, Any]:
+    """Price the whole book against every event in one pass and aggregate by segment."""
+    if segment_by not in SEGMENT_FIELDS:
+        raise ValueError(f"segment_by must be one of {list(SEGMENT_FIELDS)}")
+    kps = np.array([float(e["kp"]) for e in events], dtype=np.float64)
+    seg = arrays.segments(segment_by)
+
+    prob = incident_probability_matrix(kps, arrays.shield_mult, arrays.age_factor)
+    loss = prob * arrays.values[None, :]                   # events x assets
+    by_segment = loss @ seg["onehot"]                       # events x segments
+    totals = loss.sum(axis=1)
+    exposure = arrays.total_exposure
+    pct = totals / exposure * 100.0 if exposure > 0 else np.zeros_like(totals)
+
+    return {
+        "portfolio_version": arrays.version,
+        "segment_by": segment_by,
+        "segments": seg["names"],
+        "segment_exposure_millions": np.round(arrays.values @ seg["onehot"], 3).tolist(),
+        "total_exposure_millions": round(exposure, 3),
+        "events": [
+            {
+                "name": e.get("name"),
+                "date": e.get("date"),
+                "kp": float(e["kp"]),
+                "total_loss_millions": round(float(totals[i]), 3),
+                "pml_pct_of_exposure": round(float(pct[i]), 3),
+                "strategic_recommendation": recommendation_for_pml_pct(float(pct[i])),
+            }
+            for i, e in enumerate(events)
+        ],
+        "loss_matrix_millions": np.round(by_segment, 3).tolist(),
+    }
+
+
+class StressTestCache:
+    """Bounded LRU of stress-test results keyed by portfolio version and request."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_RESULTS):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._arrays: Dict[str, PortfolioArrays] = {}
+        self._lock = threading.Lock()
+
+    def arrays_for(self, portfolio: List[Dict[str, Any]], version: Optional[str] = None) -> PortfolioArrays:
+        """Columnar book; pass the store's ``version`` to skip re-hashing the portfolio."""
+        version = version or portfolio_version(portfolio)
+        with self._lock:
+            arrays = self._arrays.get(version)
+            if arrays is None:
+                # Only the current book is worth keeping columnar.
+                self._arrays = {version: PortfolioArrays(portfolio, version)}
+                arrays = self._arrays[version]
+        return arrays
+
+    def run(
+        self,
+        portfolio: List[Dict[str, Any]],
+        events: Sequence[Dict[str, Any]],
+        segment_by: str,
+        version: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        arrays = self.arrays_for(portfolio, version)
+        key_src = json.dumps(
+            [arrays.version, segment_by, [(e.get("name"), e.get("date"), float(e["kp"])) for e in events]],
+            separators=(",", ":"),
+        )
+        key = hashlib.sha256(key_src.encode("utf-8")).hexdigest()
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                return dict(hit, cached=True)
+        result = run_stress_test(arrays, events, segment_by)
+        with self._lock:
+            self._entries[key] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return dict(result, cached=False)
+
+
+stress_cache = StressTestCache()
+
+
+def episodes_as_events(
+    threshold: float,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    min_duration: int = 1,
+) -> List[Dict[str, Any]]:
+    """Every historical storm episode at ``threshold`` as a stress event (peak Kp on peak date)."""
+    from storm_index import get_storm_index
+
+    index = get_storm_index()
+    episodes: List[Dict[str, Any]] = []
+    # query() caps each page, so page through until every matching episode is in.
+    while True:
+        page = index.query(threshold, start=start, end=end, min_duration=min_duration, offset=len(episodes), limit=1000)
+        episodes.extend(page["items"])
+        if not page["items"] or len(episodes) >= page["total"]:
+            break
+    return [
+        {"name": f"{e['start']}..{e['end']} (Kp >= {threshold:g})", "date": e["peak_date"], "kp": e["peak_kp"]}
+        for e in episodes
+    ]
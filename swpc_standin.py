@@ -0,0 +1,261 @@
+"""
+Offline stand-in for services.swpc.noaa.gov, serving recorded products.
+
+    python swpc_standin.py --port 8765
+    python swpc_standin.py --latency-ms 200 --error-rate 0.1 --rollover-seconds 60
+    SWPC_BASE_URL=http://127.0.0.1:8765 uvicorn api_server:app
+
+A request is served from the fixture directory when a file there has the
+same name as the last path segment, so the real product URLs work
+unchanged. Faults can be set on the command line or at runtime:
+
+    GET  /_standin/faults      current fault settings and request counters
+    POST /_standin/faults      update settings (partial JSON body)
+    POST /_standin/rollover    publish the next issuance now
+
+An issuance rollover shifts every date and timestamp in the products forward
+by --rollover-hours, so pollers see new content just as they would after a
+NOAA reissue. Use whole days to keep the 3-day forecast's day columns
+consistent.
+"""
+import os
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "swpc")
+CONTROL_PREFIX = "/_standin"
+
+CONTENT_TYPES = {".json": "application/json", ".txt": "text/plain; charset=utf-8"}
+
+
+@dataclass
+class Faults:
+    """Fault injection settings; rates are per-request probabilities."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    truncate_rate: float = 0.0
+    rollover_seconds: float = 0.0  # 0: only on POST /_standin/rollover
+    rollover_hours: float = 24.0
+
+    def update(self, values: Dict[str, Any]) -> None:
+        known = {f.name for f in fields(self)}
+        for key, value in values.items():
+            if key not in known:
+                raise ValueError(f"Unknown fault setting '{key}'")
+            setattr(self, key, int(value) if key == "error_status" else float(value))
+
+
+# --- Issuance rollover: shift every date in a product ---
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+_MON = "|".join(_MONTHS)
+_DATE_PATTERN = re.compile(
+    rf"(?P<iso>\d{{4}}-\d{{2}}-\d{{2}}[ T]\d{{2}}:\d{{2}}:\d{{2}})"      # 2025-09-26 12:00:00
+    rf"|(?P<issued>\d{{4}} (?:{_MON}) \d{{1,2}} \d{{4}} UTC)"            # 2025 Sep 26 1230 UTC
+    rf"|(?P<dmy>\b\d{{1,2}} (?:{_MON}) \d{{4}}\b)"                      # 26 Sep 2025
+    rf"|(?P<row>^\d{{4}} \d{{2}} \d{{2}}\b)"                             # 2025 09 26 (daily indices row)
+    rf"|(?P<md>\b(?:{_MON}) \d{{1,2}}\b)",                              # Sep 26
+    re.MULTILINE,
+)
+
+
+def shift_product(text: str, hours: float) -> str:
+    """Move every timestamp forward by ``hours`` (day-only dates by whole days)."""
+    if not hours:
+        return text
+    delta = timedelta(hours=hours)
+    year_match = re.search(r"\b(19|20)\d{2}\b", text)
+    year = int(year_match.group(0)) if year_match else 2000
+
+    def shift(m: "re.Match") -> str:
+        s = m.group(0)
+        if m.group("iso"):
+            t = datetime.strptime(s.replace("T", " "), "%Y-%m-%d %H:%M:%S") + delta
+            return t.strftime("%Y-%m-%d" + ("T" if "T" in s else " ") + "%H:%M:%S")
+        if m.group("issued"):
+            return (datetime.strptime(s, "%Y %b %d %H%M UTC") + delta).strftime("%Y %b %d %H%M UTC")
+        if m.group("dmy"):
+            return (datetime.strptime(s, "%d %b %Y") + delta).strftime("%d %b %Y").lstrip("0")
+        if m.group("row"):
+            return (datetime.strptime(s, "%Y %m %d") + delta).strftime("%Y %m %d")
+        return (datetime.strptime(f"{year} {s}", "%Y %b %d") + delta).strftime("%b %d").replace(" 0", " ")
+
+    return _DATE_PATTERN.sub(shift, text)
+
+
+class SwpcStandIn:
+    """HTTP server that plays back recorded SWPC products with injectable faults."""
+
+    def __init__(self, directory: str = FIXTURE_DIR, faults: Optional[Faults] = None,
+                 host: str = "127.0.0.1", port: int = 0, seed: int = 0):
+        self.directory = directory
+        self.faults = faults or Faults()
+        self.counters: Dict[str, int] = {"requests": 0, "served": 0, "errors": 0, "truncated": 0, "not_found": 0}
+        self._rng = random.Random(seed)
+        self._manual_rollovers = 0
+        self._started_at = time.monotonic()
+        self._bodies: Dict[Tuple[str, int], bytes] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def issuance(self) -> int:
+        clock = 0
+        if self.faults.rollover_seconds > 0:
+            clock = int((time.monotonic() - self._started_at) / self.faults.rollover_seconds)
+        return self._manual_rollovers + clock
+
+    def rollover(self) -> int:
+        with self._lock:
+            self._manual_rollovers += 1
+        return self.issuance
+
+    def body(self, name: str) -> Optional[bytes]:
+        """Product bytes for the current issuance, or None if there is no recording."""
+        path = os.path.join(self.directory, name)
+        if not name or not os.path.isfile(path):
+            return None
+        issuance = self.issuance
+        key = (name, issuance)
+        with self._lock:
+            cached = self._bodies.get(key)
+        if cached is None:
+            with open(path, "r") as f:
+                text = f.read()
+            cached = shift_product(text, issuance * self.faults.rollover_hours).encode("utf-8")
+            with self._lock:
+                self._bodies[key] = cached
+        return cached
+
+    def _draw(self) -> Tuple[float, bool, bool]:
+        """(delay seconds, fail, truncate) for one request."""
+        f = self.faults
+        with self._lock:
+            jitter = self._rng.uniform(-f.jitter_ms, f.jitter_ms) if f.jitter_ms else 0.0
+            fail = self._rng.random() < f.error_rate
+            truncate = self._rng.random() < f.truncate_rate
+        return max(0.0, f.latency_ms + jitter) / 1000.0, fail, truncate
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+        return {"faults": asdict(self.faults), "issuance": self.issuance, "counters": counters}
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):  # quiet by default
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == f"{CONTROL_PREFIX}/faults":
+                    return self._send(200, json.dumps(standin.stats()).encode("utf-8"))
+                standin._count("requests")
+                delay, fail, truncate = standin._draw()
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    standin._count("errors")
+                    return self._send(standin.faults.error_status, b"Service Unavailable", "text/plain")
+                name = os.path.basename(path)
+                body = standin.body(name)
+                if body is None:
+                    standin._count("not_found")
+                    return self._send(404, b"Not Found", "text/plain")
+                if truncate:
+                    standin._count("truncated")
+                    body = body[: len(body) // 2]
+                standin._count("served")
+                self._send(200, body, CONTENT_TYPES.get(os.path.splitext(name)[1], "application/octet-stream"))
+
+            def do_POST(self):
+                path = self.path.split("?", 1)[0]
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                if path == f"{CONTROL_PREFIX}/rollover":
+                    standin.rollover()
+                    return self._send(200, json.dumps(standin.stats()).encode("utf-8"))
+                if path == f"{CONTROL_PREFIX}/faults":
+                    try:
+                        standin.faults.update(json.loads(raw or b"{}"))
+                    except (ValueError, TypeError) as e:
+                        return self._send(400, json.dumps({"detail": str(e)}).encode("utf-8"))
+                    return self._send(200, json.dumps(standin.stats()).encode("utf-8"))
+                self._send(404, b"Not Found", "text/plain")
+
+        return Handler
+
+    def start(self) -> "SwpcStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="swpc-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "SwpcStandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--directory", default=FIXTURE_DIR)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    for f in fields(Faults):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=int if f.name == "error_status" else float,
+                            default=f.default)
+    args = parser.parse_args(argv)
+
+    faults = Faults(**{f.name: getattr(args, f.name) for f in fields(Faults)})
+    standin = SwpcStandIn(args.directory, faults, args.host, args.port, args.seed)
+    print(f"Serving {args.directory} at {standin.url} (set SWPC_BASE_URL={standin.url})", flush=True)
+    try:
+        standin._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin._server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+from cassettes import install_cassettes
+
+
+@pytest.fixture(scope="session", autouse=True)
+def offline_llm():
+    """
+    Route every Gemini and Serper call made during the test session through
+    cassettes. The session defaults to CASSETTE_MODE=stub (canned answers, no
+    recording needed); set CASSETTE_MODE=replay or record to use a cassette.
+    """
+    os.environ.setdefault("CASSETTE_MODE", "stub")
+    try:
+        import crewai  # noqa: F401
+    except ImportError:
+        # Nothing to patch; the crew tests cannot be collected without crewai either.
+        yield None
+        return
+    yield install_cassettes()
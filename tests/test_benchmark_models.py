@@ -0,0 +1,36 @@
+import copy
+
+import numpy as np
+
+from benchmark_models import benchmark_handler, compare
+
+
+class SumHandler:
+    def predict_batch(self, windows):
+        return np.asarray(windows).sum(axis=(1, 2))
+
+
+def test_benchmark_handler_reports_latency_and_throughput():
+    result = benchmark_handler(SumHandler(), steps=6, n_features=3, batch_sizes=(1, 16), iterations=10)
+    assert set(result["single_window"]) == {"p50_ms", "p95_ms", "p99_ms", "mean_ms"}
+    assert result["single_window"]["p50_ms"] <= result["single_window"]["p99_ms"]
+    assert set(result["throughput"]) == {"1", "16"}
+    assert all(v["windows_per_second"] > 0 for v in result["throughput"].values())
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    base_result = {
+        "model": "m@1", "backend": "onnx",
+        "single_window": {"p50_ms": 1.0},
+        "throughput": {"64": {"windows_per_second": 1000.0}},
+    }
+    baseline = {"results": [base_result]}
+
+    within = copy.deepcopy(base_result)
+    within["single_window"]["p50_ms"] = 1.2
+    assert compare({"results": [within]}, baseline, tolerance=0.25) == []
+
+    slower = copy.deepcopy(base_result)
+    slower["single_window"]["p50_ms"] = 2.0
+    slower["throughput"]["64"]["windows_per_second"] = 500.0
+    assert len(compare({"results": [slower]}, baseline, tolerance=0.25)) == 2
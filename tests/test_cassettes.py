@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+from cassettes import (
+    Cassette,
+    CassetteMiss,
+    install_cassettes,
+    normalize_text,
+    patch_method,
+    _llm_request,
+    _serper_request,
+)
+
+
+class FakeLLM:
+    calls = 0
+
+    def __init__(self, model="gemini/test"):
+        self.model = model
+
+    def call(self, messages, tools=None, callbacks=None):
+        FakeLLM.calls += 1
+        return f"answer #{FakeLLM.calls}"
+
+
+class FakeSerper:
+    n_results = 5
+    country = None
+
+    def _run(self, **kwargs):
+        return {"organic": [{"title": kwargs["search_query"]}]}
+
+
+def _patched(path, mode, latency="0"):
+    cassette = Cassette(str(path), mode, latency)
+    llm_cls = type("PatchedLLM", (FakeLLM,), {})
+    serper_cls = type("PatchedSerper", (FakeSerper,), {})
+    patch_method(llm_cls, "call", "llm", cassette, _llm_request)
+    patch_method(serper_cls, "_run", "serper", cassette, _serper_request)
+    return cassette, llm_cls(), serper_cls()
+
+
+def test_normalization_ignores_whitespace_and_timestamps():
+    a = normalize_text("Forecast issued: 2025-09-26T12:30:00Z.\n  Kp   5.33")
+    b = normalize_text("Forecast issued: 2025-09-27T00:30:00Z. Kp 5.33")
+    assert a == b
+    assert normalize_text("Kp 5.33") != normalize_text("Kp 6.00")
+
+
+def test_record_then_replay(tmp_path):
+    path = tmp_path / "crew.json"
+    _, llm, serper = _patched(path, "record")
+    first = llm.call("Assess  the risk\nfor SAT-1")
+    found = serper._run(search_query="geomagnetic storm alerts")
+    calls = FakeLLM.calls
+
+    cassette, llm, serper = _patched(path, "replay")
+    assert len(cassette) == 2
+    assert llm.call("Assess the risk for SAT-1") == first
+    assert serper._run(search_query="geomagnetic storm alerts") == found
+    assert FakeLLM.calls == calls
+    with pytest.raises(CassetteMiss):
+        llm.call("A prompt nobody recorded")
+    assert (cassette.hits, cassette.misses) == (2, 1)
+
+
+def test_auto_mode_records_misses_and_replays_hits(tmp_path):
+    cassette, llm, _ = _patched(tmp_path / "auto.json", "auto")
+    answer = llm.call([{"role": "user", "content": "price SAT-2"}])
+    calls = FakeLLM.calls
+    assert llm.call([{"role": "user", "content": "price  SAT-2 "}]) == answer
+    assert FakeLLM.calls == calls
+    assert (cassette.recorded, cassette.hits) == (1, 1)
+
+
+def test_replay_simulates_latency(tmp_path):
+    path = tmp_path / "slow.json"
+    _, llm, _ = _patched(path, "record")
+    llm.call("hello")
+    _, llm, _ = _patched(path, "replay", latency="50")
+    started = time.perf_counter()
+    llm.call("hello")
+    assert time.perf_counter() - started >= 0.05
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "x.json"), "sometimes")
+
+
+def test_stub_mode_answers_each_agent_without_a_file(tmp_path):
+    cassette, llm, serper = _patched(tmp_path / "never-written.json", "stub")
+    calls = FakeLLM.calls
+    pricing = llm.call([{"role": "system", "content": "You are Pricing Specialist. ..."},
+                        {"role": "user", "content": "asset_value_millions: 250, adjustment_factor: 1.0"}])
+    assert pricing.startswith("Thought:") and "Final Premium: $5,000,000.00" in pricing
+    data = llm.call("You are Space Weather Data Analyst.\nFetch the forecast")
+    assert '"worst_case_kp": 5.0' in data.split("Final Answer:", 1)[1]
+    assert llm.call("You are Space Weather Data Analyst.\nFetch the forecast") == data
+    assert serper._run(search_query="storm alerts")["organic"] == []
+    assert FakeLLM.calls == calls and cassette.hits == 4
+    assert not (tmp_path / "never-written.json").exists()
+
+
+def test_replay_without_a_recording_fails_at_install(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        install_cassettes("replay", directory=str(tmp_path))
@@ -0,0 +1,92 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from dashboard import build_dashboard, downsample_peaks, parse_fields
+from forecast_snapshot import ForecastSnapshot
+from noaa_feeds import FixtureTextFetcher, NoaaForecastPoller
+from portfolio_store import PortfolioStore
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "swpc")
+PORTFOLIO = [{"id": "A", "value_millions": 100, "orbit_type": "GEO", "premium": 10.0},
+             {"id": "B", "value_millions": 50, "orbit_type": "LEO", "premium": 5.0}]
+
+
+def test_downsample_keeps_peaks():
+    points = [{"t": i, "kp": 1.0} for i in range(100)]
+    points[37]["kp"] = 7.0
+    out = downsample_peaks(points, 10)
+    assert len(out) == 10
+    assert {"t": 37, "kp": 7.0} in out
+    assert downsample_peaks(points, 0) is points
+
+
+def test_parse_fields_rejects_unknown_names():
+    assert parse_fields("risk, portfolio") == ["portfolio", "risk"]
+    with pytest.raises(ValueError):
+        parse_fields("portfolio,weather")
+
+
+def test_dashboard_reads_only_the_snapshot():
+    snap = ForecastSnapshot()
+    fields = parse_fields(None)
+    empty = build_dashboard(snap, PORTFOLIO, "v1", fields, datetime(2025, 9, 26, 12))
+    assert empty["portfolio"]["summary"]["total_value_millions"] == 150.0
+    assert set(empty["missing"]) == {"kp_forecast", "forecast_3day", "daily_geomag", "kp_distribution", "risk"}
+
+    NoaaForecastPoller(FixtureTextFetcher(FIXTURES), snap).poll_once()
+    full = build_dashboard(snap, PORTFOLIO, "v1", ["kp_forecast", "daily_geomag"],
+                           datetime(2025, 9, 26, 12), days=7, max_points=5)
+    assert full["missing"] == []
+    assert len(full["kp_forecast"]["series"]) == 5
+    assert max(p["kp"] for p in full["kp_forecast"]["series"]) == full["kp_forecast"]["summary"]["max"]
+    assert len(full["daily_geomag"]["days"]) == 7
+    assert full["digests"]["daily_geomag"] == snap.get("noaa_daily_indices").digest
+
+
+def test_portfolio_store_reloads_on_change(tmp_path):
+    path = tmp_path / "portfolio.json"
+    path.write_text(json.dumps(PORTFOLIO))
+    store = PortfolioStore(str(path))
+    items, version = store.current()
+    assert len(items) == 2
+    assert store.current()[1] == version
+
+    path.write_text(json.dumps(PORTFOLIO[:1]))
+    os.utime(path, (1, 1))
+    assert len(store.items()) == 1 and store.version() != version
+    assert PortfolioStore(str(tmp_path / "missing.json")).items() == []
+
+
+def test_on_demand_noaa_fetch_backs_off_after_a_failure(monkeypatch):
+    import api_server
+
+    calls = []
+
+    class DownPoller:
+        def poll_once(self):
+            calls.append(1)
+            raise RuntimeError("NOAA unreachable")
+
+    monkeypatch.setattr(api_server, "snapshot", ForecastSnapshot())
+    monkeypatch.setattr(api_server, "_noaa_poller", None)
+    monkeypatch.setattr(api_server, "_noaa_on_demand_at", 0.0)
+    monkeypatch.setattr(api_server, "_on_demand_poller", lambda: DownPoller())
+
+    # The fused distribution is not a NOAA product; its absence never triggers a fetch.
+    api_server._poll_noaa_on_demand(["kp_distribution"])
+    assert calls == []
+
+    with pytest.raises(RuntimeError):
+        api_server._poll_noaa_on_demand(["noaa_3day", "kp_distribution"])
+    # Still missing, but the failure is remembered until the next poll tick.
+    api_server._poll_noaa_on_demand(["noaa_3day"])
+    assert calls == [1]
+
+    # A dashboard read never queues behind a fetch another request is running.
+    monkeypatch.setattr(api_server, "_noaa_on_demand_at", 0.0)
+    with api_server._on_demand_lock:
+        api_server._poll_noaa_on_demand(["noaa_3day"], wait=False)
+    assert calls == [1]
@@ -0,0 +1,37 @@
+import os
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from dst_model_handle import DST_MODEL_PATH, DstModelHandler
+
+pytestmark = pytest.mark.skipif(not os.path.exists(DST_MODEL_PATH), reason="Dst model file not present")
+
+
+@pytest.fixture(scope="module")
+def handler():
+    h = DstModelHandler()
+    assert h.ready
+    return h
+
+
+def test_batch_matches_single_window(handler):
+    rng = np.random.default_rng(7)
+    windows = rng.normal(size=(70, 24, handler.input_dim)).astype(np.float32)
+    batched = handler.predict_batch(windows, batch_size=16)
+    singles = np.array([handler.predict(w) for w in windows])
+    assert batched.shape == (70,)
+    np.testing.assert_allclose(batched, singles, rtol=1e-5, atol=1e-5)
+
+
+def test_rejects_wrong_feature_count(handler):
+    with pytest.raises(ValueError):
+        handler.predict_batch(np.zeros((2, 10, handler.input_dim + 1)))
+
+
+def test_missing_file_leaves_handler_unready(tmp_path):
+    h = DstModelHandler(str(tmp_path / "missing.pth"))
+    assert not h.ready
+    assert h.predict(np.zeros((10, 5))) is None
@@ -0,0 +1,23 @@
+from forecast_snapshot import ForecastSnapshot
+
+
+def test_publish_bumps_versions_and_notifies_listeners():
+    snap = ForecastSnapshot()
+    seen = []
+    snap.subscribe(lambda entry: seen.append((entry.section, entry.version)))
+
+    snap.publish("noaa_3day", {"expected_max_kp": 5.0})
+    before = snap.version("noaa_3day", "lstm_nowcast")
+    snap.publish("lstm_nowcast", {"kp": 3.1})
+
+    assert snap.value("noaa_3day") == {"expected_max_kp": 5.0}
+    assert snap.version("noaa_3day") == "1"
+    assert snap.version("noaa_3day", "lstm_nowcast") != before
+    assert seen == [("noaa_3day", 1), ("lstm_nowcast", 2)]
+    assert snap.value("missing", "default") == "default"
+
+
+def test_failing_listener_does_not_block_publish():
+    snap = ForecastSnapshot()
+    snap.subscribe(lambda entry: 1 / 0)
+    assert snap.publish("solar_wind", {}).version == 1
@@ -0,0 +1,41 @@
+from historical_events import HistoricalEventCatalog, risk_level_for_kp
+from historical_store import load_historical_store
+
+SAMPLE_CSV = """ADATE,Year,Month,Day,Anamolytype,Anamoly,Kp,ap,Date
+1989-03-10,1989,3,10,NA,0,2.0,7.0,1989-03-10
+1989-03-11,1989,3,11,ESD,1,5.5,80.0,1989-03-11
+1989-03-12,1989,3,12,ESD,1,8.1,246.0,1989-03-12
+1989-03-13,1989,3,13,SEU,1,6.0,111.0,1989-03-13
+1989-03-14,1989,3,14,NA,0,3.0,15.0,1989-03-14
+1989-03-20,1989,3,20,UNK,1,5.2,60.0,1989-03-20
+"""
+
+
+def _catalog(tmp_path):
+    csv_path = tmp_path / "merged_output.csv"
+    csv_path.write_text(SAMPLE_CSV)
+    return HistoricalEventCatalog(load_historical_store(str(csv_path), str(tmp_path / "cache")))
+
+
+def test_storms_are_consecutive_high_kp_days(tmp_path):
+    storms = _catalog(tmp_path).query(kind="storm")["items"]
+    assert [(e["start"], e["end"]) for e in storms] == [("1989-03-11", "1989-03-13"), ("1989-03-20", "1989-03-20")]
+    assert storms[0]["peak_kp"] == 8.1
+    assert storms[0]["anomaly_counts"] == {"ESD": 2, "SEU": 1}
+    assert storms[0]["risk_level"] == "EXTREME"
+
+
+def test_anomaly_clusters_and_filters(tmp_path):
+    catalog = _catalog(tmp_path)
+    clusters = catalog.query(kind="anomaly_cluster")["items"]
+    assert len(clusters) == 1 and clusters[0]["anomaly_count"] == 3
+
+    assert catalog.query(anomaly_type="UNK")["total"] == 1
+    assert catalog.query(start="1989-03-15", end="1989-03-31")["total"] == 1
+    page = catalog.query(sort="peak_kp", limit=1, offset=1)
+    assert page["total"] == 3 and len(page["items"]) == 1
+
+
+def test_risk_levels():
+    assert risk_level_for_kp(4.9) == "LOW"
+    assert risk_level_for_kp(7.0) == "SEVERE"
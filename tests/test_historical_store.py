@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+
+from historical_store import (
+    from_epoch_day,
+    load_historical_store,
+    to_epoch_day,
+)
+
+SAMPLE_CSV = """ADATE,Year,Month,Day,Anamolytype,Anamoly,Kp,ap,Date
+1989-03-12,1989,3,12,NA,0,3.5,20.0,1989-03-12
+1989-03-13,1989,3,13,ESD,1,8.125,246.0,1989-03-13
+1989-03-14,1989,3,14,SEU,1,6.5,120.0,1989-03-14
+1989-03-16,1989,3,16,,0,2.0,7.0,1989-03-16
+"""
+
+
+def _write_csv(tmp_path, text=SAMPLE_CSV):
+    path = tmp_path / "merged_output.csv"
+    path.write_text(text)
+    return str(path)
+
+
+def test_epoch_day_round_trip():
+    assert to_epoch_day("1970-01-02") == 1
+    assert from_epoch_day(to_epoch_day("1989-03-13")) == "1989-03-13"
+
+
+def test_builds_memory_mapped_columns(tmp_path):
+    csv_path = _write_csv(tmp_path)
+    store = load_historical_store(csv_path, str(tmp_path / "cache"))
+
+    assert len(store) == 4
+    assert isinstance(store.kp, np.memmap)
+    assert store.kp.dtype == np.float32
+    assert store.lookup("1989-03-13") == {
+        "date": "1989-03-13", "kp": 8.125, "ap": 246.0, "anomaly": 1, "anomaly_type": "ESD",
+    }
+    assert store.lookup("1989-03-15") is None
+    window = store.between("1989-03-13", "1989-03-15")
+    assert window["kp"].tolist() == [8.125, 6.5]
+
+
+def test_cache_reused_until_csv_content_changes(tmp_path):
+    csv_path = _write_csv(tmp_path)
+    cache_dir = str(tmp_path / "cache")
+    load_historical_store(csv_path, cache_dir)
+    data_path = os.path.join(cache_dir, "merged_output.bin")
+    built_at = os.stat(data_path).st_mtime_ns
+
+    # Same content, new mtime: hash matches, cache is not rebuilt.
+    os.utime(csv_path, ns=(built_at + 10**9, built_at + 10**9))
+    load_historical_store(csv_path, cache_dir)
+    assert os.stat(data_path).st_mtime_ns == built_at
+
+    _write_csv(tmp_path, SAMPLE_CSV + "1989-03-17,1989,3,17,NA,0,1.0,4.0,1989-03-17\n")
+    store = load_historical_store(csv_path, cache_dir)
+    assert len(store) == 5
+
+
+def test_more_than_255_anomaly_types_keep_their_labels(tmp_path):
+    rows = [f"1990-01-01,1990,1,1,T{i:03d},1,2.0,7.0,1990-01-01" for i in range(300)]
+    csv_path = _write_csv(tmp_path, SAMPLE_CSV.splitlines()[0] + "\n" + "\n".join(rows) + "\n")
+    store = load_historical_store(csv_path, str(tmp_path / "cache"))
+    labels = {store.type_label(code) for code in store.anomaly_type}
+    assert labels == {f"T{i:03d}" for i in range(300)}
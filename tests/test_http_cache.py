@@ -0,0 +1,83 @@
+import gzip
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from http_cache import COMPRESS_MIN_BYTES, FastJSONResponse, ResponseCache
+
+
+def _client(state):
+    app = FastAPI(default_response_class=FastJSONResponse)
+    cache = ResponseCache()
+
+    @app.get("/series")
+    def series(request: Request):
+        def build():
+            state["builds"] += 1
+            return {"series": [{"t": i, "kp": 2.0} for i in range(state["n"])]}
+        return cache.respond(request, "series", state["version"], build, max_age=300)
+
+    @app.get("/plain")
+    def plain():
+        return {"ok": True, "values": [1, 2.5]}
+
+    return TestClient(app)
+
+
+def test_conditional_requests_skip_the_build():
+    state = {"version": 1, "n": 10, "builds": 0}
+    client = _client(state)
+    first = client.get("/series")
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "public, max-age=300"
+    etag = first.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    again = client.get("/series", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert client.get("/series").json() == first.json()
+    assert state["builds"] == 1
+
+    state["version"] = 2
+    changed = client.get("/series", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert state["builds"] == 2
+
+
+def test_large_bodies_are_gzipped_once():
+    state = {"version": 1, "n": 500, "builds": 0}
+    client = _client(state)
+    resp = client.get("/series", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["etag"].endswith('-gzip"')
+    assert len(resp.json()["series"]) == 500
+    raw = client.get("/series", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in raw.headers
+    assert len(raw.content) >= COMPRESS_MIN_BYTES
+    assert len(gzip.compress(raw.content)) < len(raw.content) // 4
+    # The gzip tag still revalidates.
+    assert client.get("/series", headers={"If-None-Match": resp.headers["etag"]}).status_code == 304
+    assert state["builds"] == 1
+
+
+def test_default_response_class_matches_stdlib_json():
+    assert _client({"version": 1, "n": 0, "builds": 0}).get("/plain").json() == {"ok": True, "values": [1, 2.5]}
+
+
+def test_etags_follow_content_not_process_local_versions():
+    from forecast_snapshot import ForecastSnapshot
+
+    # Two fresh processes both publish version 1; only the content tells them apart.
+    first, second = ForecastSnapshot(), ForecastSnapshot()
+    a = first.publish("noaa_3day", {"expected_max_kp": 5.0})
+    b = second.publish("noaa_3day", {"expected_max_kp": 7.0})
+    assert a.version == b.version == 1
+    assert a.digest != b.digest
+    cache = ResponseCache()
+    assert cache.representation("forecast-3day", a.digest, lambda: a.value).etag != \
+        cache.representation("forecast-3day", b.digest, lambda: b.value).etag
+    assert ForecastSnapshot().publish("noaa_3day", {"expected_max_kp": 5.0}).digest == a.digest
@@ -0,0 +1,39 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Cold-start budget for `import api_server` in a fresh interpreter (best of 3 runs).
+IMPORT_BUDGET_SECONDS = float(os.getenv("API_IMPORT_BUDGET_SECONDS", "1.5"))
+HEAVY_MODULES = ("crewai", "crewai_tools", "litellm", "tensorflow", "torch", "pandas", "requests")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import api_server
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def _probe():
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def test_api_server_import_skips_heavy_dependencies():
+    assert _probe()["loaded"] == []
+
+
+def test_api_server_cold_start_within_budget():
+    best = min(_probe()["seconds"] for _ in range(3))
+    assert best <= IMPORT_BUDGET_SECONDS, (
+        f"import api_server took {best:.2f}s (budget {IMPORT_BUDGET_SECONDS:.2f}s)"
+    )
@@ -0,0 +1,115 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from forecast_snapshot import ForecastSnapshot
+from kp_fusion import KP_GRID, KpFusion, discretized_normal, expected_over, fuse_kp_forecasts, install_kp_fusion
+from noaa_feeds import FixtureTextFetcher, NoaaForecastPoller, parse_3day_forecast, parse_daily_indices
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "swpc")
+
+
+def _ingest(snap):
+    return NoaaForecastPoller(FixtureTextFetcher(FIXTURES), snap).poll_once()
+
+
+def test_3day_parser_ignores_scale_annotations():
+    with open(os.path.join(FIXTURES, "3-day-forecast.txt")) as f:
+        parsed = parse_3day_forecast(f.read())
+    assert parsed["issued"] == "2025-09-26T12:30:00Z"
+    assert parsed["expected_max_kp"] == pytest.approx(5.33)
+    assert parsed["breakdown"][1] == {"period": "03-06UT", "values": [2.33, 5.33, 2.67]}
+
+
+def test_daily_indices_parser_reads_planetary_columns():
+    with open(os.path.join(FIXTURES, "daily-geomagnetic-indices.txt")) as f:
+        days = parse_daily_indices(f.read())
+    assert days[0]["date"] == "2025-08-27" and days[-1]["date"] == "2025-09-25"
+    # Planetary Ap is the integer just before the eight decimal Kp values, not a station K-index.
+    assert days[-1]["ap"] == 5.0
+    assert days[-1]["kp_values"] == [1.33, 2.0, 1.0, 2.0, 1.0, 2.0, 0.33, 1.67]
+    assert days[-1]["kp_max"] == 2.0
+
+
+def test_discretized_normal_is_a_distribution():
+    pmf = discretized_normal(4.0, 0.7)
+    assert pmf.sum() == pytest.approx(1.0)
+    assert KP_GRID[pmf.argmax()] == pytest.approx(4.0)
+    assert expected_over(pmf, lambda kp: kp) == pytest.approx(4.0, abs=0.01)
+
+
+def test_poller_publishes_only_on_change():
+    snap = ForecastSnapshot()
+    assert _ingest(snap) == ["noaa_kp_forecast", "noaa_3day", "noaa_daily_indices"]
+    poller = NoaaForecastPoller(FixtureTextFetcher(FIXTURES), snap)
+    poller.poll_once()
+    assert poller.poll_once() == []
+
+
+def test_fusion_refits_on_snapshot_updates():
+    snap = ForecastSnapshot()
+    install_kp_fusion(snap)
+    _ingest(snap)
+    dist = snap.value("kp_distribution")
+    # Fixtures are from 2025, so the horizon anchors at the forecast's own issue time.
+    assert dist["stale"] and dist["anchor"] == "2025-09-26T12:00:00Z"
+    assert dist["sources_used"] == ["noaa_3day", "noaa_json"]
+    for period in dist["periods"]:
+        assert sum(period["pmf"]) == pytest.approx(1.0, abs=1e-3)
+    quiet_max = dist["next_24h_max"]
+
+    version = snap.get("kp_distribution").version
+    snap.publish("lstm_nowcast", {"kp": 7.0, "as_of": "2025-09-26T12:30:00"})
+    entry = snap.get("kp_distribution")
+    assert entry.version > version
+    assert "lstm" in entry.value["sources_used"]
+    assert entry.value["next_24h_max"]["p_exceed"]["kp7"] > quiet_max["p_exceed"]["kp7"]
+
+    # An uncalibrated model's nowcast is not Kp and never reaches the fused distribution.
+    snap.publish("lstm_nowcast", {"kp": 7.0, "as_of": "2025-09-26T12:30:00", "calibrated": False})
+    assert "lstm" not in snap.value("kp_distribution")["sources_used"]
+    assert snap.value("kp_distribution")["next_24h_max"] == quiet_max
+
+
+def test_fused_distribution_digest_is_the_same_in_every_worker():
+    first, second = ForecastSnapshot(), ForecastSnapshot()
+    # The second worker has published more, so its versions run ahead.
+    second.publish("solar_wind", {"speed": 400.0})
+    for snap in (first, second):
+        install_kp_fusion(snap)
+        _ingest(snap)
+    a, b = first.get("kp_distribution"), second.get("kp_distribution")
+    assert a.version != b.version
+    assert a.digest == b.digest and a.value == b.value
+
+
+def test_fusion_refits_when_the_period_rolls_over():
+    clock = [datetime(2025, 9, 26, 13, 10)]
+    snap = ForecastSnapshot()
+    fusion = KpFusion(snap, now=lambda: clock[0])
+    snap.subscribe(fusion)
+    _ingest(snap)
+    first = snap.get("kp_distribution")
+    assert first.value["anchor"] == "2025-09-26T12:00:00Z" and not first.value["stale"]
+
+    clock[0] = datetime(2025, 9, 26, 14, 50)
+    fusion.roll()
+    assert snap.get("kp_distribution") is first  # same period: nothing to refit
+
+    # No input changed, but the 12-15 UT period is over; the next 24h now starts at 15 UT.
+    clock[0] = datetime(2025, 9, 26, 15, 5)
+    fusion.roll()
+    rolled = snap.get("kp_distribution")
+    assert rolled.value["anchor"] == "2025-09-26T15:00:00Z"
+    assert rolled.value["periods"][0]["start"] != first.value["periods"][0]["start"]
+
+
+def test_max_distribution_dominates_each_period():
+    with open(os.path.join(FIXTURES, "3-day-forecast.txt")) as f:
+        three_day = parse_3day_forecast(f.read())
+    dist = fuse_kp_forecasts(three_day, None)
+    max_cdf = np.cumsum(dist["next_24h_max"]["pmf"])
+    for period in dist["periods"][:8]:
+        assert np.all(max_cdf <= np.cumsum(period["pmf"]) + 1e-4)
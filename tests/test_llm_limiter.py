@@ -0,0 +1,137 @@
+import time
+import threading
+
+import pytest
+
+from llm_limiter import (
+    CircuitBreaker,
+    LLMDeadlineExceeded,
+    LLMLimiter,
+    LLMUnavailable,
+    guard_class,
+    llm_deadline,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_then_allows_one_trial():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now = 10.0
+    assert breaker.state == "half-open"
+    assert breaker.allow() and not breaker.allow()  # a single trial at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 20.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_retries_transient_errors_with_backoff():
+    limiter = LLMLimiter(max_retries=2, retry_base=0.001, retry_max=0.002, seed=1)
+    attempts = {"n": 0}
+
+    def flaky():
+        attempts["n"] += 1
+        if attempts["n"] < 3:
+            raise ConnectionError("503 from provider")
+        return "ok"
+
+    assert limiter.call("m", flaky) == "ok"
+    assert attempts["n"] == 3 and limiter.breaker("m").state == "closed"
+
+
+def test_permanent_errors_are_not_retried():
+    class AuthenticationError(Exception):
+        pass
+
+    limiter = LLMLimiter(max_retries=3, retry_base=0.001)
+    attempts = {"n": 0}
+
+    def denied():
+        attempts["n"] += 1
+        raise AuthenticationError("bad key")
+
+    with pytest.raises(AuthenticationError):
+        limiter.call("m", denied)
+    assert attempts["n"] == 1
+
+
+def test_open_breaker_refuses_without_calling_and_marks_scope_degraded():
+    limiter = LLMLimiter(max_retries=0, breaker_failures=1, breaker_reset_seconds=60)
+    with pytest.raises(ConnectionError):
+        limiter.call("m", lambda: (_ for _ in ()).throw(ConnectionError("quota")))
+
+    called = []
+    with llm_deadline(5) as scope:
+        with pytest.raises(LLMUnavailable):
+            limiter.call("m", lambda: called.append(1))
+    assert not called and scope.degraded
+    assert limiter.call("other-model", lambda: "ok") == "ok"  # breakers are per model
+
+
+def test_deadline_bounds_a_hung_call():
+    limiter = LLMLimiter(call_timeout=30)
+    release = threading.Event()
+    started = time.monotonic()
+    with llm_deadline(0.2) as scope:
+        with pytest.raises(LLMDeadlineExceeded):
+            limiter.call("m", lambda: release.wait(5))
+    assert time.monotonic() - started < 2.0
+    assert scope.degraded
+    release.set()
+
+
+def test_concurrency_cap_per_model():
+    limiter = LLMLimiter(max_concurrency=2, model_caps={"lite": 3})
+    active = {"m": 0, "lite": 0}
+    peak = {"m": 0, "lite": 0}
+    lock = threading.Lock()
+
+    def work(model):
+        with lock:
+            active[model] += 1
+            peak[model] = max(peak[model], active[model])
+        time.sleep(0.05)
+        with lock:
+            active[model] -= 1
+
+    threads = [threading.Thread(target=limiter.call, args=(model, lambda model=model: work(model)))
+               for model in ("m", "lite") for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak == {"m": 2, "lite": 3}
+
+
+def test_guard_class_routes_call_through_limiter():
+    class FakeLLM:
+        def __init__(self, model):
+            self.model = model
+
+        def call(self, prompt):
+            return f"{self.model}:{prompt}"
+
+    limiter = LLMLimiter(breaker_failures=1, breaker_reset_seconds=60)
+    guard_class(FakeLLM, limiter)
+    guard_class(FakeLLM, limiter)  # idempotent
+    assert FakeLLM("gemini/x").call("hi") == "gemini/x:hi"
+
+    limiter.breaker("gemini/x").record_failure()
+    with pytest.raises(LLMUnavailable):
+        FakeLLM("gemini/x").call("hi")
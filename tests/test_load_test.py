@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("fastapi")
+
+from fastapi import FastAPI, Request
+
+from http_cache import ResponseCache
+from load_test import Scenario, compare, main, run_scenario
+
+
+def _app():
+    app = FastAPI()
+    cache = ResponseCache()
+
+    @app.get("/cached")
+    def cached(request: Request):
+        return cache.respond(request, "cached", 1, lambda: {"kp": [1, 2, 3]}, max_age=60)
+
+    @app.get("/broken")
+    def broken():
+        raise RuntimeError("boom")
+
+    return app
+
+
+def _run(scenario, duration=0.3, concurrency=4):
+    async def go():
+        transport = httpx.ASGITransport(app=_app(), raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await run_scenario(client, scenario, duration, concurrency)
+    return asyncio.run(go())
+
+
+def test_polling_scenario_revalidates_and_reports_latency():
+    result = _run(Scenario("poll", [(1.0, lambda rng: ("GET", "/cached", None))], revalidate=True))
+    assert result["requests"] > 10 and result["error_rate"] == 0.0
+    assert result["status_counts"]["304"] >= result["requests"] - 4  # one 200 per client worker at most
+    assert result["latency"]["p50_ms"] <= result["latency"]["p99_ms"]
+    assert result["by_endpoint"]["/cached"]["count"] == result["requests"]
+
+
+def test_errors_and_bursts_are_counted():
+    scenario = Scenario("mixed", [(1.0, lambda rng: ("GET", "/cached", None)), (1.0, lambda rng: ("GET", "/broken", None))],
+                        burst=10, burst_interval=0.05)
+    result = _run(scenario)
+    assert result["requests"] % 10 == 0
+    assert 0.0 < result["error_rate"] < 1.0
+    assert "500" in result["status_counts"]
+
+
+def test_compare_flags_regressions():
+    base = {"scenarios": {"dash": {"rps": 100.0, "error_rate": 0.0, "latency": {"p95_ms": 10.0}}}}
+    same = {"scenarios": {"dash": {"rps": 95.0, "error_rate": 0.005, "latency": {"p95_ms": 11.0}}}}
+    worse = {"scenarios": {"dash": {"rps": 60.0, "error_rate": 0.05, "latency": {"p95_ms": 20.0}}}}
+    assert compare(same, base) == []
+    assert len(compare(worse, base)) == 3
+
+
+def test_replay_without_a_cassette_fails_fast(tmp_path, monkeypatch):
+    monkeypatch.setenv("CASSETTE_DIR", str(tmp_path))
+    with pytest.raises(SystemExit) as exc:
+        main(["--llm", "replay", "--output", str(tmp_path / "out.json")])
+    assert exc.value.code == 2
+    assert not (tmp_path / "out.json").exists()
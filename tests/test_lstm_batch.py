@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from lstm_model_handle import (
+    N_FEATURES,
+    N_STEPS,
+    LSTMModelHandler,
+    StreamingLSTMPredictor,
+    scaler_affine,
+    sliding_windows,
+)
+
+
+class AffineScaler:
+    """MinMaxScaler-shaped stand-in: transform(X) = X * scale_ + min_."""
+
+    def __init__(self):
+        self.scale_ = np.linspace(0.5, 1.5, N_FEATURES)
+        self.min_ = np.linspace(-1.0, 1.0, N_FEATURES)
+
+    def transform(self, X):
+        return np.asarray(X) * self.scale_ + self.min_
+
+    def inverse_transform(self, X):
+        return (np.asarray(X) - self.min_) / self.scale_
+
+
+class MeanOfLastStep:
+    """Stand-in model: predicts the mean of the last time step's scaled features."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, x, training=False):
+        self.calls += 1
+        return x[:, -1, :].mean(axis=1, keepdims=True)
+
+    def predict(self, x, batch_size=None, verbose=0):
+        return self(x)
+
+
+def _handler():
+    handler = LSTMModelHandler.__new__(LSTMModelHandler)
+    handler.model = MeanOfLastStep()
+    handler.scaler = AffineScaler()
+    handler._affine = scaler_affine(handler.scaler)
+    return handler
+
+
+def test_sliding_windows_is_a_view():
+    series = np.arange(70 * N_FEATURES, dtype=np.float64).reshape(70, N_FEATURES)
+    windows = sliding_windows(series, N_STEPS)
+    assert windows.shape == (11, N_STEPS, N_FEATURES)
+    assert np.shares_memory(windows, series)
+    np.testing.assert_array_equal(windows[3], series[3:3 + N_STEPS])
+    assert sliding_windows(series, N_STEPS, stride=5).shape[0] == 3
+
+
+def test_predict_series_matches_per_window_predictions():
+    handler = _handler()
+    rng = np.random.default_rng(0)
+    series = rng.normal(size=(N_STEPS + 99, N_FEATURES))
+
+    batched = handler.predict_series(series, batch_size=64)
+    assert batched.shape == (100,)
+
+    scaler = handler.scaler
+    for i in (0, 42, 99):
+        scaled = scaler.transform(series[i:i + N_STEPS])
+        expected = scaler.inverse_transform(
+            np.r_[scaled[-1].mean(), np.zeros(N_FEATURES - 1)][None, :]
+        )[0, 0]
+        assert batched[i] == pytest.approx(expected)
+    # 100 windows in batches of 64 -> two model calls.
+    assert handler.model.calls == 2
+
+
+def test_predict_batch_validates_shape():
+    with pytest.raises(ValueError):
+        _handler().predict_batch(np.zeros((2, N_STEPS, N_FEATURES + 1)))
+
+
+def test_generic_scaler_fallback():
+    handler = _handler()
+    handler._affine = None
+    windows = np.ones((3, N_STEPS, N_FEATURES))
+    handler_affine = _handler()
+    np.testing.assert_allclose(handler.predict_batch(windows), handler_affine.predict_batch(windows))
+
+
+def test_streaming_ring_buffer_matches_batch_series():
+    handler = _handler()
+    rng = np.random.default_rng(1)
+    series = rng.normal(size=(N_STEPS + 10, N_FEATURES))
+    expected = handler.predict_series(series)
+
+    stream = StreamingLSTMPredictor(handler)
+    nowcasts = [stream.push(row) for row in series]
+    assert all(v is None for v in nowcasts[:N_STEPS - 1])
+    np.testing.assert_allclose(nowcasts[N_STEPS - 1:], expected, rtol=1e-5)
+    # The window is a view into the ring buffer, not a copy.
+    assert np.shares_memory(stream.window(), stream._buf)
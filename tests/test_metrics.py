@@ -0,0 +1,25 @@
+from metrics import Metrics
+
+
+def test_timer_percentiles_and_gauges():
+    m = Metrics(reservoir_size=4)
+    for seconds in (0.001, 0.002, 0.003, 0.004, 0.005):
+        m.observe("lstm.inference", seconds)
+    m.set("lstm.load_seconds", 2.5)
+    m.incr("lstm.predictions", 5)
+
+    snap = m.snapshot()
+    timer = snap["timers"]["lstm.inference"]
+    assert timer["count"] == 5
+    assert timer["max_ms"] == 5.0
+    # Only the last four samples are kept for percentiles.
+    assert timer["p50_ms"] == 4.0
+    assert snap["gauges"]["lstm.load_seconds"] == 2.5
+    assert snap["counters"]["lstm.predictions"] == 5
+
+
+def test_timer_context_manager_records_sample():
+    m = Metrics()
+    with m.timer("noop"):
+        pass
+    assert m.snapshot()["timers"]["noop"]["count"] == 1
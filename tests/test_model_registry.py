@@ -0,0 +1,123 @@
+import json
+
+import numpy as np
+import pytest
+
+import model_registry
+from model_registry import MANIFEST_PATH, Manifest, ModelRegistry
+
+
+class ScaledSum:
+    """Fake handler: prediction = factor * sum of the last time step."""
+
+    def __init__(self, spec, path):
+        self.spec = spec
+        self.factor = float(spec.description or 1.0)
+        self.ready = True
+
+    def predict_batch(self, windows):
+        return self.factor * np.asarray(windows)[:, -1, :].sum(axis=1)
+
+
+def _entry(name, version, factor, n_features=3):
+    return {
+        "name": name, "version": version, "framework": "fake", "target": "kp",
+        "path": "unused", "n_steps": 4, "n_features": n_features, "description": str(factor),
+    }
+
+
+@pytest.fixture
+def manifest_file(tmp_path, monkeypatch):
+    monkeypatch.setitem(model_registry.LOADERS, "fake", ScaledSum)
+    path = tmp_path / "manifest.json"
+    data = {
+        "models": [_entry("a", "1", 1.0), _entry("a", "10", 2.0), _entry("b", "1", 4.0)],
+        "defaults": {"kp": "a"},
+        "ensembles": {"avg": {"members": ["a@1", "b"], "weights": [3, 1]}},
+    }
+    path.write_text(json.dumps(data))
+    return path
+
+
+def test_shipped_manifest_is_valid():
+    manifest = Manifest.from_file(MANIFEST_PATH)
+    assert {s.target for s in manifest.specs.values()} == {"kp", "dst"}
+    assert manifest.resolve(manifest.defaults["dst"]).framework == "torch"
+    # The Dst checkpoint has no scaler or original head, so its outputs are flagged, not served as nT.
+    assert manifest.resolve(manifest.defaults["dst"]).calibrated is False
+    # No scaler was shipped with the Kp model either, so its outputs are not Kp.
+    assert manifest.resolve(manifest.defaults["kp"]).calibrated is False
+
+
+def test_resolve_picks_highest_version(manifest_file):
+    registry = ModelRegistry(str(manifest_file))
+    assert registry.resolve("a").key == "a@10"
+    assert registry.resolve("a@1").version == "1"
+    assert registry.default("kp").key == "a@10"
+    with pytest.raises(KeyError):
+        registry.resolve("missing")
+
+
+def test_get_without_load_requires_warm_model(manifest_file):
+    registry = ModelRegistry(str(manifest_file))
+    with pytest.raises(LookupError):
+        registry.get("b", load=False)
+    assert registry.warm() == {"a@1": True, "a@10": True, "b@1": True}
+    assert registry.get("b", load=False) is registry.get("b")
+
+
+def test_ensemble_weighted_mean(manifest_file):
+    registry = ModelRegistry(str(manifest_file))
+    windows = np.ones((2, 4, 3))
+    result = registry.predict_ensemble("avg", windows)
+    np.testing.assert_allclose(result["members"]["a@1"], [3.0, 3.0])
+    np.testing.assert_allclose(result["members"]["b@1"], [12.0, 12.0])
+    np.testing.assert_allclose(result["mean"], [(3 * 3.0 + 12.0) / 4] * 2)
+
+
+def test_ensemble_rejects_mixed_shapes(monkeypatch):
+    monkeypatch.setitem(model_registry.LOADERS, "fake", ScaledSum)
+    with pytest.raises(ValueError):
+        Manifest({
+            "models": [_entry("a", "1", 1.0), _entry("b", "1", 1.0, n_features=5)],
+            "ensembles": {"bad": {"members": ["a", "b"]}},
+        })
+
+
+def test_reload_swaps_changed_models_only(manifest_file):
+    registry = ModelRegistry(str(manifest_file))
+    registry.warm()
+    old_a1, old_b = registry.get("a@1"), registry.get("b")
+
+    data = json.loads(manifest_file.read_text())
+    data["models"][2]["description"] = "5.0"
+    data["models"] = [m for m in data["models"] if m["version"] != "10"]
+    manifest_file.write_text(json.dumps(data))
+
+    assert set(registry.reload()) == {"a@1", "b@1"}
+    assert registry.get("a@1", load=False) is old_a1
+    assert registry.get("b", load=False) is not old_b
+    assert registry.get("b", load=False).factor == 5.0
+    assert registry.resolve("a").key == "a@1"
+
+
+def test_uncalibrated_dst_is_not_reported_in_nanotesla(monkeypatch):
+    from dataclasses import replace
+
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    shipped = Manifest.from_file(MANIFEST_PATH)
+    spec = shipped.resolve(shipped.defaults["dst"])
+    handler = ScaledSum(replace(spec, description="1"), None)
+    client = TestClient(api_server.app)
+    windows = {"windows": [[[1.0] * 5] * 3]}
+
+    monkeypatch.setattr(api_server, "_dst_handler_or_503", lambda: (handler, spec))
+    body = client.post("/api/dst-forecast", json=windows).json()
+    assert body["calibrated"] is False and "dst_nt" not in body
+    assert body["dst_relative"] == [5.0]
+
+    monkeypatch.setattr(api_server, "_dst_handler_or_503", lambda: (handler, replace(spec, calibrated=True)))
+    assert client.post("/api/dst-forecast", json=windows).json()["dst_nt"] == [5.0]
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+torch = pytest.importorskip("torch")
+
+import export_models
+from lstm_model_handle import N_FEATURES, N_STEPS, LSTMModelHandler
+from model_registry import ModelSpec
+
+
+class LastStepLSTM(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.lstm = torch.nn.LSTM(N_FEATURES, 8, batch_first=True)
+        self.linear = torch.nn.Linear(8, 1)
+
+    def forward(self, x):
+        out, _ = self.lstm(x)
+        return self.linear(out[:, -1, :])
+
+
+def test_dst_export_matches_torch(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_models, "ONNX_DIR", str(tmp_path))
+    spec = ModelSpec(name="dst-lstm", version="1", framework="torch", target="dst",
+                     path="models/dstpredict.pth", n_features=5)
+    report = export_models.export_model(spec, update_manifest=False)
+    assert report["passed"], report
+    assert report["max_abs_err"] < 1e-4
+
+
+def test_lstm_handler_runs_onnx_without_keras(tmp_path):
+    model = LastStepLSTM().eval()
+    path = str(tmp_path / "kp.onnx")
+    torch.onnx.export(
+        model, torch.zeros(1, N_STEPS, N_FEATURES), path,
+        input_names=["windows"], dynamic_axes={"windows": {0: "batch"}}, dynamo=False,
+    )
+    handler = LSTMModelHandler(path, None)
+    assert handler.ready
+
+    windows = np.random.default_rng(0).normal(size=(40, N_STEPS, N_FEATURES)).astype(np.float32)
+    with torch.inference_mode():
+        expected = model(torch.from_numpy(windows)).numpy().reshape(-1)
+    # 40 windows exercise both the direct-call (<= 32) and predict() paths.
+    np.testing.assert_allclose(handler.predict_batch(windows, batch_size=32), expected, atol=1e-5)
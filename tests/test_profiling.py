@@ -0,0 +1,88 @@
+import os
+import json
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from profiling import PROFILE_ID_HEADER, ProfileStore, ProfilingMiddleware, install_profiling
+
+
+def _busy_pricing_loop(seconds: float) -> float:
+    total = 0.0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += sum(i * 0.5 for i in range(200))
+    return total
+
+
+def _app(directory, **options):
+    app = FastAPI()
+
+    @app.get("/slow")
+    def slow():
+        return {"total": _busy_pricing_loop(0.15)}
+
+    @app.get("/api/profiles")
+    def profiles():
+        return {"profiles": os.listdir(directory)}
+
+    app.add_middleware(ProfilingMiddleware, directory=str(directory), interval_ms=2.0, **options)
+    return TestClient(app)
+
+
+def _wait_for(path, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return os.path.exists(path)
+
+
+def test_token_header_captures_flamegraph_ready_profile(tmp_path):
+    client = _app(tmp_path, token="secret")
+
+    assert PROFILE_ID_HEADER not in client.get("/slow").headers
+    assert PROFILE_ID_HEADER not in client.get("/slow", headers={"X-Profile-Token": "wrong"}).headers
+
+    resp = client.get("/slow", headers={"X-Profile-Token": "secret"})
+    profile_id = resp.headers[PROFILE_ID_HEADER]
+    assert _wait_for(tmp_path / f"{profile_id}.json")
+
+    summary = json.loads((tmp_path / f"{profile_id}.json").read_text())
+    assert summary["path"] == "/slow" and summary["status"] == 200 and summary["trigger"] == "header"
+    assert summary["samples"] > 0
+
+    store = ProfileStore(str(tmp_path), token="secret")
+    folded = store.folded(profile_id)
+    lines = folded.strip().splitlines()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("_busy_pricing_loop" in line for line in lines)
+    assert store.recent()[0]["id"] == profile_id
+    assert store.folded("../etc/passwd") is None
+    assert not store.authorized("wrong") and store.authorized("secret")
+
+
+def test_reading_profiles_is_not_profiled(tmp_path):
+    client = _app(tmp_path, token="secret", sample_rate=1.0)
+    resp = client.get("/api/profiles", headers={"X-Profile-Token": "secret"})
+    assert resp.status_code == 200 and PROFILE_ID_HEADER not in resp.headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_sample_rate_profiles_without_header(tmp_path):
+    client = _app(tmp_path, sample_rate=1.0)
+    profile_id = client.get("/slow").headers[PROFILE_ID_HEADER]
+    assert _wait_for(tmp_path / f"{profile_id}.json")
+    assert json.loads((tmp_path / f"{profile_id}.json").read_text())["trigger"] == "sampled"
+
+
+def test_disabled_installs_no_middleware(monkeypatch):
+    monkeypatch.delenv("PROFILE_TOKEN", raising=False)
+    monkeypatch.delenv("PROFILE_SAMPLE_RATE", raising=False)
+    app = FastAPI()
+    assert install_profiling(app) is None
+    assert not any(m.cls is ProfilingMiddleware for m in app.user_middleware)
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from forecast_snapshot import ForecastSnapshot
+from kp_fusion import discretized_normal
+from quote_tables import (
+    FIXED_FEE_USD,
+    LOADING,
+    QuoteTables,
+    incident_probability_over,
+    install_quote_tables,
+)
+
+PORTFOLIO = [
+    {"asset_id": "SAT-1", "value_millions": 300, "shielding": "Hardened", "years_in_orbit": 2},
+    {"asset_id": "SAT-2", "value_millions": 150, "shielding": "Standard", "years_in_orbit": 9},
+]
+
+
+def _distribution(mean):
+    pmf = discretized_normal(mean, 0.7)
+    return {"next_24h_max": {"pmf": pmf.tolist()}}
+
+
+@pytest.mark.parametrize("value,shielding,years", [
+    (100, "Standard", 5),       # on the grid
+    (333.3, "Light", 12.5),     # between grid points
+    (7500, "Hardened", 55),     # past both ends of the grid
+])
+def test_table_quote_matches_direct_formula(value, shielding, years):
+    pmf = discretized_normal(4.0, 0.8)
+    tables = QuoteTables(pmf, PORTFOLIO, snapshot_digest="d1")
+    quote = tables.quote(value, shielding, years, adjustment_factor=1.1)
+    direct = incident_probability_over(pmf, shielding, int(years)) if float(years).is_integer() else None
+    if direct is not None:
+        expected = (direct * value * 1_000_000 * LOADING + FIXED_FEE_USD) * 1.1
+        assert quote["base_premium_usd"] == pytest.approx(expected, rel=1e-9)
+    assert quote["calculated_premium_usd"] == pytest.approx(quote["base_premium_usd"] * tables.surcharge, rel=1e-9)
+
+
+def test_policy_status_follows_viability_caps():
+    calm = QuoteTables(discretized_normal(1.0, 0.5), PORTFOLIO, snapshot_digest="d1")
+    assert calm.recommendation == "Continue Writing New Policies"
+    assert calm.quote(100, "Hardened", 1)["policy_status"] == "APPROVED"
+    severe = QuoteTables(discretized_normal(8.7, 0.5), PORTFOLIO, snapshot_digest="d2")
+    assert severe.quote(100, "Light", 30)["policy_status"] == "REJECTED"
+    # An underwriter adjustment that lands the premium at 30% of value hits the 15% cap.
+    base = calm.quote(100, "Standard", 10)["calculated_premium_usd"]
+    modified = calm.quote(100, "Standard", 10, adjustment_factor=30_000_000 / base)
+    assert modified["policy_status"] == "MODIFIED"
+    assert modified["final_premium_usd"] == pytest.approx(15_000_000)
+
+
+def test_store_rebuilds_on_forecast_and_portfolio_changes():
+    snap = ForecastSnapshot()
+    portfolio = list(PORTFOLIO)
+    store = install_quote_tables(lambda: portfolio, snap)
+    assert store.current() is None
+
+    snap.publish("kp_distribution", _distribution(3.0))
+    first = store.current()
+    assert first.snapshot_digest == snap.get("kp_distribution").digest
+
+    snap.publish("kp_distribution", _distribution(6.0))
+    second = store.current()
+    assert second.snapshot_digest != first.snapshot_digest
+    assert second.incident_probability.sum() > first.incident_probability.sum()
+    assert store.get(first.snapshot_digest, first.portfolio_version) is first
+
+    # Republishing the same distribution keeps the tables keyed by its content.
+    snap.publish("kp_distribution", _distribution(6.0))
+    assert store.current().snapshot_digest == second.snapshot_digest
+
+    portfolio.append({"asset_id": "SAT-3", "value_millions": 900, "shielding": "Light", "years_in_orbit": 20})
+    third = store.current()
+    assert third.portfolio_version != second.portfolio_version
+    assert third.snapshot_digest == second.snapshot_digest
+    assert store.current() is third
+
+
+def test_incident_probability_table_is_monotone_in_age_and_shielding():
+    tables = QuoteTables(discretized_normal(5.0, 1.0), PORTFOLIO, snapshot_digest="d1")
+    prob = tables.incident_probability
+    assert np.all(np.diff(prob, axis=1) >= 0)
+    assert np.all(np.diff(prob, axis=0) >= 0)
@@ -0,0 +1,86 @@
+import re
+import json
+import threading
+
+from kp_fusion import discretized_normal
+from quote_tables import incident_probability_over
+from risk_batch import (
+    asset_row,
+    assess_fleet,
+    build_batch_prompt,
+    chunk_assets,
+    parse_batch_response,
+    parse_kp_value,
+)
+
+
+def _fleet(n):
+    shielding = ("Hardened", "Standard", "Light/Legacy")
+    return [{"id": f"Sat-{i:04d}", "value_millions": 100 + i, "age": i % 15, "shielding": shielding[i % 3]}
+            for i in range(n)]
+
+
+def _rows_in(prompt):
+    return re.findall(r"^\s*(Sat-\d{4})\|", prompt, flags=re.MULTILINE)
+
+
+def test_parse_kp_value_matches_single_asset_tool():
+    assert parse_kp_value("Worst case Kp 6.67 expected") == 6.67
+    assert parse_kp_value("7") == 7.0
+    assert parse_kp_value("unknown") is None
+
+
+def test_chunks_respect_asset_count_and_table_size():
+    fleet = _fleet(120)
+    assert [len(c) for c in chunk_assets(fleet, max_assets=50)] == [50, 50, 20]
+
+    row = len(asset_row(fleet[0])) + 1
+    chunks = chunk_assets(fleet, max_assets=1000, max_table_chars=100 + 10 * row)
+    assert sum(len(c) for c in chunks) == 120
+    assert all(len(c) <= 12 for c in chunks)
+
+
+def test_prompt_carries_context_once_and_one_row_per_asset():
+    fleet = _fleet(5)
+    prompt = build_batch_prompt(6.33, "G3 watch in effect", fleet)
+    assert prompt.count("G3 watch in effect") == 1
+    assert _rows_in(prompt) == [a["id"] for a in fleet]
+
+
+def test_parse_batch_response_drops_invalid_rows():
+    reply = 'Here you go: [{"id": "a", "incident_probability": 0.1}, {"id": "b", "incident_probability": 1.7},' \
+            ' {"id": "zzz", "incident_probability": 0.2}, {"id": "c", "incident_probability": "n/a"}]'
+    parsed = parse_batch_response(reply, ["a", "b", "c"])
+    assert list(parsed) == ["a"] and parsed["a"]["source"] == "llm"
+    assert parse_batch_response("no json here", ["a"]) == {}
+
+
+def test_assess_fleet_batches_retries_missing_and_fills_deterministically():
+    fleet = _fleet(120)
+    prompts = []
+    lock = threading.Lock()
+
+    def fake_llm(prompt):
+        ids = _rows_in(prompt)
+        with lock:
+            prompts.append(ids)
+            first_pass = len(prompts) <= 3
+        if first_pass and "Sat-0100" in ids:
+            raise ConnectionError("quota")
+        # The first pass forgets Sat-0007; Sat-0119 never gets an answer.
+        return json.dumps([{"id": i, "incident_probability": 0.05, "risk_category": "Moderate", "confidence": 0.9}
+                           for i in ids if i != "Sat-0119" and not (first_pass and i == "Sat-0007")])
+
+    pmf = discretized_normal(6.0, 1.0).tolist()
+    result = assess_fleet(fake_llm, 6.0, "none", fleet, kp_pmf=pmf, max_assets=50)
+
+    assert [a["id"] for a in result["assets"]] == [a["id"] for a in fleet]
+    by_id = {a["id"]: a for a in result["assets"]}
+    assert by_id["Sat-0007"]["source"] == "llm" and by_id["Sat-0100"]["source"] == "llm"
+    assert result["deterministic_assets"] == 1
+    det = by_id["Sat-0119"]
+    assert det["source"] == "deterministic"
+    assert abs(det["incident_probability"] - incident_probability_over(pmf, "Light/Legacy", 14)) < 1e-6
+    # Three chunks, then one retry batch: the forgotten asset plus the chunk that failed.
+    assert result["usage"]["calls"] == 4 and result["usage"]["failed_calls"] == 1
+    assert len(prompts[-1]) == 21
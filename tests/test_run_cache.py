@@ -0,0 +1,106 @@
+import time
+import threading
+
+from forecast_snapshot import ForecastSnapshot
+from run_cache import RunCache
+
+INPUTS = {"asset_value_millions": 250.0, "shielding_level": "Standard", "years_in_orbit": 5, "adjustment_factor": 1.0}
+
+
+def _counting(result=None, delay=0.0, error=None):
+    calls = {"n": 0}
+
+    def compute():
+        calls["n"] += 1
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return dict(result or {"premium": 1000.0})
+    return compute, calls
+
+
+def test_concurrent_identical_requests_share_one_run():
+    cache = RunCache(ForecastSnapshot())
+    compute, calls = _counting(delay=0.2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.run(INPUTS, "p1", compute))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls["n"] == 1
+    assert len(results) == 8 and all(r["premium"] == 1000.0 for r in results)
+    assert sorted(r["cached"] for r in results) == [False] + [True] * 7
+    assert cache.run(INPUTS, "p1", compute)["cached"] is True
+    assert calls["n"] == 1
+
+
+def test_key_covers_inputs_portfolio_and_forecast_issuance():
+    snap = ForecastSnapshot()
+    cache = RunCache(snap)
+    snap.subscribe(cache)
+    compute, calls = _counting()
+
+    cache.run(INPUTS, "p1", compute)
+    cache.run(dict(INPUTS, years_in_orbit=6), "p1", compute)
+    cache.run(INPUTS, "p2", compute)
+    assert calls["n"] == 3 and len(cache) == 3
+
+    snap.publish("solar_wind", {})  # not a forecast the crew reads
+    assert len(cache) == 3
+    snap.publish("kp_distribution", {})
+    assert len(cache) == 0
+    assert cache.run(INPUTS, "p1", compute)["cached"] is False
+    assert calls["n"] == 4
+
+
+def test_errors_reach_waiters_and_are_not_cached():
+    cache = RunCache(ForecastSnapshot())
+    failing, calls = _counting(delay=0.2, error=RuntimeError("quota"))
+    errors = []
+
+    def call():
+        try:
+            cache.run(INPUTS, "p1", failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls["n"] == 1 and errors == ["quota"] * 4
+
+    compute, _ = _counting()
+    assert cache.run(INPUTS, "p1", compute)["cached"] is False
+
+
+def test_run_straddling_a_new_issuance_is_not_stored():
+    snap = ForecastSnapshot()
+    cache = RunCache(snap)
+
+    def compute():
+        snap.publish("noaa_3day", {})
+        return {"premium": 1.0}
+
+    cache.run(INPUTS, "p1", compute)
+    assert len(cache) == 0
+
+
+def test_lru_is_bounded():
+    cache = RunCache(ForecastSnapshot(), max_entries=2)
+    compute, calls = _counting()
+    for years in (1, 2, 3):
+        cache.run(dict(INPUTS, years_in_orbit=years), "p1", compute)
+    assert len(cache) == 2
+    cache.run(dict(INPUTS, years_in_orbit=1), "p1", compute)
+    assert calls["n"] == 4
+
+
+def test_degraded_results_are_not_cached():
+    cache = RunCache(ForecastSnapshot())
+    compute, _ = _counting(result={"premium": 1.0, "degraded": ["Circuit breaker open"]})
+    cache.run(INPUTS, "p1", compute)
+    assert len(cache) == 0
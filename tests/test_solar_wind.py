@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+
+import model_registry
+from forecast_snapshot import ForecastSnapshot
+from lstm_model_handle import LSTMModelHandler
+from solar_wind import (
+    MAG_PRODUCT,
+    PLASMA_PRODUCT,
+    SOLAR_WIND_FEATURES,
+    FixtureFetcher,
+    SolarWindIngestor,
+    align_solar_wind,
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "swpc")
+
+
+class RecordingPredictor:
+    def __init__(self):
+        self.rows = []
+
+    def extend(self, samples):
+        self.rows.extend(np.asarray(samples).tolist())
+
+    def predict(self):
+        return 4.25 if len(self.rows) >= 60 else None
+
+
+class GrowingFetcher:
+    """Fixture fetcher that reveals one more minute on every poll."""
+
+    def __init__(self, minutes):
+        self.base = FixtureFetcher(FIXTURES)
+        self.minutes = minutes
+
+    def __call__(self, product):
+        rows = self.base(product)
+        return rows[: self.minutes + 1]
+
+
+def test_align_fills_short_gaps_on_minute_grid():
+    fetch = FixtureFetcher(FIXTURES)
+    aligned = align_solar_wind(fetch(PLASMA_PRODUCT), fetch(MAG_PRODUCT))
+    assert list(aligned.columns) == list(SOLAR_WIND_FEATURES)
+    assert len(aligned) == 180
+    assert not aligned.isna().any().any()
+
+
+def test_ingestor_feeds_only_new_minutes_and_publishes_nowcast():
+    fetcher = GrowingFetcher(120)
+    snap = ForecastSnapshot()
+    predictor = RecordingPredictor()
+    ingestor = SolarWindIngestor(fetcher=fetcher, predictor=predictor, snapshot=snap, window_size=60,
+                                 features=SOLAR_WIND_FEATURES, calibrated=True)
+
+    assert ingestor.poll_once() == {"kp": 4.25, "as_of": "2025-09-26T10:59:00", "source": "lstm", "calibrated": True}
+    assert len(predictor.rows) == 60
+    assert ingestor.poll_once() is None  # nothing new
+
+    fetcher.minutes = 122
+    ingestor.poll_once()
+    assert len(predictor.rows) == 62
+    assert len(ingestor.window) == 60
+    assert snap.value("solar_wind")["as_of"] == "2025-09-26T11:01:00"
+    assert snap.value("lstm_nowcast")["kp"] == 4.25
+
+
+class LastSpeed:
+    """Stands in for the Keras model: the window's last solar wind speed, in hundreds of km/s."""
+
+    def __init__(self, column):
+        self.column = column
+
+    def __call__(self, windows, training=False):
+        return windows[:, -1, self.column:self.column + 1] / 100.0
+
+
+def test_ingestor_follows_the_shipped_kp_model(monkeypatch):
+    spec = model_registry.get_model_registry().default("kp")
+
+    def load_keras(spec, path):
+        # Same handler the registry builds, minus TensorFlow.
+        handler = LSTMModelHandler.__new__(LSTMModelHandler)
+        handler.n_steps, handler.n_features = spec.n_steps, spec.n_features
+        handler.model, handler.scaler = LastSpeed(spec.features.index("speed")), None
+        handler._affine = (np.ones(spec.n_features), np.zeros(spec.n_features))
+        return handler
+
+    monkeypatch.setitem(model_registry.LOADERS, "keras", load_keras)
+    monkeypatch.setattr(model_registry, "_registry", model_registry.ModelRegistry(model_registry.MANIFEST_PATH))
+    snap = ForecastSnapshot()
+    ingestor = SolarWindIngestor(fetcher=GrowingFetcher(120), snapshot=snap)
+
+    assert ingestor.window_size == spec.n_steps
+    assert ingestor.features == spec.features
+    nowcast = ingestor.poll_once()
+    assert nowcast is not None and nowcast["calibrated"] is spec.calibrated
+    assert nowcast["kp"] == round(min(9.0, ingestor.window["speed"].iloc[-1] / 100.0), 3)
+    # The published window keeps the five features the Dst model reads.
+    assert np.asarray(snap.value("solar_wind")["window"]).shape == (spec.n_steps, len(SOLAR_WIND_FEATURES))
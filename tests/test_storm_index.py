@@ -0,0 +1,43 @@
+from historical_store import load_historical_store
+from storm_index import StormEpisodeIndex
+
+SAMPLE_CSV = """ADATE,Year,Month,Day,Anamolytype,Anamoly,Kp,ap,Date
+1989-03-10,1989,3,10,NA,0,2.0,7.0,1989-03-10
+1989-03-11,1989,3,11,ESD,1,5.5,80.0,1989-03-11
+1989-03-12,1989,3,12,ESD,1,8.1,246.0,1989-03-12
+1989-03-13,1989,3,13,SEU,1,6.2,111.0,1989-03-13
+1989-03-14,1989,3,14,NA,0,3.0,15.0,1989-03-14
+1990-06-01,1990,6,1,UNK,1,6.4,90.0,1990-06-01
+1990-06-03,1990,6,3,NA,0,6.1,85.0,1990-06-03
+"""
+
+
+def _index(tmp_path):
+    csv_path = tmp_path / "merged_output.csv"
+    csv_path.write_text(SAMPLE_CSV)
+    return StormEpisodeIndex(load_historical_store(str(csv_path), str(tmp_path / "cache")))
+
+
+def test_episodes_per_threshold(tmp_path):
+    index = _index(tmp_path)
+    # Calendar gaps split episodes even when both sides exceed the threshold.
+    assert index.query(6.0)["total"] == 3
+    five = index.query(5.0)["items"]
+    assert (five[0]["start"], five[0]["end"], five[0]["peak_kp"]) == ("1989-03-11", "1989-03-13", 8.1)
+    assert five[0]["anomaly_count"] == 3
+
+
+def test_range_and_duration_filters(tmp_path):
+    index = _index(tmp_path)
+    hits = index.query(6.0, start="1989", end="1989", min_duration=2)["items"]
+    assert [(e["start"], e["end"]) for e in hits] == [("1989-03-12", "1989-03-13")]
+    assert index.query(5.0, start="1990-06", end="1990-06")["total"] == 2
+    assert index.query(5.0, min_anomalies=1, start="1990")["total"] == 1
+
+
+def test_point_lookup_and_on_demand_threshold(tmp_path):
+    index = _index(tmp_path)
+    assert index.episodes_at("1989-03-12", 8.0)[0]["peak_kp"] == 8.1
+    assert index.episodes_at("1989-03-14", 5.0) == []
+    assert index.query(6.3)["total"] == 2
+    assert 6.3 in index.thresholds
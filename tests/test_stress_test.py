@@ -0,0 +1,70 @@
+import math
+
+import pytest
+
+from stress_test import (
+    PortfolioArrays,
+    StressTestCache,
+    recommendation_for_pml_pct,
+    run_stress_test,
+)
+
+PORTFOLIO = [
+    {"id": "A", "value_millions": 100, "age": 2, "shielding": "Hardened", "orbit_type": "GEO"},
+    {"id": "B", "value_millions": 50, "age": 10, "shielding": "Light/Legacy", "orbit_type": "LEO"},
+    {"id": "C", "value_millions": 200, "age": 0, "shielding": "Standard", "orbit_type": "GEO"},
+]
+EVENTS = [{"name": "quiet", "kp": 3.0}, {"name": "1989-03", "date": "1989-03-13", "kp": 8.1}]
+
+
+def _scalar_loss(kp, asset):
+    p = 1.0 / (1.0 + math.exp(-1.5 * (kp - 7.0)))
+    p *= {"Hardened": 0.55, "Light/Legacy": 1.35}.get(asset["shielding"], 1.0)
+    p *= 1.0 + 0.015 * asset["age"]
+    return min(1.0, p) * asset["value_millions"]
+
+
+def test_loss_matrix_matches_per_asset_pricing():
+    result = run_stress_test(PortfolioArrays(PORTFOLIO), EVENTS)
+    assert result["segments"] == ["GEO", "LEO"]
+    for i, event in enumerate(EVENTS):
+        geo = _scalar_loss(event["kp"], PORTFOLIO[0]) + _scalar_loss(event["kp"], PORTFOLIO[2])
+        leo = _scalar_loss(event["kp"], PORTFOLIO[1])
+        assert result["loss_matrix_millions"][i] == pytest.approx([geo, leo], abs=1e-3)
+    assert result["events"][0]["strategic_recommendation"] == "Continue Writing New Policies"
+
+
+def test_cache_is_keyed_by_portfolio_version():
+    cache = StressTestCache(max_entries=2)
+    assert cache.run(PORTFOLIO, EVENTS, "orbit_type")["cached"] is False
+    assert cache.run(PORTFOLIO, EVENTS, "orbit_type")["cached"] is True
+    changed = PORTFOLIO[:2]
+    assert cache.run(changed, EVENTS, "orbit_type")["cached"] is False
+
+
+def test_recommendation_ladder():
+    assert recommendation_for_pml_pct(2.9) == "Continue Writing New Policies"
+    assert recommendation_for_pml_pct(15.0) == "Urgent Reinsurance Required"
+    assert recommendation_for_pml_pct(40.0) == "Temporarily Halt New Policies"
+
+
+def test_rejects_unknown_segment():
+    with pytest.raises(ValueError):
+        run_stress_test(PortfolioArrays(PORTFOLIO), EVENTS, segment_by="colour")
+
+
+def test_threshold_events_cover_every_episode(monkeypatch):
+    import storm_index
+    from stress_test import episodes_as_events
+
+    episodes = [{"start": f"e{i}", "end": f"e{i}", "peak_date": "2000-01-01", "peak_kp": 5.0} for i in range(2345)]
+
+    class PagedIndex:
+        def query(self, threshold, start=None, end=None, min_duration=1, offset=0, limit=100):
+            limit = min(limit, 1000)
+            return {"total": len(episodes), "items": episodes[offset:offset + limit]}
+
+    monkeypatch.setattr(storm_index, "get_storm_index", lambda: PagedIndex())
+    events = episodes_as_events(5.0)
+    assert len(events) == len(episodes)
+    assert events[-1]["name"].startswith("e2344..")
@@ -0,0 +1,68 @@
+import json
+from functools import partial
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from forecast_snapshot import ForecastSnapshot
+from noaa_feeds import KP_FORECAST_PRODUCT, NoaaForecastPoller, THREE_DAY_PRODUCT, http_text_fetcher
+from swpc_standin import Faults, SwpcStandIn, shift_product
+
+
+@pytest.fixture
+def standin():
+    with SwpcStandIn(faults=Faults(), seed=1) as server:
+        yield server
+
+
+def test_serves_products_at_their_real_paths(standin):
+    assert json.loads(http_text_fetcher(KP_FORECAST_PRODUCT, standin.url))[0][0] == "time_tag"
+    assert http_text_fetcher(THREE_DAY_PRODUCT, standin.url).startswith(":Product: 3-Day Forecast")
+    assert requests.get(f"{standin.url}/text/unknown.txt").status_code == 404
+
+
+def test_rollover_shifts_every_date():
+    text = ":Issued: 2025 Sep 30 1230 UTC\nBreakdown Sep 30-Oct 02 2025\n2025 09 30     3 1\n[\"2025-09-30 21:00:00\"]"
+    shifted = shift_product(text, 24)
+    assert ":Issued: 2025 Oct 01 1230 UTC" in shifted
+    assert "Breakdown Oct 1-Oct 3 2025" in shifted
+    assert "2025 10 01     3 1" in shifted
+    assert '"2025-10-01 21:00:00"' in shifted
+
+
+def test_poller_republishes_after_rollover(standin):
+    snap = ForecastSnapshot()
+    poller = NoaaForecastPoller(partial(http_text_fetcher, base_url=standin.url), snap)
+    assert len(poller.poll_once()) == 3
+    assert poller.poll_once() == []
+    issued = snap.value("noaa_3day")["issued"]
+
+    standin.rollover()
+    assert len(poller.poll_once()) == 3
+    assert snap.value("noaa_3day")["issued"] == issued.replace("09-26", "09-27")
+
+
+def test_injected_faults_reach_the_poller(standin):
+    snap = ForecastSnapshot()
+    poller = NoaaForecastPoller(partial(http_text_fetcher, base_url=standin.url), snap)
+    standin.faults.update({"error_rate": 1.0})
+    with pytest.raises(RuntimeError):
+        poller.poll_once()
+
+    # A truncated body is never published, and is retried on the next poll rather than cached.
+    standin.faults.update({"error_rate": 0.0, "truncate_rate": 1.0})
+    with pytest.raises(RuntimeError, match="unparseable"):
+        poller.poll_once()
+    assert snap.get("noaa_3day") is None
+    standin.faults.update({"truncate_rate": 0.0})
+    assert len(poller.poll_once()) == 3
+    assert standin.stats()["counters"]["truncated"] == 3
+
+
+def test_fault_settings_can_change_at_runtime(standin):
+    resp = requests.post(f"{standin.url}/_standin/faults", json={"latency_ms": 30})
+    assert resp.json()["faults"]["latency_ms"] == 30.0
+    assert requests.post(f"{standin.url}/_standin/faults", json={"nope": 1}).status_code == 400
+    elapsed = requests.get(f"{standin.url}/{KP_FORECAST_PRODUCT}").elapsed.total_seconds()
+    assert elapsed >= 0.03
@@ -1,6 +1,6 @@
 import React from 'react'
 import { KpChart, type KpPoint } from '../components/KpChart'
-import { getThreeDayForecast, getDailyGeomag, type DailyGeomagDay } from '../services/api'
+import { getDashboard, getThreeDayForecast, getDailyGeomag, type DailyGeomagDay } from '../services/api'
 
 // Kp Level interpretations for satellite operations
 const getKpRiskLevel = (kp: number) => {
@@ -16,10 +16,15 @@ export default function ForecastPage() {
   const [recentActivity, setRecentActivity] = React.useState<DailyGeomagDay[]>([])
 
   React.useEffect(() => {
-    Promise.all([
-      getThreeDayForecast().then(setForecast).catch(()=>{}),
-      getDailyGeomag(14).then(data => setRecentActivity(data.days || [])).catch(()=>{})
-    ])
+    getDashboard({ fields: ['forecast_3day', 'daily_geomag'], days: 14 })
+      .then(data => {
+        if (data.forecast_3day) setForecast(data.forecast_3day)
+        setRecentActivity(data.daily_geomag?.days || [])
+        // The per-product endpoints report NOAA errors; fall back to them for anything missing.
+        if (data.missing.includes('forecast_3day')) getThreeDayForecast().then(setForecast).catch(()=>{})
+        if (data.missing.includes('daily_geomag')) getDailyGeomag(14).then(d => setRecentActivity(d.days || [])).catch(()=>{})
+      })
+      .catch(()=>{})
   }, [])
 
   const flattened: KpPoint[] = React.useMemo(() => {
@@ -1,84 +1,41 @@
 import React from 'react'
-import { runHistoricalWorkflow, type HistoricalRunInputs, type RunInputs } from '../services/api'
-import axios from 'axios'
-
-// Parse CSV data from the actual cosmic events file
-const parseCosmicEventsData = () => {
-  // This would typically come from an API, but for demo purposes, we'll use some sample data
-  // that represents the structure of your actualcosmicevent.csv
-  const sampleEvents = [
-    {
-      date: '2001-03-31',
-      name: 'Halloween Storm 2001',
-      description: 'Major geomagnetic storm caused by a large solar flare and coronal mass ejection',
-      actualKp: 8.67,
-      predictedKp: 6.90,
-      accuracy: 79.6,
-      riskLevel: 'EXTREME',
-      impactDescription: 'Severe satellite disruptions, GPS outages, power grid fluctuations'
-    },
-    {
-      date: '2004-07-27',
-      name: 'Bastille Day Storm 2004',
-      description: 'Powerful solar storm that affected satellite communications globally',
-      actualKp: 8.67,
-      predictedKp: 8.60,
-      accuracy: 99.2,
-      riskLevel: 'EXTREME',
-      impactDescription: 'Critical satellite operations affected, widespread communication disruptions'
-    },
-    {
-      date: '2003-11-20',
-      name: 'November 2003 Solar Storm',
-      description: 'Series of intense solar flares during solar maximum',
-      actualKp: 8.67,
-      predictedKp: 8.53,
-      accuracy: 98.4,
-      riskLevel: 'EXTREME',
-      impactDescription: 'Multiple satellite anomalies, navigation system interference'
-    },
-    {
-      date: '2004-11-10',
-      name: 'Superstorm November 2004',
-      description: 'One of the most intense geomagnetic storms of the solar cycle',
-      actualKp: 8.67,
-      predictedKp: 8.13,
-      accuracy: 93.8,
-      riskLevel: 'EXTREME',
-      impactDescription: 'Severe satellite damage, complete GPS blackouts in some regions'
-    },
-    {
-      date: '2005-08-24',
-      name: 'August 2005 Solar Event',
-      description: 'Significant space weather event during declining solar activity',
-      actualKp: 8.67,
-      predictedKp: 7.40,
-      accuracy: 85.4,
-      riskLevel: 'EXTREME',
-      impactDescription: 'Satellite operations severely impacted, insurance claims filed'
-    },
-    {
-      date: '2012-03-09',
-      name: 'March 2012 Storm',
-      description: 'Modern era space weather event affecting advanced satellite systems',
-      actualKp: 8.00,
-      predictedKp: 6.38,
-      accuracy: 79.8,
-      riskLevel: 'SEVERE',
-      impactDescription: 'Modern satellite constellations experienced service degradation'
-    },
-    {
-      date: '2015-03-17',
-      name: 'St. Patrick\'s Day Storm 2015',
-      description: 'A strong geomagnetic storm that occurred during the solar minimum, causing aurora sightings at unusually low latitudes.',
-      actualKp: 6.5,
-      predictedKp: 7.0,
-      accuracy: 85.5,
-      riskLevel: 'SEVERE',
-      impactDescription: 'Significant satellite operational anomalies, forcing some operators to put satellites into safe mode.'
-    }
-  ]
-  return sampleEvents
+import { runHistoricalWorkflow, getHistoricalEvents, type HistoricalEvent, type HistoricalRunInputs, type RunInputs } from '../services/api'
+
+type EventView = {
+  id: string
+  date: string
+  name: string
+  description: string
+  actualKp: number
+  meanKp: number
+  maxAp: number
+  durationDays: number
+  anomalyCount: number
+  riskLevel: string
+  impactDescription: string
+}
+
+// Map a storm from /api/historical-events onto what the timeline renders
+const toEventView = (event: HistoricalEvent): EventView => {
+  const counts = Object.entries(event.anomaly_counts)
+    .sort((a, b) => b[1] - a[1])
+    .map(([type, count]) => `${type} ${count}`)
+    .join(', ')
+  return {
+    id: event.id,
+    date: event.peak_date,
+    name: event.name,
+    description: `${event.duration_days}-day storm from ${event.start} to ${event.end} • mean Kp ${event.mean_kp.toFixed(1)}, max Ap ${event.max_ap}`,
+    actualKp: event.peak_kp,
+    meanKp: event.mean_kp,
+    maxAp: event.max_ap,
+    durationDays: event.duration_days,
+    anomalyCount: event.anomaly_count,
+    riskLevel: event.risk_level,
+    impactDescription: event.anomaly_count > 0
+      ? `${event.anomaly_count} satellite anomal${event.anomaly_count === 1 ? 'y' : 'ies'} recorded during the storm (${counts})`
+      : 'No satellite anomalies recorded in the dataset during this storm'
+  }
 }
 
 const getRiskColor = (level: string) => {
@@ -91,11 +48,11 @@ const getRiskColor = (level: string) => {
   }
 }
 
-const getAccuracyColor = (accuracy: number) => {
-  if (accuracy >= 95) return '#22c55e'
-  if (accuracy >= 85) return '#10b981'
-  if (accuracy >= 75) return '#f59e0b'
-  return '#dc2626'
+const getAnomalyColor = (count: number) => {
+  if (count >= 5) return '#dc2626'
+  if (count >= 2) return '#f97316'
+  if (count >= 1) return '#f59e0b'
+  return '#22c55e'
 }
 
 export default function HistoricalEventsPage() {
@@ -110,21 +67,27 @@ export default function HistoricalEventsPage() {
   const [aiResult, setAiResult] = React.useState<any | null>(null)
   const [aiLoading, setAiLoading] = React.useState(false)
   const [aiError, setAiError] = React.useState<string | null>(null)
-  const [events, setEvents] = React.useState<any[]>([])
+  const [events, setEvents] = React.useState<EventView[]>([])
+  const [summary, setSummary] = React.useState<{ storms: number; dataset_start: string | null; dataset_end: string | null } | null>(null)
   const [eventsLoading, setEventsLoading] = React.useState(true)
+  const [eventsError, setEventsError] = React.useState<string | null>(null)
 
-  // Load historical events (using sample data for now)
+  // Load the strongest storms from the historical catalog
   React.useEffect(() => {
-    const loadEvents = () => {
-      setEventsLoading(true)
-      // Use sample data (will be replaced with real API later)
-      setEvents(parseCosmicEventsData())
-      setEventsLoading(false)
-    }
-    loadEvents()
+    getHistoricalEvents({ kind: 'storm', min_kp: 6, sort: 'peak_kp', limit: 25 })
+      .then(data => {
+        setEvents(data.items.map(toEventView))
+        setSummary(data.summary)
+      })
+      .catch((e: any) => setEventsError(e?.message ?? 'Failed to load historical events'))
+      .finally(() => setEventsLoading(false))
   }, [])
 
-  const averageAccuracy = events.reduce((sum, event) => sum + event.accuracy, 0) / events.length
+  const datasetRange = summary?.dataset_start && summary?.dataset_end
+    ? `${summary.dataset_start.slice(0, 4)}-${summary.dataset_end.slice(0, 4)}`
+    : 'historical dataset'
+  const totalAnomalies = events.reduce((sum, event) => sum + event.anomalyCount, 0)
+  const stormsWithAnomalies = events.filter(event => event.anomalyCount > 0).length
   const extremeEvents = events.filter(event => event.riskLevel === 'EXTREME').length
 
   const runAIWithHistoricalData = async (eventIndex: number) => {
@@ -169,10 +132,10 @@ export default function HistoricalEventsPage() {
           Historical Cosmic Events Analysis
         </h2>
         <p style={{ color: '#94a3b8', marginBottom: 24 }}>
-          Real-world model performance during major geomagnetic storms and space weather events
+          The strongest geomagnetic storms in the historical record and the satellite anomalies logged during them
         </p>
 
-        {/* Model Performance Summary */}
+        {/* Storm Catalog Summary */}
         <div style={{
           background: 'linear-gradient(135deg, #dc262620, #f9731610)',
           border: '1px solid #dc262640',
@@ -180,19 +143,21 @@ export default function HistoricalEventsPage() {
           padding: 20,
           marginBottom: 24
         }}>
-          <h3 style={{ margin: '0 0 16px 0', color: '#dc2626' }}>Model Validation Summary</h3>
+          <h3 style={{ margin: '0 0 16px 0', color: '#dc2626' }}>Historical Storm Summary</h3>
           <div style={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fit, minmax(200px, 1fr))', gap: 16 }}>
             <div>
               <h4 style={{ margin: '0 0 8px 0', color: '#94a3b8' }}>Events Analyzed</h4>
               <div style={{ fontSize: '2rem', fontWeight: 700, color: '#cbd5e1' }}>{events.length}</div>
-              <div style={{ color: '#64748b', fontSize: '0.875rem' }}>Major cosmic events (2001-2012)</div>
+              <div style={{ color: '#64748b', fontSize: '0.875rem' }}>
+                Strongest of {summary?.storms ?? 0} storms ({datasetRange})
+              </div>
             </div>
             <div>
-              <h4 style={{ margin: '0 0 8px 0', color: '#94a3b8' }}>Average Accuracy</h4>
-              <div style={{ fontSize: '2rem', fontWeight: 700, color: getAccuracyColor(averageAccuracy) }}>
-                {averageAccuracy.toFixed(1)}%
+              <h4 style={{ margin: '0 0 8px 0', color: '#94a3b8' }}>Satellite Anomalies</h4>
+              <div style={{ fontSize: '2rem', fontWeight: 700, color: getAnomalyColor(totalAnomalies) }}>
+                {totalAnomalies}
               </div>
-              <div style={{ color: '#64748b', fontSize: '0.875rem' }}>Prediction accuracy</div>
+              <div style={{ color: '#64748b', fontSize: '0.875rem' }}>Recorded during these storms</div>
             </div>
             <div>
               <h4 style={{ margin: '0 0 8px 0', color: '#94a3b8' }}>Extreme Events</h4>
@@ -211,8 +176,8 @@ export default function HistoricalEventsPage() {
           <h4 style={{ margin: '0 0 8px 0', color: '#0ea5e9' }}>Why This Matters for Insurance</h4>
           <p style={{ margin: 0, color: '#cbd5e1', lineHeight: 1.6 }}>
             These historical events represent the most challenging conditions for satellite operations. 
-            Our model's performance during these extreme scenarios validates its reliability for 
-            insurance risk assessment and premium calculations during both normal and severe space weather conditions.
+            Replaying them through the risk and pricing agents shows how premiums respond to 
+            the storm magnitudes that drive real insurance claims.
           </p>
         </div>
       </div>
@@ -220,10 +185,12 @@ export default function HistoricalEventsPage() {
       {/* Events Timeline */}
       <div className="card" style={{ marginBottom: 24 }}>
         <h3 style={{ marginTop: 0 }}>Historical Event Timeline</h3>
+        {eventsLoading && <div style={{ color: '#94a3b8' }}>Loading historical events...</div>}
+        {eventsError && <div style={{ color: '#ef4444' }}>{eventsError}</div>}
         <div style={{ display: 'grid', gap: 16 }}>
           {events.map((event, index) => (
             <div
-              key={index}
+              key={event.id}
               onClick={() => setSelectedEvent(selectedEvent === index ? null : index)}
               style={{
                 background: selectedEvent === index ? '#1e293b' : '#0f172a',
@@ -252,14 +219,14 @@ export default function HistoricalEventsPage() {
                     {event.riskLevel}
                   </div>
                   <div style={{
-                    background: getAccuracyColor(event.accuracy),
+                    background: getAnomalyColor(event.anomalyCount),
                     color: 'white',
                     padding: '4px 12px',
                     borderRadius: 6,
                     fontSize: '0.75rem',
                     fontWeight: 700
                   }}>
-                    {event.accuracy.toFixed(1)}% Accurate
+                    {event.anomalyCount} Anomal{event.anomalyCount === 1 ? 'y' : 'ies'}
                   </div>
                 </div>
               </div>
@@ -274,20 +241,20 @@ export default function HistoricalEventsPage() {
                   gap: 16
                 }}>
                   <div>
-                    <h5 style={{ margin: '0 0 8px 0', color: '#0ea5e9' }}>Prediction Performance</h5>
+                    <h5 style={{ margin: '0 0 8px 0', color: '#0ea5e9' }}>Storm Profile</h5>
                     <div style={{ display: 'grid', gap: 8 }}>
                       <div style={{ display: 'flex', justifyContent: 'space-between' }}>
-                        <span style={{ color: '#94a3b8' }}>Actual Kp Maximum:</span>
+                        <span style={{ color: '#94a3b8' }}>Peak Kp:</span>
                         <span style={{ fontWeight: 600, color: '#dc2626' }}>Kp {event.actualKp}</span>
                       </div>
                       <div style={{ display: 'flex', justifyContent: 'space-between' }}>
-                        <span style={{ color: '#94a3b8' }}>Predicted Kp:</span>
-                        <span style={{ fontWeight: 600, color: '#0ea5e9' }}>Kp {event.predictedKp}</span>
+                        <span style={{ color: '#94a3b8' }}>Mean Kp:</span>
+                        <span style={{ fontWeight: 600, color: '#0ea5e9' }}>Kp {event.meanKp.toFixed(2)}</span>
                       </div>
                       <div style={{ display: 'flex', justifyContent: 'space-between' }}>
-                        <span style={{ color: '#94a3b8' }}>Prediction Error:</span>
-                        <span style={{ fontWeight: 600, color: getAccuracyColor(event.accuracy) }}>
-                          {Math.abs(event.actualKp - event.predictedKp).toFixed(2)} Kp units
+                        <span style={{ color: '#94a3b8' }}>Max Ap / Duration:</span>
+                        <span style={{ fontWeight: 600, color: '#cbd5e1' }}>
+                          {event.maxAp} • {event.durationDays} day{event.durationDays === 1 ? '' : 's'}
                         </span>
                       </div>
                     </div>
@@ -404,7 +371,7 @@ export default function HistoricalEventsPage() {
                 >
                   <option value="">Select a historical event...</option>
                   {events.map((event, index) => (
-                    <option key={index} value={index}>
+                    <option key={event.id} value={index}>
                       {event.name} ({event.date}) - Kp {event.actualKp}
                     </option>
                   ))}
@@ -835,19 +802,18 @@ export default function HistoricalEventsPage() {
         )}
       </div>
 
-      {/* Model Performance Analysis */}
+      {/* Storm Catalog Insights */}
       <div className="card">
-        <h3 style={{ marginTop: 0 }}>Model Performance Insights</h3>
+        <h3 style={{ marginTop: 0 }}>Historical Storm Insights</h3>
         
         <div style={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fit, minmax(300px, 1fr))', gap: 20 }}>
           <div>
-            <h4 style={{ color: '#0ea5e9', marginBottom: 12 }}>Prediction Accuracy Distribution</h4>
+            <h4 style={{ color: '#0ea5e9', marginBottom: 12 }}>Peak Kp Distribution</h4>
             <div style={{ display: 'grid', gap: 8 }}>
               {[
-                { range: '95-100%', count: events.filter(e => e.accuracy >= 95).length, color: '#22c55e' },
-                { range: '85-95%', count: events.filter(e => e.accuracy >= 85 && e.accuracy < 95).length, color: '#10b981' },
-                { range: '75-85%', count: events.filter(e => e.accuracy >= 75 && e.accuracy < 85).length, color: '#f59e0b' },
-                { range: '< 75%', count: events.filter(e => e.accuracy < 75).length, color: '#dc2626' }
+                { range: 'Kp ≥ 8 (Extreme)', count: events.filter(e => e.riskLevel === 'EXTREME').length, color: getRiskColor('EXTREME') },
+                { range: 'Kp 7-8 (Severe)', count: events.filter(e => e.riskLevel === 'SEVERE').length, color: getRiskColor('SEVERE') },
+                { range: 'Kp 6-7 (High)', count: events.filter(e => e.riskLevel === 'HIGH').length, color: getRiskColor('HIGH') }
               ].map((range, index) => (
                 <div key={index} style={{ display: 'flex', alignItems: 'center', gap: 12 }}>
                   <div style={{
@@ -864,7 +830,7 @@ export default function HistoricalEventsPage() {
           </div>
 
           <div>
-            <h4 style={{ color: '#0ea5e9', marginBottom: 12 }}>Risk Assessment Validation</h4>
+            <h4 style={{ color: '#0ea5e9', marginBottom: 12 }}>Satellite Anomaly Exposure</h4>
             <div style={{ 
               background: '#0f172a', 
               padding: 16, 
@@ -872,12 +838,12 @@ export default function HistoricalEventsPage() {
               border: '1px solid #334155' 
             }}>
               <p style={{ margin: '0 0 12px 0', color: '#cbd5e1', fontSize: '0.875rem' }}>
-                Our model successfully identified extreme risk conditions in <strong>{extremeEvents} out of {events.length}</strong> major 
-                historical events, with an average prediction accuracy of <strong>{averageAccuracy.toFixed(1)}%</strong>.
+                <strong>{stormsWithAnomalies} out of {events.length}</strong> of these storms coincided with recorded 
+                satellite anomalies, <strong>{totalAnomalies}</strong> in total; {extremeEvents} reached Kp ≥ 8.
               </p>
               <p style={{ margin: 0, color: '#64748b', fontSize: '0.75rem' }}>
-                This validation demonstrates the model's reliability for real-world insurance applications 
-                and risk-based premium calculations during both normal and extreme space weather conditions.
+                Anomalies are matched to a storm when they fall on one of its Kp ≥ 5 days, so quieter-day 
+                anomalies are not counted here.
               </p>
             </div>
           </div>
@@ -893,8 +859,8 @@ export default function HistoricalEventsPage() {
         }}>
           <h4 style={{ margin: '0 0 8px 0', color: '#94a3b8' }}>Historical Data Source</h4>
           <p style={{ margin: 0, color: '#64748b', fontSize: '0.875rem' }}>
-            Analysis based on historical cosmic event data (2001-2012) • Model predictions vs actual observed Kp values • 
-            Validation period covers solar maximum and minimum conditions
+            Storms detected from runs of consecutive days at Kp ≥ 5 and matched against the satellite anomaly record 
+            ({datasetRange}) • Served by /api/historical-events
           </p>
         </div>
       </div>
@@ -1,6 +1,6 @@
 import React from 'react'
 import { DailyKpBars } from '../components/DailyKpBars'
-import { getDailyGeomag } from '../services/api'
+import { getDailyGeomag, getStormEpisodes, type StormEpisode } from '../services/api'
 
 // Risk level assessment for historical data
 const getRiskPeriodAssessment = (maxKp: number, stormDays: number, totalDays: number) => {
@@ -54,6 +54,10 @@ const getTrend = (days: any[]) => {
 export default function HistoryPage(){
   const [days, setDays] = React.useState<any[]>([])
   const [loading, setLoading] = React.useState(true)
+  const [threshold, setThreshold] = React.useState(6)
+  const [withAnomalies, setWithAnomalies] = React.useState(false)
+  const [episodes, setEpisodes] = React.useState<{ total: number; items: StormEpisode[]; levels: { threshold: number; episodes: number; longest_days: number; first: string | null; last: string | null }[] } | null>(null)
+  const [episodesError, setEpisodesError] = React.useState<string | null>(null)
   
   React.useEffect(()=>{
     getDailyGeomag(30).then(d=> {
@@ -64,6 +68,13 @@ export default function HistoryPage(){
     })
   },[])
 
+  React.useEffect(()=>{
+    setEpisodesError(null)
+    getStormEpisodes({ threshold, min_anomalies: withAnomalies ? 1 : 0, limit: 20 })
+      .then(setEpisodes)
+      .catch((e: any) => setEpisodesError(e?.message ?? 'Failed to load storm episodes'))
+  },[threshold, withAnomalies])
+
   // Enhanced statistics with business intelligence
   const analytics = React.useMemo(() => {
     if (!days.length) return { 
@@ -207,6 +218,88 @@ export default function HistoryPage(){
         <DailyKpBars days={days} />
       </div>
 
+      {/* Historical Storm Episodes */}
+      <div className="card" style={{ marginBottom: 24 }}>
+        <h3 style={{ marginTop: 0 }}>Historical Storm Episodes</h3>
+        <p style={{ color: '#94a3b8', marginTop: 0 }}>
+          Runs of consecutive days with daily Kp at or above the threshold, across the full historical record
+        </p>
+
+        <div style={{ display: 'flex', gap: 16, alignItems: 'center', flexWrap: 'wrap', marginBottom: 16 }}>
+          <label style={{ color: '#cbd5e1' }}>
+            Threshold{' '}
+            <select value={threshold} onChange={e => setThreshold(Number(e.target.value))}>
+              {(episodes?.levels ?? []).map(level => (
+                <option key={level.threshold} value={level.threshold}>Kp ≥ {level.threshold}</option>
+              ))}
+              {!episodes && <option value={threshold}>Kp ≥ {threshold}</option>}
+            </select>
+          </label>
+          <label style={{ color: '#cbd5e1' }}>
+            <input type="checkbox" checked={withAnomalies} onChange={e => setWithAnomalies(e.target.checked)} />{' '}
+            Only episodes with satellite anomalies
+          </label>
+        </div>
+
+        {episodesError && <div style={{ color: '#ef4444', marginBottom: 16 }}>{episodesError}</div>}
+
+        {episodes && (
+          <div style={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fit, minmax(160px, 1fr))', gap: 12, marginBottom: 20 }}>
+            {episodes.levels.map(level => (
+              <div
+                key={level.threshold}
+                style={{
+                  background: '#1e293b',
+                  padding: 12,
+                  borderRadius: 8,
+                  border: `1px solid ${level.threshold === threshold ? '#0ea5e9' : '#334155'}`
+                }}
+              >
+                <div style={{ color: '#94a3b8', fontSize: '0.875rem' }}>Kp ≥ {level.threshold}</div>
+                <div style={{ fontSize: '1.25rem', fontWeight: 600, color: '#cbd5e1' }}>{level.episodes} episodes</div>
+                <div style={{ color: '#64748b', fontSize: '0.75rem' }}>
+                  Longest {level.longest_days} day{level.longest_days === 1 ? '' : 's'}
+                  {level.first && level.last && ` • ${level.first.slice(0, 4)}-${level.last.slice(0, 4)}`}
+                </div>
+              </div>
+            ))}
+          </div>
+        )}
+
+        {episodes && (
+          <div style={{ display: 'grid', gap: 8 }}>
+            <div style={{ color: '#64748b', fontSize: '0.875rem' }}>
+              Showing {episodes.items.length} of {episodes.total} episodes
+            </div>
+            {episodes.items.map(ep => (
+              <div
+                key={ep.start}
+                style={{
+                  display: 'flex',
+                  justifyContent: 'space-between',
+                  alignItems: 'center',
+                  gap: 12,
+                  padding: '8px 12px',
+                  background: '#0f172a',
+                  border: '1px solid #334155',
+                  borderRadius: 8
+                }}
+              >
+                <span style={{ color: '#cbd5e1', minWidth: 180 }}>
+                  {ep.start === ep.end ? ep.start : `${ep.start} – ${ep.end}`}
+                </span>
+                <span style={{ color: '#94a3b8', flex: 1 }}>
+                  {ep.duration_days} day{ep.duration_days === 1 ? '' : 's'} • peak Kp {ep.peak_kp.toFixed(1)} • max Ap {ep.max_ap}
+                </span>
+                <span style={{ color: ep.anomaly_count > 0 ? '#f97316' : '#64748b', fontWeight: 600 }}>
+                  {ep.anomaly_count} anomal{ep.anomaly_count === 1 ? 'y' : 'ies'}
+                </span>
+              </div>
+            ))}
+          </div>
+        )}
+      </div>
+
       {/* Business Intelligence - Separate Section */}
       <div className="card" style={{ marginBottom: 24 }}>
         <h3 style={{ marginTop: 0 }}>Business Intelligence Summary</h3>
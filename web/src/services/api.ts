@@ -57,3 +57,133 @@ export async function getThreeDayForecast() {
   const { data } = await axios.get('/api/forecast-3day')
   return data as ThreeDayForecast
 }
+
+export type DashboardField = 'portfolio' | 'kp_forecast' | 'forecast_3day' | 'daily_geomag' | 'kp_distribution' | 'risk'
+
+export type DashboardQuery = {
+  fields?: DashboardField[]
+  hours?: number
+  days?: number
+  max_points?: number
+}
+
+export async function getDashboard(query: DashboardQuery = {}) {
+  const params: Record<string, string | number> = {}
+  if (query.fields?.length) params.fields = query.fields.join(',')
+  if (query.hours != null) params.hours = query.hours
+  if (query.days != null) params.days = query.days
+  if (query.max_points != null) params.max_points = query.max_points
+  const { data } = await axios.get('/api/dashboard', { params })
+  return data as {
+    fields: DashboardField[]
+    missing: DashboardField[]
+    digests: Record<string, string>
+    portfolio?: { items: any[]; summary: any } | null
+    kp_forecast?: any | null
+    forecast_3day?: ThreeDayForecast | null
+    daily_geomag?: { days: DailyGeomagDay[] } | null
+    kp_distribution?: any | null
+    risk?: any | null
+  }
+}
+
+export type HistoricalEvent = {
+  id: string
+  kind: 'storm' | 'anomaly_cluster'
+  name: string
+  start: string
+  end: string
+  duration_days: number
+  peak_kp: number
+  peak_date: string
+  mean_kp: number
+  max_ap: number
+  anomaly_count: number
+  anomaly_counts: Record<string, number>
+  risk_level: 'EXTREME' | 'SEVERE' | 'HIGH' | 'MODERATE' | 'LOW'
+}
+
+export type HistoricalEventsQuery = {
+  kind?: 'storm' | 'anomaly_cluster'
+  min_kp?: number
+  start?: string
+  end?: string
+  anomaly_type?: string
+  risk_level?: string
+  sort?: 'start' | '-start' | 'peak_kp' | 'anomalies' | 'duration'
+  offset?: number
+  limit?: number
+}
+
+export async function getHistoricalEvents(query: HistoricalEventsQuery = {}) {
+  const { data } = await axios.get('/api/historical-events', { params: query })
+  return data as {
+    total: number
+    offset: number
+    limit: number
+    items: HistoricalEvent[]
+    summary: {
+      events: number
+      storms: number
+      anomaly_clusters: number
+      dataset_start: string | null
+      dataset_end: string | null
+      anomaly_types: string[]
+    }
+  }
+}
+
+export type StormEpisode = Omit<HistoricalEvent, 'id' | 'kind' | 'name'> & { threshold: number }
+
+export type StormEpisodesQuery = {
+  threshold?: number
+  start?: string
+  end?: string
+  min_duration?: number
+  min_peak_kp?: number
+  min_anomalies?: number
+  offset?: number
+  limit?: number
+}
+
+export async function getStormEpisodes(query: StormEpisodesQuery = {}) {
+  const { data } = await axios.get('/api/storm-episodes', { params: query })
+  return data as {
+    threshold: number
+    total: number
+    offset: number
+    limit: number
+    items: StormEpisode[]
+    levels: { threshold: number; episodes: number; longest_days: number; first: string | null; last: string | null }[]
+  }
+}
+
+export type StressTestRequest = {
+  events?: { kp: number; name?: string; date?: string }[]
+  threshold?: number
+  start?: string
+  end?: string
+  min_duration?: number
+  segment_by?: 'orbit_type' | 'shielding' | 'primary_mission' | 'id'
+}
+
+export async function runStressTest(body: StressTestRequest) {
+  const { data } = await axios.post('/api/stress-test', body)
+  return data as {
+    portfolio_version: string
+    segment_by: string
+    segments: string[]
+    segment_exposure_millions: number[]
+    total_exposure_millions: number
+    events: {
+      name: string | null
+      date: string | null
+      kp: number
+      total_loss_millions: number
+      pml_pct_of_exposure: number
+      strategic_recommendation: string
+    }[]
+    loss_matrix_millions: number[][]
+    cached: boolean
+  }
+}